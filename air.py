@@ -0,0 +1,341 @@
+import atexit
+import concurrent.futures
+import datetime
+import http.server
+import json
+import logging
+import os
+import random
+import threading
+import time
+import zoneinfo
+from collections import namedtuple
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from db import get_query_cache, get_storage
+
+_log = logging.getLogger("fisa.air")
+
+# =========================
+# 날씨/미세먼지 수집
+# =========================
+# 2_환기요정은 외부 API를 직접 부르지 않고 air_readings 테이블의 최신 행과 이력만 읽음
+# - AirPoller: 프로세스마다 백그라운드 스레드 하나가 poll_interval마다 수집해서 air_readings에 INSERT
+#   (다른 레플리카가 이번 주기에 이미 넣었으면 건너뜀 → 외부 호출은 페이지 조회 수가 아니라 주기당 한 번)
+# - 외부 API 실패: 행을 넣지 않음 → 페이지는 마지막으로 성공한 행을 계속 보여줌
+# - 한쪽 API만 실패: 그쪽 값은 직전 행의 값과 시각을 그대로 씀 (weather_at / air_at으로 구분)
+# AirKorea는 1시간마다 갱신되고 하루 호출 한도가 작으므로 poll_interval을 너무 짧게 잡지 말 것
+# 오프라인 테스트: python air.py stub 으로 가짜 API를 띄우고 FISA_AIR_STUB_URL=http://127.0.0.1:8765
+
+DEFAULT_AIR_POLL_INTERVAL = 300    # 수집 주기(초)
+KST = zoneinfo.ZoneInfo("Asia/Seoul")
+
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+AIR_KOREA_URL = "http://apis.data.go.kr/B552584/ArpltnInforInqireSvc/getMsrstnAcctoRltmMesureDnsty"
+AIR_KOREA_STATION = "마포구"
+
+# 소스별 호출 설정 (secrets.toml [air]의 weather_timeout / air_timeout / weather_retries / air_retries로 덮어쓰기)
+# - timeout: (연결, 응답) 초, 재시도 포함 전체 상한은 deadline
+# - retries: 연결 실패/5xx/429일 때 다시 보내는 횟수 (AirKorea는 하루 호출 한도가 작아서 적게)
+UPSTREAMS = {
+    "weather": {"url": WEATHER_URL, "timeout": (3.05, 5.0), "retries": 2},
+    "air": {"url": AIR_KOREA_URL, "timeout": (3.05, 8.0), "retries": 1},
+}
+AIR_FETCH_DEADLINE = 15.0          # 소스 하나를 기다리는 최대 시간(초, 재시도 포함)
+HTTP_POOL_SIZE = 4                 # 소스별 keep-alive 커넥션 수
+RETRY_BACKOFF = 0.5                # 재시도 간격 (0.5초, 1초, ...)
+
+# temp: 기온(°C) / pm10, pm25: 미세먼지, 초미세먼지(μg/m³)
+# weather_at, air_at: 소스별로 마지막으로 성공한 시각(KST) / air_data_time: AirKorea 측정 시각("YYYY-MM-DD HH:MM")
+# 한쪽만 실패하면 그쪽은 이전 값과 이전 시각을 그대로 둠 (air_readings 컬럼과 같은 순서)
+AirReading = namedtuple("AirReading", ["temp", "pm10", "pm25", "weather_at", "air_at", "air_data_time"])
+
+
+def now_kst():
+    """현재 한국 시각 (초 단위, tz 없는 datetime: air_readings에 저장하는 형태)"""
+    return datetime.datetime.now(KST).replace(tzinfo=None, microsecond=0)
+
+
+def parse_weather(res):
+    """OpenWeatherMap 응답 → 기온"""
+    return res['main']['temp']
+
+
+def parse_air_korea(res):
+    """AirKorea 응답 → (PM10, PM2.5, 측정 시각), 점검 중("-") 등 숫자가 아니면 0"""
+    item = res['response']['body']['items'][0]
+    pm10 = int(item['pm10Value']) if item['pm10Value'].isdigit() else 0
+    pm25 = int(item['pm25Value']) if item['pm25Value'].isdigit() else 0
+    return pm10, pm25, item.get('dataTime')
+
+
+class AirFetcher:
+    """
+    OpenWeatherMap 기온 + AirKorea 마포구 PM10/PM2.5를 동시에 받아옴
+
+    - 두 호출을 스레드 두 개로 동시에 보냄 (가장 느린 쪽만큼만 걸림)
+    - 소스마다 keep-alive 커넥션 풀 + 재시도 횟수가 다른 어댑터 (requests.Session 하나를 공유)
+    - 한쪽이 실패하면 그쪽은 previous(이전 AirReading) 값을 그대로, 둘 다 실패하거나 이전 값이 없으면 예외
+    """
+
+    def __init__(self, upstreams=UPSTREAMS, deadline=AIR_FETCH_DEADLINE):
+        self.upstreams = upstreams
+        self.deadline = deadline
+        self._session = requests.Session()
+        for cfg in upstreams.values():
+            retry = Retry(
+                total=cfg["retries"],
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False,   # 마지막 응답을 그대로 받아서 raise_for_status()에서 에러로
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            self._session.mount(cfg["url"], adapter)   # URL 접두사별 어댑터 (소스마다 재시도 설정이 다름)
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(upstreams), thread_name_prefix="air-fetch")
+
+    def _get_json(self, source, params):
+        cfg = self.upstreams[source]
+        res = self._session.get(cfg["url"], params=params, timeout=cfg["timeout"])
+        res.raise_for_status()
+        return res.json()
+
+    def fetch_weather(self):
+        return parse_weather(self._get_json(
+            "weather", {"q": "Seoul", "appid": os.getenv("OPENWEATHER_KEY"), "units": "metric"}
+        ))
+
+    def fetch_air(self):
+        return parse_air_korea(self._get_json("air", {
+            'serviceKey': os.getenv("AIR_KOREA_KEY"), 'returnType': 'json',
+            'stationName': AIR_KOREA_STATION, 'dataTerm': 'DAILY', 'ver': '1.0'
+        }))
+
+    def fetch(self, previous=None):
+        """두 소스를 동시에 받아서 AirReading으로 합침 (실패한 소스는 previous 값 유지)"""
+        futures = {
+            "weather": self._pool.submit(self._timed, "weather", self.fetch_weather),
+            "air": self._pool.submit(self._timed, "air", self.fetch_air),
+        }
+        results, errors = {}, {}
+        deadline = time.monotonic() + self.deadline
+        for source, future in futures.items():
+            try:
+                results[source] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                errors[source] = e
+                _log.warning(json.dumps({"event": "air_source_failed", "source": source, "error": repr(e)}))
+
+        if len(errors) == len(futures) or (errors and previous is None):
+            raise next(iter(errors.values()))
+
+        now = now_kst()
+        if "weather" in results:
+            temp, weather_at = results["weather"], now
+        else:
+            temp, weather_at = previous.temp, previous.weather_at
+        if "air" in results:
+            (pm10, pm25, air_data_time), air_at = results["air"], now
+        else:
+            pm10, pm25, air_data_time, air_at = previous.pm10, previous.pm25, previous.air_data_time, previous.air_at
+        return AirReading(temp, pm10, pm25, weather_at, air_at, air_data_time)
+
+    def _timed(self, source, fn):
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            _log.info(json.dumps({
+                "event": "air_source_call", "source": source, "ms": round((time.perf_counter() - t0) * 1000, 1)
+            }))
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+
+
+# =========================
+# 백그라운드 수집기 (air_readings)
+# =========================
+class AirPoller:
+    """
+    poll_interval마다 fetcher.fetch()로 받아서 storage.insert_air_reading()
+
+    여러 레플리카가 각자 돌아도 직전 행이 이번 주기 안의 것이면 건너뛰므로 주기당 대략 한 번만 외부 호출
+    """
+
+    def __init__(self, fetcher, storage, interval=DEFAULT_AIR_POLL_INTERVAL):
+        self._fetcher = fetcher
+        self._storage = storage
+        self.interval = interval
+        self._lock = threading.Lock()   # 스레드와 페이지(첫 수집)가 동시에 부르지 않도록
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="air-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """stop()할 때까지 interval마다 poll_once() (실패는 로그만 남기고 다음 주기에 다시)"""
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                _log.warning(json.dumps({"event": "air_poll_failed", "error": repr(e)}))
+            self._stop.wait(self.interval)
+
+    def poll_once(self):
+        """한 번 수집해서 INSERT, 새 행을 넣었으면 True (이번 주기 행이 이미 있으면 False, 실패하면 예외)"""
+        with self._lock:
+            latest = self._storage.fetch_latest_air_reading()
+            # 주기가 조금씩 밀려도 건너뛰지 않도록 90%만 지났어도 새로 받음
+            if latest and (now_kst() - latest["measured_at"]).total_seconds() < self.interval * 0.9:
+                return False
+            previous = None if latest is None else AirReading(**{f: latest[f] for f in AirReading._fields})
+            t0 = time.perf_counter()
+            reading = self._fetcher.fetch(previous)
+            measured_at = now_kst()
+            self._storage.insert_air_reading(measured_at, reading)
+        # 이 프로세스의 캐시는 바로 무효화 (다른 레플리카는 data_versions로 감지)
+        get_query_cache().invalidate("air_readings")
+        get_query_cache().notify_changed("air_readings")
+        _log.info(json.dumps({
+            "event": "air_polled", "ms": round((time.perf_counter() - t0) * 1000, 1),
+            **reading._asdict(), "measured_at": measured_at,
+        }, ensure_ascii=False, default=str))
+        return True
+
+
+def _air_cfg():
+    try:
+        return dict(st.secrets["air"])
+    except Exception:
+        return {}
+
+
+def _poll_interval(cfg):
+    return float(os.getenv("FISA_AIR_POLL_INTERVAL") or cfg.get("poll_interval", DEFAULT_AIR_POLL_INTERVAL))
+
+
+def make_air_fetcher(cfg=None):
+    """
+    secrets.toml [air] 설정으로 AirFetcher 생성
+
+    - 소스별 timeout(연결, 응답)/retries: weather_timeout, air_timeout, weather_retries, air_retries
+    - 가짜 API: 환경변수 FISA_AIR_STUB_URL > [air] stub_url (있으면 <stub_url>/weather, <stub_url>/air 호출)
+    """
+    cfg = _air_cfg() if cfg is None else cfg
+    stub_url = os.getenv("FISA_AIR_STUB_URL") or cfg.get("stub_url")
+    upstreams = {}
+    for source, default in UPSTREAMS.items():
+        upstreams[source] = {
+            "url": f"{stub_url.rstrip('/')}/{source}" if stub_url else default["url"],
+            "timeout": tuple(cfg.get(f"{source}_timeout", default["timeout"])),
+            "retries": int(cfg.get(f"{source}_retries", default["retries"])),
+        }
+    return AirFetcher(upstreams, deadline=float(cfg.get("deadline", AIR_FETCH_DEADLINE)))
+
+
+@st.cache_resource
+def get_air_poller():
+    """
+    프로세스 전역 수집기 (처음 부를 때 백그라운드 스레드 시작)
+
+    주기: 환경변수 FISA_AIR_POLL_INTERVAL > secrets.toml [air] poll_interval > 기본값(300초)
+    """
+    cfg = _air_cfg()
+    fetcher = make_air_fetcher(cfg)
+    poller = AirPoller(fetcher, get_storage(), interval=_poll_interval(cfg))
+    poller.start()
+    atexit.register(poller.stop)
+    atexit.register(fetcher.close)
+    return poller
+
+
+# =========================
+# 오프라인 테스트용 가짜 API
+# =========================
+# OpenWeatherMap / AirKorea와 같은 모양의 JSON을 돌려주는 로컬 HTTP 서버 (값은 조금씩 변하는 난수)
+# python air.py stub [--port 8765] [--delay 0.3] [--fail-rate 0.1]
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive (AirFetcher 커넥션 재사용 확인용)
+    delay = 0.0
+    fail_rate = 0.0
+    rng = random.Random()
+    state = {"temp": 12.0, "pm10": 40, "pm25": 18}
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if self.rng.random() < self.fail_rate:
+            return self._send(503, {"error": "stub failure"})
+        s, rng = self.state, self.rng
+        if path.endswith("/weather"):
+            s["temp"] = round(min(35.0, max(-15.0, s["temp"] + rng.uniform(-0.5, 0.5))), 1)
+            return self._send(200, {"main": {"temp": s["temp"]}, "dt": int(time.time())})
+        if path.endswith("/air"):
+            s["pm10"] = min(250, max(0, s["pm10"] + rng.randint(-6, 6)))
+            s["pm25"] = min(120, max(0, s["pm25"] + rng.randint(-3, 3)))
+            item = {
+                "pm10Value": str(s["pm10"]),
+                "pm25Value": "-" if rng.random() < 0.02 else str(s["pm25"]),   # 점검 중인 경우
+                "dataTime": now_kst().strftime("%Y-%m-%d %H:00"),
+            }
+            return self._send(200, {"response": {"body": {"items": [item]}}})
+        self._send(404, {"error": "not found"})
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def make_stub_server(port=8765, delay=0.0, fail_rate=0.0, seed=None):
+    """가짜 API 서버 (serve_forever()는 호출하는 쪽에서, port=0이면 빈 포트)"""
+    handler = type("StubHandler", (_StubHandler,), {
+        "delay": delay, "fail_rate": fail_rate, "rng": random.Random(seed),
+        "state": dict(_StubHandler.state),
+    })
+    return http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+if __name__ == "__main__":
+    # python air.py stub [--port 8765]  : 가짜 API 서버 실행
+    # python air.py poll [--once]       : 수집기를 포그라운드에서 실행 (대상 DB는 get_storage()와 같은 규칙)
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["stub", "poll"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="가짜 API 응답 지연(초)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="가짜 API가 503을 돌려줄 확률")
+    parser.add_argument("--once", action="store_true", help="한 번만 수집하고 종료")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "stub":
+        server = make_stub_server(args.port, args.delay, args.fail_rate)
+        print(f"가짜 API: http://127.0.0.1:{server.server_port} (FISA_AIR_STUB_URL로 지정)")
+        server.serve_forever()
+    else:
+        cfg = _air_cfg()
+        poller = AirPoller(make_air_fetcher(cfg), get_storage(), interval=_poll_interval(cfg))
+        if args.once:
+            print("수집함" if poller.poll_once() else "이번 주기 행이 이미 있어서 건너뜀")
+        else:
+            poller.run()
@@ -0,0 +1,194 @@
+"""
+charts.gradient_bar_figure (2_환기요정 그라데이션 바) 결과 확인 + 생성 시간/페이로드 비교
+
+사용법:
+    python bench/gradient_bar_bench.py --check       # 예전 구현과 색/위치/주석이 같은지 (다르면 exit 1)
+    python bench/gradient_bar_bench.py --repeat 20   # 생성 시간 + JSON 크기 비교
+
+비교 기준(reference_*)은 trace 하나로 바꾸기 전 페이지에 있던 draw_thin_gradient_bar를 그대로 옮겨둔 것
+(측정값 → 백분위 변환만 빼고 백분위를 바로 받음)
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import plotly.graph_objects as go
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from charts import GRADIENT_SEGMENTS, GRADIENT_STOPS, build_gradient_bar_base, gradient_bar_figure
+
+
+# =========================
+# 비교 기준 (예전 구현)
+# =========================
+def reference_segment_color(progress):
+    if progress < 25:  # 좋음 (파랑 계열)
+        ratio = progress / 25
+        r = int(0 + (146 - 0) * ratio)
+        g = int(191 + (208 - 191) * ratio)
+        b = int(255 + (80 - 255) * ratio)
+    elif progress < 50:  # 보통 (초록 계열)
+        r, g, b = 146, 208, 80
+    elif progress < 75:  # 나쁨 (주황 계열)
+        ratio = (progress - 50) / 25
+        r = int(146 + (255 - 146) * ratio)
+        g = int(208 + (165 - 208) * ratio)
+        b = int(80 + (0 - 80) * ratio)
+    else:  # 매우나쁨 (빨강 계열)
+        ratio = (progress - 75) / 25
+        r = int(255)
+        g = int(165 - (165 * ratio))
+        b = int(0)
+    return r, g, b
+
+
+def reference_gradient_bar(pm10_percent, pm25_percent):
+    fig = go.Figure()
+    num_segments = 200
+    for i in range(num_segments):
+        progress = i / num_segments * 100
+        r, g, b = reference_segment_color(progress)
+        fig.add_trace(go.Bar(
+            x=[100/num_segments],
+            y=[2],
+            orientation='h',
+            marker=dict(color=f'rgb({r},{g},{b})', line=dict(width=0)),
+            width=0.8,
+            showlegend=False,
+            hoverinfo='skip',
+            base=i * (100/num_segments)
+        ))
+    fig.add_shape(type="circle", xref="x", yref="y", x0=-2, y0=1.6, x1=2, y1=2.4,
+                  fillcolor='rgb(0,191,255)', line=dict(width=0))
+    fig.add_shape(type="circle", xref="x", yref="y", x0=98, y0=1.6, x1=102, y1=2.4,
+                  fillcolor='rgb(255,0,0)', line=dict(width=0))
+    fig.update_layout(
+        barmode='stack',
+        height=150,
+        margin=dict(l=10, r=10, t=60, b=0),
+        xaxis=dict(range=[-3, 103], showticklabels=False, showgrid=False, zeroline=False),
+        yaxis=dict(showticklabels=False, showgrid=False, fixedrange=True, range=[-0.3, 3]),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        bargap=0
+    )
+    for x in [25, 50, 75]:
+        fig.add_shape(type="line", x0=x, y0=1.6, x1=x, y1=2.4,
+                      line=dict(color="rgba(255,255,255,0.8)", width=2, dash="dash"))
+    for emoji, label, pos in [('😊', '좋음', 12.5), ('🙂', '보통', 37.5), ('😷', '나쁨', 62.5), ('🚨', '매우나쁨', 87.5)]:
+        fig.add_annotation(
+            x=pos, y=3.0,
+            text=f'<span style="font-size:15px">{emoji}</span><br><span style="font-size:12px">{label}</span>',
+            showarrow=False, xref='x', yref='y'
+        )
+    for pos, text, align in [(0, '0', 'left'), (25, '30/15', 'center'), (50, '80/35', 'center'), (75, '150/75', 'center')]:
+        fig.add_annotation(
+            x=pos, y=2.5, text=f'<span style="font-size:12px; color:#666">{text}</span>',
+            showarrow=False, xref='x', yref='y', xanchor=align
+        )
+    for x, y, color, name in [(pm10_percent, 1, '#ff9800', 'PM10'), (pm25_percent, 0.85, '#9c27b0', 'PM2.5')]:
+        fig.add_trace(go.Scatter(
+            x=[x], y=[y], mode='markers',
+            marker=dict(symbol='triangle-up', size=20, color=color, line=dict(color='white', width=2)),
+            showlegend=False, hoverinfo='skip', name=name
+        ))
+    fig.add_annotation(
+        x=100, y=1,
+        text='<span style="color:#ff9800; font-size:14px">▲</span> <span style="font-size:9px">미세먼지(PM10)</span>  '
+             '<span style="color:#9c27b0; font-size:14px">▲</span> <span style="font-size:9px">초미세먼지(PM2.5)</span>',
+        showarrow=False, xref='x', yref='y', xanchor='right'
+    )
+    return fig
+
+
+# =========================
+# 확인 / 벤치마크
+# =========================
+def colorscale_color(z):
+    """GRADIENT_STOPS 선형 보간 (Plotly heatmap colorscale과 같은 계산), z: 0~100"""
+    pos = z / 100
+    stops = [(p, tuple(int(v) for v in re.findall(r"\d+", c))) for p, c in GRADIENT_STOPS]
+    for (p0, c0), (p1, c1) in zip(stops, stops[1:]):
+        if p0 <= pos <= p1:
+            ratio = 0 if p1 == p0 else (pos - p0) / (p1 - p0)
+            return tuple(a + (b - a) * ratio for a, b in zip(c0, c1))
+    return stops[-1][1]
+
+
+def check():
+    failures = 0
+
+    def expect(what, ok):
+        nonlocal failures
+        if not ok:
+            failures += 1
+            print(f"불일치 [{what}]")
+
+    # 그라데이션 색: 예전 구현은 int()로 버리므로 채널마다 1 이하 차이까지 허용
+    base = build_gradient_bar_base()
+    heatmap = base.data[0]
+    expect("구간 수", len(heatmap.z[0]) == GRADIENT_SEGMENTS == 200)
+    for i, z in enumerate(heatmap.z[0]):
+        want = reference_segment_color(i / 200 * 100)
+        got = colorscale_color(z)
+        expect(f"구간 {i} 색 {got} vs {want}", all(abs(g - w) <= 1 for g, w in zip(got, want)))
+
+    for pm10, pm25 in [(0, 0), (12.5, 80.0), (100, 37.2)]:
+        old = reference_gradient_bar(pm10, pm25)
+        new = gradient_bar_figure(pm10, pm25, base.to_dict())
+        expect("주석", [a.to_plotly_json() for a in old.layout.annotations]
+               == [a.to_plotly_json() for a in new.layout.annotations])
+        expect("도형", [s.to_plotly_json() for s in old.layout.shapes] == [s.to_plotly_json() for s in new.layout.shapes])
+        old_markers = [(t.x[0], t.y[0], t.marker.color) for t in old.data if t.type == "scatter"]
+        marker = new.data[-1]
+        expect("화살표", old_markers == list(zip(marker.x, marker.y, marker.marker.color)))
+        expect("축 범위", (old.layout.xaxis.range, old.layout.yaxis.range) == (new.layout.xaxis.range, new.layout.yaxis.range))
+
+    print(f"그라데이션 {GRADIENT_SEGMENTS}구간 + 화살표 3가지 확인, 불일치 {failures}건")
+    return failures == 0
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(repeat):
+    # st.plotly_chart가 rerun마다 하는 일 = Figure 만들기 + to_dict() + JSON 직렬화
+    def rerun(build):
+        return lambda: build().to_json(validate=False)
+
+    base = build_gradient_bar_base().to_dict()
+    rows = [
+        ("예전 (Bar 200개)", lambda: reference_gradient_bar(42, 21)),
+        ("trace 하나 (바탕도 매번 만듦)", lambda: gradient_bar_figure(42, 21, build_gradient_bar_base().to_dict())),
+        ("trace 하나 + 캐시된 바탕", lambda: gradient_bar_figure(42, 21, base)),
+    ]
+    print(f"최선 {repeat}회 기준 (생성 = Figure 만들기, rerun = 생성 + JSON 직렬화)")
+    print(f"  {'':<30} {'생성':>9} {'rerun':>9} {'JSON':>10}")
+    for name, build in rows:
+        t_build = timed(build, repeat)
+        t_rerun = timed(rerun(build), repeat)
+        size = len(build().to_json(validate=False).encode("utf-8"))
+        print(f"  {name:<30} {t_build * 1000:7.1f}ms {t_rerun * 1000:7.1f}ms {size:>8,}B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="예전 구현과 결과 비교만 하고 종료")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check() else 1)
+    bench(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+keywords.Tokenizer 결과 확인 + 마이크로 벤치마크
+
+사용법:
+    python bench/keywords_bench.py --check                 # 예전 구현과 결과가 같은지 (다르면 exit 1)
+    python bench/keywords_bench.py --reviews 50000         # 가짜 리뷰로 속도 비교
+    python bench/keywords_bench.py --sqlite fisa_life.sqlite3   # 로컬 DB의 daily_reviews로 속도 비교
+
+비교 기준(reference_*)은 Tokenizer로 바꾸기 전 페이지에 있던 함수를 그대로 옮겨둔 것
+keywords.py 규칙(ENDINGS/STOPWORDS)을 바꾸면 reference 쪽도 같이 바꿀 것
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keywords import ENDINGS, STOPWORDS, Tokenizer
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keyword_corpus.txt")
+
+
+# =========================
+# 비교 기준 (예전 구현)
+# =========================
+def reference_normalize(token):
+    for end in ENDINGS:
+        if token.endswith(end):
+            return token[: -len(end)]
+    return token
+
+
+def reference_tokenize(text):
+    text = re.sub(r"[^가-힣a-zA-Z ]", "", text)
+    tokens = []
+    for t in text.split():
+        t = reference_normalize(t)
+        if 2 <= len(t) <= 6 and t not in STOPWORDS:
+            tokens.append(t)
+    return tokens
+
+
+def reference_extract_keywords(texts, top_n=5):
+    words = []
+    for text in texts:
+        words.extend(reference_tokenize(text))
+    return [w for w, _ in Counter(words).most_common(top_n)]
+
+
+# =========================
+# 말뭉치
+# =========================
+STEMS = [
+    "SQL", "JOIN", "Streamlit", "파이썬", "판다스", "시각화", "머신러닝", "딥러닝", "크롤링",
+    "API", "도커", "리눅스", "네트워크", "알고리즘", "자료구조", "깃허브", "인덱스", "프로젝트",
+    "데이터베이스", "쿼리", "사용", "활용", "배", "정리", "복습", "오늘", "수업", "것", "등",
+]
+PUNCT = ["", "", "", ".", "!", "?", ",", "~", "^^", "ㅋㅋ", "123", "(", ")", "#"]
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+
+
+def synthetic_reviews(n, rng):
+    # 어간 + (어미 여러 개 이어붙이기 포함) + 특수문자 조합
+    def word():
+        w = rng.choice(STEMS)
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            w += rng.choice(ENDINGS)
+        return rng.choice(PUNCT) + w + rng.choice(PUNCT)
+    return [" ".join(word() for _ in range(rng.randint(1, 15))) for _ in range(n)]
+
+
+def load_sqlite_reviews(path):
+    from db import SQLiteStorage
+    storage = SQLiteStorage(path)
+    return [review for (review,) in storage.iter_rows("SELECT review FROM daily_reviews")]
+
+
+# =========================
+# 확인 / 벤치마크
+# =========================
+def check(texts):
+    tok = Tokenizer(cache_size=256)   # 작은 캐시로 교체(evict)가 일어나는 경우까지 확인
+    failures = 0
+
+    def expect(what, got, want):
+        nonlocal failures
+        if got != want:
+            failures += 1
+            if failures <= 20:
+                print(f"불일치 [{what}]\n  got:  {got!r}\n  want: {want!r}")
+
+    for text in texts:
+        for raw in text.split():
+            expect(f"normalize {raw!r}", tok.normalize(raw), reference_normalize(raw))
+        expect(f"tokenize {text!r}", tok.tokenize(text), reference_tokenize(text))
+    expect("tokenize_many", tok.tokenize_many(texts), [reference_tokenize(t) for t in texts])
+    for top_n in (5, 20, 100):
+        expect(f"extract_keywords top {top_n}", tok.extract_keywords(texts, top_n),
+               reference_extract_keywords(texts, top_n))
+    for i in range(0, len(texts), 97):
+        chunk = texts[i:i + 97]
+        expect(f"extract_keywords chunk {i}", tok.extract_keywords(chunk), reference_extract_keywords(chunk))
+
+    print(f"{len(texts)}개 리뷰 확인, 불일치 {failures}건")
+    return failures == 0
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(texts, repeat):
+    print(f"리뷰 {len(texts)}개, 최선 {repeat}회 기준")
+    rows = [
+        ("reference_extract_keywords", lambda: reference_extract_keywords(texts)),
+        ("Tokenizer (캐시 없이 시작)", lambda: Tokenizer().extract_keywords(texts)),
+    ]
+    warm = Tokenizer()
+    warm.extract_keywords(texts)
+    rows += [
+        ("Tokenizer.extract_keywords", lambda: warm.extract_keywords(texts)),
+        ("Tokenizer.tokenize_many", lambda: warm.tokenize_many(texts)),
+    ]
+    base = None
+    for name, fn in rows:
+        t = timed(fn, repeat)
+        base = base or t
+        print(f"  {name:<30} {t * 1000:9.1f} ms  x{base / t:5.1f}")
+    info = warm.keyword.cache_info()
+    print(f"  토큰 캐시: {info.currsize}개, hit {info.hits} / miss {info.misses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="예전 구현과 결과 비교만 하고 종료")
+    parser.add_argument("--reviews", type=int, default=20000, help="가짜 리뷰 개수")
+    parser.add_argument("--sqlite", help="가짜 리뷰 대신 이 SQLite DB의 daily_reviews 사용")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.check:
+        texts = load_corpus() + synthetic_reviews(args.reviews, rng)
+        sys.exit(0 if check(texts) else 1)
+
+    texts = load_sqlite_reviews(args.sqlite) if args.sqlite else synthetic_reviews(args.reviews, rng)
+    bench(texts, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
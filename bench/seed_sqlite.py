@@ -0,0 +1,110 @@
+"""
+로컬 벤치마크용 SQLite DB 생성 + 가짜 데이터 채우기
+
+사용법:
+    python bench/seed_sqlite.py --path fisa_life.sqlite3 --reviews 20000
+    FISA_DB_BACKEND=sqlite FISA_SQLITE_PATH=fisa_life.sqlite3 streamlit run main.py
+
+읽기/쓰기 분리 확인용 (레플리카 파일을 primary 복사본으로 같이 생성):
+    python bench/seed_sqlite.py --path fisa_life.sqlite3 --replica fisa_life_replica.sqlite3
+    FISA_DB_BACKEND=sqlite FISA_SQLITE_PATH=fisa_life.sqlite3 \
+        FISA_SQLITE_REPLICA_PATH=fisa_life_replica.sqlite3 streamlit run main.py
+
+MySQL 없이도 페이지 성능과 쿼리 플랜(Storage.explain)을 확인할 수 있음
+
+리뷰/칭찬/좌석 리뷰/링크는 앱과 같은 Storage.insert_* 메서드로 넣으므로
+파생 테이블(review_keyword_counts, keyword_doc_freq, daily_review_rollups, compliment_word_freq,
+search_postings)도 같이 채워짐
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import SQLiteStorage
+
+WORDS = [
+    "SQL", "JOIN", "Streamlit", "파이썬", "판다스", "시각화", "머신러닝", "딥러닝",
+    "크롤링", "API", "도커", "리눅스", "네트워크", "알고리즘", "자료구조", "깃허브",
+    "배웠다", "실습을", "어려웠다", "재밌었다", "프로젝트", "데이터베이스", "인덱스",
+]
+CATEGORIES = [
+    ("contest", "공모전"), ("coding_test", "코딩테스트"), ("ai_issue", "AI 이슈"),
+    ("dev_tool", "개발 도구"), ("playlist", "플레이리스트"),
+]
+
+
+def random_sentence(rng, n_words=8):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def seed(storage, reviews, compliments, seat_reviews, links, students, days, rng):
+    start = datetime.date.today() - datetime.timedelta(days=days - 1)
+
+    # 기준 데이터 (파생 테이블 없음)
+    with storage.connection() as conn, conn.cursor() as cur:
+        conn.begin()
+        cur.executemany(
+            "INSERT INTO seats (seat_code, row_no, col_no) VALUES (%s, %s, %s)",
+            [(f"{chr(ord('A') + r - 1)}{c}", r, c) for r in range(1, 10) for c in range(1, 5)]
+        )
+        cur.executemany(
+            "INSERT INTO seat_students (name) VALUES (%s)",
+            [(f"학생{i:02d}",) for i in range(1, students + 1)]
+        )
+        cur.executemany(
+            "INSERT INTO useful_categories (category_key, category_name, sort_order) VALUES (%s, %s, %s)",
+            [(key, name, i) for i, (key, name) in enumerate(CATEGORIES)]
+        )
+        cur.executemany(
+            "INSERT INTO caffeine (drink_name, caffeine_mg) VALUES (%s, %s)",
+            [(f"음료{i}", rng.randint(20, 250)) for i in range(1, 11)]
+        )
+        conn.commit()
+
+    # 사용자 데이터: 앱의 쓰기 경로 그대로 (키워드 집계, 롤업, 단어 빈도, 검색 색인 포함)
+    storage.insert_daily_reviews([
+        (start + datetime.timedelta(days=rng.randrange(days)), random_sentence(rng), rng.randint(1, 5))
+        for _ in range(reviews)
+    ])
+    storage.insert_compliments([(random_sentence(rng, 5),) for _ in range(compliments)])
+    storage.insert_seat_reviews(
+        [(rng.randint(1, 36), rng.randint(1, 5), random_sentence(rng, 4)) for _ in range(seat_reviews)]
+    )
+    storage.insert_links([
+        (rng.randint(1, len(CATEGORIES)), random_sentence(rng, 3),
+         f"https://example.com/{i}", random_sentence(rng, 5), None)
+        for i in range(links)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="fisa_life.sqlite3")
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--compliments", type=int, default=5000)
+    parser.add_argument("--seat-reviews", type=int, default=5000)
+    parser.add_argument("--links", type=int, default=1000)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replica", help="같은 내용의 레플리카 파일도 만듦 (읽기/쓰기 분리 테스트용)")
+    args = parser.parse_args()
+
+    for path in filter(None, [args.path, args.replica]):
+        if os.path.exists(path):
+            sys.exit(f"{path} 이(가) 이미 있습니다. 지우고 다시 실행하세요.")
+
+    storage = SQLiteStorage(args.path, replica_path=args.replica)
+    seed(storage, args.reviews, args.compliments, args.seat_reviews, args.links,
+         args.students, args.days, random.Random(args.seed))
+    print(f"{args.path} 생성 완료")
+    if args.replica:
+        storage.sync_replica()
+        print(f"{args.replica} 생성 완료 (레플리카)")
+
+
+if __name__ == "__main__":
+    main()
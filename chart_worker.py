@@ -0,0 +1,32 @@
+"""
+charts.BackgroundChartRenderer의 렌더링 프로세스 진입점
+
+    python -m chart_worker <연결 fd>
+
+부모가 넘겨준 연결로 (함수, 인자)를 받아서 실행하고 ("ok", 결과) 또는 ("error", 오류 문자열)을 돌려줌
+함수는 모듈 수준 함수여야 함 (pickle은 모듈 이름 + 함수 이름으로 넘기므로 여기서 그 모듈을 import함)
+
+multiprocessing spawn은 자식에서 부모의 __main__을 다시 실행하는데, 스트림릿 서버의 __main__은
+실행 중인 페이지 스크립트라서 전용 진입 모듈로 띄움 (페이지가 워커에서 다시 실행되지 않음)
+"""
+import sys
+from multiprocessing.connection import Connection
+
+
+def main(fd):
+    conn = Connection(fd)
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            return   # 부모가 연결을 닫음 (서버 종료)
+        try:
+            result = ("ok", fn(*args))
+        except Exception as e:
+            # 예외 객체는 pickle이 안 될 수 있으므로 문자열로
+            result = ("error", repr(e))
+        conn.send(result)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]))
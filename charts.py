@@ -0,0 +1,580 @@
+import atexit
+import concurrent.futures
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from cachetools import LRUCache
+from wordcloud import WordCloud
+
+_log = logging.getLogger("fisa.charts")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# =========================
+# 렌더링한 차트(PNG) 캐시
+# =========================
+# 1_오늘의요약 난이도 파이/추이, 6_복복복 워드클라우드처럼 데이터가 같으면 그림도 같은 차트를
+# rerun마다 다시 그리지 않도록 PNG 바이트를 캐시해서 st.image로 보여줌
+# - 키: 차트 이름 + 입력 데이터의 내용 해시 (데이터가 바뀌면 키가 바뀌므로 따로 무효화할 것 없음)
+# - 메모리: 바이트 수 기준 LRU (프로세스 전역, 모든 세션이 공유)
+# - 디스크(선택): 재시작해도 남도록 cache_dir/<이름>-<해시>.png, 파일 수가 넘치면 오래된 것부터 삭제
+# 그리는 코드를 바꾸면 차트 이름 뒤 버전(예: "difficulty_pie.v2")을 올려서 예전 그림을 쓰지 않게 할 것
+
+DEFAULT_CHART_CACHE_BYTES = 64 * 1024 * 1024   # 메모리에 둘 PNG 총 크기
+DEFAULT_CHART_DISK_FILES = 500                 # 디스크에 남겨둘 PNG 파일 수
+CHART_DPI = 200                                # st.pyplot 기본값과 같게
+DEFAULT_RENDER_WORKERS = 1                     # 백그라운드 렌더링 프로세스 수
+RENDER_RETRY_BACKOFF = 30                      # 렌더링이 실패한 그림을 다시 그리기까지 기다리는 초 (실패할 때마다 2배)
+RENDER_RETRY_MAX_BACKOFF = 600
+DEFAULT_SERIES_POINTS = 500                    # 시계열 차트 한 계열에 보내는 최대 점 수 (차트 폭 px 정도면 충분)
+
+
+def content_hash(data):
+    """차트 입력 데이터의 내용 해시 (dict 키 순서와 상관없이 같은 데이터면 같은 값)"""
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """
+    차트 PNG 캐시 (메모리 LRU + 선택적 디스크)
+
+    같은 키를 여러 세션이 동시에 처음 요청하면 각자 그릴 수 있음 (결과가 같으므로 나중 것이 덮어씀)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CHART_CACHE_BYTES, disk_dir=None, max_disk_files=DEFAULT_CHART_DISK_FILES):
+        self._mem = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._lock = threading.Lock()
+        self.disk_dir = disk_dir
+        self.max_disk_files = max_disk_files
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, name, key):
+        """(name, key)의 PNG 바이트 (메모리 → 디스크 순, 없으면 None)"""
+        cache_key = f"{name}-{key}"
+        with self._lock:
+            png = self._mem.get(cache_key)
+        if png is None:
+            png = self._read_disk(cache_key)
+            if png is not None:
+                self._remember(cache_key, png)
+        return png
+
+    def put(self, name, key, png):
+        cache_key = f"{name}-{key}"
+        self._write_disk(cache_key, png)
+        self._remember(cache_key, png)
+
+    def _remember(self, cache_key, png):
+        with self._lock:
+            if len(png) <= self._mem.maxsize:
+                self._mem[cache_key] = png
+
+    def get_or_render(self, name, key, draw):
+        """
+        (name, key)의 PNG 바이트, 없으면 draw()로 그려서 캐시
+
+        - key: content_hash()한 입력 데이터 해시
+        - draw(): matplotlib Figure를 반환 (닫는 것은 여기서)
+        """
+        png = self.get(name, key)
+        if png is None:
+            fig = draw()
+            try:
+                buf = io.BytesIO()
+                fig.savefig(buf, format="png", dpi=CHART_DPI, bbox_inches="tight")
+                png = buf.getvalue()
+            finally:
+                plt.close(fig)
+            self.put(name, key, png)
+        return png
+
+    # ---------- 디스크 ----------
+    def _path(self, cache_key):
+        return os.path.join(self.disk_dir, f"{cache_key}.png")
+
+    def _read_disk(self, cache_key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(cache_key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, cache_key, png):
+        if not self.disk_dir:
+            return
+        # 임시 파일에 다 쓴 뒤 이름 변경 (다른 프로세스가 반쯤 쓴 파일을 읽지 않도록)
+        path = self._path(cache_key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+        self._prune_disk()
+
+    def _prune_disk(self):
+        try:
+            entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".png")]
+        except FileNotFoundError:
+            return
+        if len(entries) <= self.max_disk_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - self.max_disk_files]:
+            try:
+                os.remove(e.path)
+            except FileNotFoundError:
+                pass   # 다른 프로세스가 먼저 지움
+
+
+def _charts_cfg():
+    try:
+        return dict(st.secrets["charts"])
+    except Exception:
+        return {}
+
+
+@st.cache_resource
+def get_chart_cache():
+    """
+    프로세스 전역 차트 캐시
+
+    디스크 경로: 환경변수 FISA_CHART_CACHE_DIR > secrets.toml [charts] cache_dir > 없음(메모리만)
+    """
+    cfg = _charts_cfg()
+    return ChartCache(
+        max_bytes=int(cfg.get("max_bytes", DEFAULT_CHART_CACHE_BYTES)),
+        disk_dir=os.getenv("FISA_CHART_CACHE_DIR") or cfg.get("cache_dir"),
+        max_disk_files=int(cfg.get("max_disk_files", DEFAULT_CHART_DISK_FILES)),
+    )
+
+
+def cached_chart(name, key, draw):
+    """
+    key가 같으면 다시 그리지 않고 캐시된 PNG를 st.image로 표시
+
+    key: content_hash(입력 데이터), 입력이 큰 경우(칭찬 전체 텍스트 등)는 데이터 조회 캐시에
+    해시까지 같이 넣어두고 그 값을 넘김 (rerun마다 다시 해시하지 않도록)
+    """
+    png = get_chart_cache().get_or_render(name, key, draw)
+    st.image(png, width="stretch")
+
+
+# =========================
+# 백그라운드 렌더링 (프로세스 풀)
+# =========================
+# 워드클라우드처럼 한 번 그리는 데 수백 ms~초가 걸리는 차트는 페이지 rerun 안에서 그리지 않음
+# - 별도 프로세스(python -m chart_worker)에서 그려서 PNG 바이트만 받아옴 (GIL과 상관없이 다른 세션 rerun이 느려지지 않음)
+#   렌더 스레드마다 전용 프로세스 하나, 프로세스가 죽으면(OOM 등) 다음 요청 때 새로 띄움
+#   (multiprocessing spawn은 자식에서 부모의 __main__ = 스트림릿이 끼워둔 페이지 스크립트를 다시 실행하므로 쓰지 않음)
+# - 그리는 동안 페이지는 마지막으로 완성된 그림 + "다시 그리는 중" 표시
+# - 차트마다 한 번에 하나만 그리고, 그리는 중에 들어온 요청은 가장 최근 것 하나만 남겨서 이어서 그림
+# - 완성된 그림은 ChartCache에도 넣어서 재시작 후(디스크 사용 시)에도 바로 보여줌
+# - 그리다 실패한 그림(폰트 없음, 워커 OOM 등)은 기록해두고 latest()로 알려줌
+#   같은 그림은 RENDER_RETRY_BACKOFF(실패할 때마다 2배, 최대 RENDER_RETRY_MAX_BACKOFF) 동안 다시 그리지 않음
+
+
+class BackgroundChartRenderer:
+    def __init__(self, chart_cache, max_workers=DEFAULT_RENDER_WORKERS):
+        self._cache = chart_cache
+        self._max_workers = max_workers
+        self._pool = None
+        self._local = threading.local()   # 렌더 스레드별 _RenderProcess
+        self._processes = []
+        # 이미 끝난 future에 add_done_callback하면 콜백이 그 자리(락 안)에서 바로 불리므로 RLock
+        self._lock = threading.RLock()
+        self._latest = {}    # name -> (key, png): 마지막으로 완성된 그림
+        self._running = {}   # name -> key: 지금 그리는 중
+        self._next = {}      # name -> (key, fn, args): 지금 것이 끝나면 그릴 요청
+        self._failed = {}    # name -> (key, 실패 시각, 연속 실패 횟수, 오류): 마지막으로 실패한 그림
+
+    def _executor(self):
+        # self._lock 안에서 호출
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="chart-render"
+            )
+        return self._pool
+
+    def _render(self, fn, args):
+        # 렌더 스레드에서 실행: 이 스레드 전용 프로세스에 맡기고 결과를 기다림
+        process = getattr(self._local, "process", None)
+        if process is None or not process.alive():
+            process = self._local.process = _RenderProcess()
+            with self._lock:
+                self._processes = [p for p in self._processes if p.alive()] + [process]
+        return process.call(fn, args)
+
+    def request(self, name, key, fn, *args):
+        """
+        key 그림이 아직 없으면 백그라운드에서 fn(*args) (PNG 바이트를 반환하는 모듈 수준 함수)로 그림
+
+        이미 있거나 그리는 중이면 아무것도 안 함, 바로 리턴
+        """
+        with self._lock:
+            latest = self._latest.get(name)
+            if (latest and latest[0] == key) or self._running.get(name) == key:
+                return
+            failed = self._failed.get(name)
+            if failed and failed[0] == key and time.monotonic() < failed[1] + self._retry_delay(failed[2]):
+                return   # 방금 실패한 그림은 backoff 동안 다시 그리지 않음
+            png = self._cache.get(name, key)
+            if png is not None:
+                self._latest[name] = (key, png)
+                return
+            if name in self._running:
+                self._next[name] = (key, fn, args)
+                return
+            self._start(name, key, fn, args)
+
+    @staticmethod
+    def _retry_delay(attempts):
+        return min(RENDER_RETRY_MAX_BACKOFF, RENDER_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+    def _start(self, name, key, fn, args):
+        # self._lock 안에서 호출
+        self._running[name] = key
+        future = self._executor().submit(self._render, fn, args)
+        future.add_done_callback(lambda f: self._finished(name, key, f))
+
+    def _finished(self, name, key, future):
+        error = None
+        try:
+            png = future.result()
+        except Exception as e:
+            png, error = None, e
+        if png is not None:
+            self._cache.put(name, key, png)
+        with self._lock:
+            del self._running[name]
+            if png is not None:
+                self._latest[name] = (key, png)
+                self._failed.pop(name, None)
+            else:
+                failed = self._failed.get(name)
+                attempts = failed[2] + 1 if failed and failed[0] == key else 1
+                self._failed[name] = (key, time.monotonic(), attempts, repr(error))
+                _log.warning(json.dumps({
+                    "event": "chart_render_failed", "chart": name, "error": repr(error),
+                    "attempts": attempts, "retry_in": self._retry_delay(attempts),
+                }, ensure_ascii=False))
+            pending = self._next.pop(name, None)
+            if pending is not None and pending[0] != key:
+                self._start(name, *pending)
+
+    def latest(self, name, key):
+        """
+        (보여줄 PNG 바이트 또는 None, 그게 key의 그림인지, key 그림을 그리다 실패했으면 오류 문자열)
+
+        key 그림이 아직 없으면 마지막으로 완성된 다른 그림을 대신 돌려줌
+        오류가 있으면 backoff가 끝나 다시 그리기 시작할 때까지는 기다려도 그림이 나오지 않음
+        """
+        png = self._cache.get(name, key)
+        if png is not None:
+            return png, True, None
+        with self._lock:
+            latest = self._latest.get(name)
+            failed = self._failed.get(name)
+            error = failed[3] if failed and failed[0] == key and self._running.get(name) != key else None
+        return (latest[1] if latest else None), False, error
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            processes, self._processes = self._processes, []
+        for process in processes:
+            process.close()
+
+
+class RenderWorkerDied(RuntimeError):
+    """렌더링 프로세스가 결과를 보내기 전에 종료됨 (OOM 등)"""
+
+
+class _RenderProcess:
+    # chart_worker.py 프로세스 하나 + 연결, 한 번에 요청 하나 (렌더 스레드 하나가 전용으로 사용)
+    def __init__(self):
+        conn, child = multiprocessing.Pipe()
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, "-m", "chart_worker", str(child.fileno())],
+                cwd=BASE_DIR, pass_fds=(child.fileno(),),
+            )
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            child.close()
+        self._conn = conn
+
+    def alive(self):
+        return self._proc.poll() is None
+
+    def call(self, fn, args):
+        """fn(*args)를 워커에서 실행한 결과 (워커 쪽 예외는 RuntimeError, 워커가 죽으면 RenderWorkerDied)"""
+        try:
+            self._conn.send((fn, args))
+            status, value = self._conn.recv()
+        except (EOFError, OSError) as e:
+            self.close()
+            raise RenderWorkerDied(f"렌더링 프로세스 종료 (exit code {self._proc.wait()})") from e
+        if status == "error":
+            raise RuntimeError(value)
+        return value
+
+    def close(self):
+        # 연결을 닫으면 워커는 EOFError로 스스로 끝남, 그리는 중이면 기다리지 않고 종료
+        self._conn.close()
+        if self.alive():
+            self._proc.kill()
+        self._proc.wait()
+
+
+@st.cache_resource
+def get_chart_renderer():
+    """프로세스 전역 백그라운드 차트 렌더러 (get_chart_cache()와 같은 캐시를 사용)"""
+    renderer = BackgroundChartRenderer(get_chart_cache())
+    atexit.register(renderer.shutdown)
+    return renderer
+
+
+def render_wordcloud_png(frequencies, font_path, width, height, max_words):
+    """워커 프로세스에서 실행: {단어: 횟수}로 워드클라우드를 그려서 PNG 바이트로"""
+    wc = WordCloud(
+        font_path=font_path,
+        background_color="white",
+        width=width,
+        height=height,
+        max_words=max_words
+    ).generate_from_frequencies(frequencies)
+    buf = io.BytesIO()
+    wc.to_image().save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# =========================
+# 긴 시계열 줄이기 (LTTB)
+# =========================
+# 2_환기요정 추이 차트처럼 점이 수천 개인 시계열을 그대로 Plotly로 보내면 웹소켓 페이로드와 브라우저 렌더링이 무거움
+# Largest-Triangle-Three-Buckets: 구간(버킷)마다 앞뒤 점과 만드는 삼각형이 가장 큰 점 하나만 남김
+# → 평균/간격 샘플링과 달리 짧게 튄 봉우리/골짜기가 사라지지 않음
+
+
+def lttb_indices(x, y, n_out):
+    """
+    LTTB로 고른 점의 인덱스 (오름차순 numpy 배열, 처음/마지막 점은 항상 포함)
+
+    - x: 증가하는 숫자 (시각은 epoch 초), y: 값
+    - 점이 n_out개 이하이거나 n_out < 3이면 줄이지 않음
+    버킷 경계와 버킷별 평균은 누적합으로 한 번에 계산, 버킷마다의 선택은 직전 선택점에 의존하므로
+    버킷 수만큼만 반복 (반복 안은 numpy 연산, 원본 점 수만큼 파이썬 루프를 돌지 않음)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 처음/마지막 점을 뺀 1..n-2를 n_out-2개 버킷으로: 버킷 k = [edges[k], edges[k+1])
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # 버킷 k의 세 번째 꼭짓점 = 다음 버킷의 평균 (마지막 버킷은 마지막 점)
+    next_starts = np.append(starts[1:], n - 1)
+    next_ends = np.append(ends[1:], n)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = next_ends - next_starts
+    avg_x = (cum_x[next_ends] - cum_x[next_starts]) / counts
+    avg_y = (cum_y[next_ends] - cum_y[next_starts]) / counts
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        s, e = starts[k], ends[k]
+        ax, ay = x[a], y[a]
+        # 삼각형 (직전 선택점, 버킷 안의 점, 다음 버킷 평균) 넓이의 2배
+        area = np.abs((ax - avg_x[k]) * (y[s:e] - ay) - (ax - x[s:e]) * (avg_y[k] - ay))
+        a = s + int(np.argmax(area))
+        out[k + 1] = a
+    return out
+
+
+def downsample_series(times, series, n_out=DEFAULT_SERIES_POINTS):
+    """
+    시각 목록 + {이름: 값 목록} → {이름: (시각 목록, 값 목록)}, 계열마다 n_out개 이하로
+
+    봉우리 위치가 계열마다 다르므로 계열별로 따로 고름 (Plotly trace마다 x가 달라도 됨)
+    """
+    x = np.asarray(times, dtype="datetime64[s]").astype(np.int64)
+    result = {}
+    for name, values in series.items():
+        idx = lttb_indices(x, values, n_out)
+        result[name] = ([times[i] for i in idx], [values[i] for i in idx])
+    return result
+
+
+# =========================
+# 미세먼지 그라데이션 바 (Plotly)
+# =========================
+# 2_환기요정 상단의 얇은 그라데이션 바
+# - 바/이모지/기준치/구분선/범례는 측정값과 상관없이 같으므로 한 번만 만들어서 프로세스 전역으로 재사용
+# - 측정값마다 바뀌는 것은 PM10/PM2.5 화살표(trace 하나)뿐
+# - 그라데이션은 구간 수만큼의 셀을 가진 heatmap trace 하나 (색은 GRADIENT_STOPS 사이를 선형 보간)
+
+# (위치 0~1, 색): 좋음(파랑) → 보통(초록, 25~50 구간은 같은 색) → 나쁨(주황) → 매우나쁨(빨강)
+GRADIENT_STOPS = [
+    (0.0, "rgb(0,191,255)"),
+    (0.25, "rgb(146,208,80)"),
+    (0.5, "rgb(146,208,80)"),
+    (0.75, "rgb(255,165,0)"),
+    (1.0, "rgb(255,0,0)"),
+]
+GRADIENT_SEGMENTS = 200   # 그라데이션 셀 수
+PM_MARKERS = [("#ff9800", 1.0), ("#9c27b0", 0.85)]   # PM10, PM2.5 화살표 (색, y)
+
+
+def build_gradient_bar_base():
+    """측정값과 상관없는 부분만 그린 그라데이션 바 Figure (get_gradient_bar_base()로 캐시해서 사용)"""
+    fig = go.Figure()
+
+    # 0~100을 GRADIENT_SEGMENTS칸으로 나눈 heatmap 한 줄 (x, y는 칸 경계, z는 칸 왼쪽 위치)
+    edges = np.linspace(0, 100, GRADIENT_SEGMENTS + 1)
+    fig.add_trace(go.Heatmap(
+        x=edges,
+        y=[1.6, 2.4],
+        z=[edges[:-1]],
+        zmin=0,
+        zmax=100,
+        colorscale=[[pos, color] for pos, color in GRADIENT_STOPS],
+        showscale=False,
+        hoverinfo='skip'
+    ))
+
+    # 양쪽 끝 둥글게
+    fig.add_shape(
+        type="circle",
+        xref="x", yref="y",
+        x0=-2, y0=1.6, x1=2, y1=2.4,
+        fillcolor=GRADIENT_STOPS[0][1],
+        line=dict(width=0)
+    )
+    fig.add_shape(
+        type="circle",
+        xref="x", yref="y",
+        x0=98, y0=1.6, x1=102, y1=2.4,
+        fillcolor=GRADIENT_STOPS[-1][1],
+        line=dict(width=0)
+    )
+
+    # 레이아웃 설정
+    fig.update_layout(
+        height=150,
+        margin=dict(l=10, r=10, t=60, b=0),
+        xaxis=dict(
+            range=[-3, 103],
+            showticklabels=False,
+            showgrid=False,
+            zeroline=False
+        ),
+        yaxis=dict(
+            showticklabels=False,
+            showgrid=False,
+            fixedrange=True,
+            range=[-0.3, 3]
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+
+    # 등급 구분선
+    for x in [25, 50, 75]:
+        fig.add_shape(
+            type="line",
+            x0=x, y0=1.6, x1=x, y1=2.4,
+            line=dict(color="rgba(255,255,255,0.8)", width=2, dash="dash")
+        )
+
+    # 상단 이모지 + 등급
+    emoji_labels = [
+        ('😊', '좋음', 12.5),
+        ('🙂', '보통', 37.5),
+        ('😷', '나쁨', 62.5),
+        ('🚨', '매우나쁨', 87.5)
+    ]
+    for emoji, label, pos in emoji_labels:
+        fig.add_annotation(
+            x=pos, y=3.0,
+            text=f'<span style="font-size:15px">{emoji}</span><br><span style="font-size:12px">{label}</span>',
+            showarrow=False,
+            xref='x', yref='y'
+        )
+
+    # 중단 기준치 숫자
+    thresholds = [
+        (0, '0', 'left'),
+        (25, '30/15', 'center'),
+        (50, '80/35', 'center'),
+        (75, '150/75', 'center')
+    ]
+    for pos, text, align in thresholds:
+        fig.add_annotation(
+            x=pos, y=2.5,
+            text=f'<span style="font-size:12px; color:#666">{text}</span>',
+            showarrow=False,
+            xref='x', yref='y',
+            xanchor=align
+        )
+
+    # 우측 하단 범례
+    fig.add_annotation(
+        x=100, y=1,
+        text='<span style="color:#ff9800; font-size:14px">▲</span> <span style="font-size:9px">미세먼지(PM10)</span>  '
+             '<span style="color:#9c27b0; font-size:14px">▲</span> <span style="font-size:9px">초미세먼지(PM2.5)</span>',
+        showarrow=False,
+        xref='x', yref='y',
+        xanchor='right'
+    )
+    return fig
+
+
+@st.cache_resource
+def get_gradient_bar_base():
+    """프로세스 전역 그라데이션 바 바탕 (Figure.to_dict(), gradient_bar_figure()가 복사해서 씀)"""
+    return build_gradient_bar_base().to_dict()
+
+
+def gradient_bar_figure(pm10_percent, pm25_percent, base=None):
+    """바탕(base: build_gradient_bar_base().to_dict(), 기본은 캐시된 것)에 PM10/PM2.5 화살표만 얹은 Figure"""
+    # 바탕은 이미 검증된 Figure에서 만든 dict이므로 다시 검증하지 않음 (검증하면 복사만 ~10ms)
+    # dict에서 만든 Figure를 고쳐도 원본 dict는 바뀌지 않음
+    fig = go.Figure(base if base is not None else get_gradient_bar_base(), _validate=False)
+    fig.add_trace(go.Scatter(
+        x=[pm10_percent, pm25_percent],
+        y=[y for _, y in PM_MARKERS],
+        mode='markers',
+        marker=dict(
+            symbol='triangle-up',
+            size=20,
+            color=[color for color, _ in PM_MARKERS],
+            line=dict(color='white', width=2)
+        ),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    return fig
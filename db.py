@@ -1,10 +1,115 @@
+import atexit
+import collections
+import csv
+import datetime
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import queue
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+import tomllib
+
 import mysql.connector
 import streamlit as st
 import pymysql
+import pyarrow as pa
+from cachetools import TTLCache
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from keywords import TOKENIZER, cloud_word_counts, rank_tfidf
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SQLITE_PATH = os.path.join(BASE_DIR, "fisa_life.sqlite3")
+
+# 풀 기본값 (secrets.toml [mysql] 섹션에서 덮어쓰기 가능)
+DEFAULT_POOL_SIZE = 10        # 프로세스당 최대 커넥션 수
+DEFAULT_POOL_TIMEOUT = 5.0    # 빈 커넥션을 기다리는 최대 시간(초)
+DEFAULT_POOL_RECYCLE = 3600   # 커넥션 최대 수명(초), MySQL wait_timeout보다 짧게
+DEFAULT_REPLICA_STICKY_SECONDS = 5.0  # 쓰기 후 이 시간 동안은 레플리카 대신 primary에서 조회 (복제 지연 상한)
+
+# 조회 캐시 TTL(초): 쓰기 경로에서 바로 무효화하므로 TTL은 안전장치 역할
+CACHE_TTLS = {
+    "useful_categories": 600,
+    "useful_links": 300,
+    "compliments": 300,
+    "compliment_word_freq": 300,
+    "seats": 600,
+    "seat_students": 600,
+    "seat_assignments": 300,
+    "seat_reviews": 300,
+    "daily_reviews": 300,
+    "review_keyword_counts": 300,
+    "daily_review_rollups": 300,
+    "caffeine": 3600,
+    "air_readings": 300,
+}
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_MAXSIZE = 256   # 테이블별 최대 캐시 항목 수
+ARROW_BATCH_SIZE = 4096       # fetch_arrow()가 한 번에 읽어서 RecordBatch로 만드는 행 수
+STREAM_CHUNK_SIZE = 1000      # iter_rows()/iter_chunks()가 한 번에 받아오는 행 수 (= 메모리 상한)
+DEFAULT_QUERY_BUDGET = 10     # rerun 한 번에 허용하는 쿼리 수 (secrets.toml [query_budget]에서 페이지별로 조정)
+DATA_VERSION_POLL_INTERVAL = 1.0  # data_versions 조회 최소 간격(초), 동시 rerun끼리 한 번의 조회를 공유
+RANDOM_PICK_ATTEMPTS = 8      # 랜덤 칭찬: 빈 id/이미 본 id일 때 다시 뽑는 횟수 (넘으면 id 순으로 훑기)
+
+# 쓰기 지연 큐 (폼 제출 → 로컬 스풀 → 배치로 DB 반영)
+DEFAULT_SPOOL_PATH = os.path.join(BASE_DIR, "fisa_spool.sqlite3")
+WRITE_BEHIND_LINGER = 0.2        # 제출 후 같은 배치로 묶을 다른 제출을 기다리는 시간(초)
+WRITE_BEHIND_BATCH_SIZE = 200    # 한 번에 DB로 보내는 최대 건수
+WRITE_BEHIND_RETRY_INTERVAL = 5.0  # 실패한 배치를 다시 시도하는 최소 간격(초)
+WRITE_BEHIND_MAX_BACKOFF = 60.0  # DB 장애가 길어질 때 재시도 간격 상한(초)
+WRITE_BEHIND_MAX_ATTEMPTS = 100  # 한 줄을 이만큼 시도해도 안 되면 failed=1 (max_backoff 기준 1시간 반 이상)
+
+# 이 예외가 나면 커넥션 자체가 망가졌다고 보고 풀에 돌려놓지 않음
+_CONNECTION_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError, sqlite3.OperationalError)
+
+
+# =========================
+# 접속 정보 로드
+# =========================
+def load_mysql_cfg(section="mysql", required=True):
+    """
+    MySQL 접속 정보를 로드하는 함수
+
+    우선순위:
+    1) st.secrets[section] (Streamlit Cloud / 로컬 .streamlit/secrets.toml 자동 로드)
+    2) (대안) pages/.streamlit/secrets.toml을 직접 읽어서 로드
+
+    required=False면 섹션이 없을 때 멈추지 않고 None 반환 (선택 설정인 [mysql_replica] 등)
+    """
+    try:
+        return dict(st.secrets[section])
+    except Exception:
+        # secrets가 없거나 키가 없을 때는 2번 방식으로 넘어감
+        pass
+
+    secrets_path = os.path.join(BASE_DIR, "pages", ".streamlit", "secrets.toml")
+    if not os.path.exists(secrets_path):
+        if not required:
+            return None
+        st.error(f"secrets.toml 없음: {secrets_path}")
+        st.stop()
+
+    with open(secrets_path, "rb") as f:
+        data = tomllib.load(f)
 
+    if section not in data:
+        if not required:
+            return None
+        st.error(f"secrets.toml에 [{section}] 섹션이 없습니다.")
+        st.stop()
 
-def get_connection():
-    cfg = st.secrets["mysql"]
+    return dict(data[section])
+
+
+def _connect_mysql(cfg):
     return pymysql.connect(
         host=cfg["host"],
         port=int(cfg.get("port", 3306)),
@@ -14,4 +119,2724 @@ def get_connection():
         charset="utf8mb4",
         cursorclass=pymysql.cursors.DictCursor,  # ✅ 이거 꼭!
         autocommit=True,
+        connect_timeout=int(cfg.get("connect_timeout", 5)),
+        read_timeout=int(cfg.get("read_timeout", 10)),
+        write_timeout=int(cfg.get("write_timeout", 10)),
     )
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+# =========================
+# 커넥션 풀
+# =========================
+class ConnectionPool:
+    """
+    프로세스 전역에서 공유하는 커넥션 풀
+
+    - size: 동시에 열 수 있는 최대 커넥션 수 (MySQL max_connections 보호)
+    - timeout: 풀이 가득 찼을 때 커넥션 반납을 기다리는 최대 시간(초)
+    - recycle: 커넥션 최대 수명(초). 지나면 닫고 새로 연결
+    - ping: 꺼낼 때마다 ping으로 끊긴 커넥션을 걸러냄
+    """
+
+    def __init__(self, connect, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 recycle=DEFAULT_POOL_RECYCLE, ping=True):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping = ping
+        # LIFO: 최근에 쓴 커넥션부터 재사용해야 오래 놀던 커넥션이 자연스럽게 만료됨
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"DB 커넥션 대기 시간 초과 ({timeout}초, pool size={self.size})")
+        try:
+            raw, created_at = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def _checkout(self):
+        while True:
+            try:
+                raw, created_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), time.monotonic()
+
+            if self.recycle and time.monotonic() - created_at > self.recycle:
+                _close_quietly(raw)
+                continue
+            if self.ping:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    _close_quietly(raw)
+                    continue
+            return raw, created_at
+
+    def release(self, raw, created_at, broken=False):
+        try:
+            if broken or not raw.open:
+                _close_quietly(raw)
+            else:
+                self._idle.put((raw, created_at))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                raw, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close_quietly(raw)
+
+
+class PooledConnection:
+    """
+    풀에서 꺼낸 커넥션 래퍼
+
+    - close(): 실제로 닫지 않고 풀에 반납
+    - with 문으로 쓰면 블록이 끝날 때 자동 반납
+    - cursor(): 쿼리 통계를 기록하는 InstrumentedCursor로 감싸서 반환
+    - 그 외 commit() 등은 원본 커넥션으로 그대로 위임
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._broken = False
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("이미 풀에 반납된 커넥션입니다.")
+        return getattr(self._raw, name)
+
+    def cursor(self, *args):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("이미 풀에 반납된 커넥션입니다.")
+        return InstrumentedCursor(self._raw.cursor(*args))
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool.release(raw, self._created_at, broken=self._broken)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, _CONNECTION_ERRORS):
+            self._broken = True
+        self.close()
+
+    def __del__(self):
+        # close() 없이 버려진 경우에도 풀 슬롯이 새지 않도록
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+# =========================
+# 쿼리 계측
+# =========================
+# - 풀에서 꺼낸 커넥션의 커서가 쿼리마다 SQL 지문, 실행 시간, 행 수, 호출 함수를 기록
+# - 페이지 상단 begin_query_stats() ~ 하단 report_query_stats() 사이(= rerun 한 번)를 묶어서 집계
+# - 집계 결과는 JSON 로그 한 줄로 남기고, ?debug=1 이면 사이드바에도 표시
+_query_log = logging.getLogger("fisa.queries")
+if not _query_log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _query_log.addHandler(_handler)
+    _query_log.setLevel(logging.INFO)
+    _query_log.propagate = False
+
+_stats_local = threading.local()
+_DB_MODULE_FILE = os.path.abspath(__file__)
+
+
+def sql_fingerprint(sql):
+    """공백/리터럴을 정규화해서 같은 모양의 쿼리끼리 묶을 수 있게 만든 SQL"""
+    sql = re.sub(r"\s+", " ", sql).strip().rstrip(";")
+    sql = re.sub(r"'[^']*'|\b\d+\b", "?", sql)
+    return sql.replace("%s", "?")
+
+
+def _calling_function():
+    # db.py 밖에서 처음 만나는 프레임 = 쿼리를 부른 페이지 쪽 함수
+    # (페이지 최상단에서 sync_data_versions() 등을 바로 부른 경우엔 그 db.py 함수 이름)
+    frame = sys._getframe(2)
+    inner = "<unknown>"
+    while frame is not None and os.path.abspath(frame.f_code.co_filename) == _DB_MODULE_FILE:
+        inner = frame.f_code.co_name
+        frame = frame.f_back
+    if frame is None or frame.f_code.co_name == "<module>":
+        return inner
+    return frame.f_code.co_name
+
+
+class RerunQueryStats:
+    """rerun 한 번 동안 실행된 쿼리 기록"""
+
+    def __init__(self, page, budget):
+        self.page = page
+        self.budget = budget
+        self.started_at = time.time()
+        self.queries = []    # {"sql", "ms", "rows", "caller"}
+        self.reported = False
+
+    def record(self, sql, duration_ms, rows, caller):
+        entry = {"sql": sql_fingerprint(sql), "ms": duration_ms, "rows": rows, "caller": caller}
+        self.queries.append(entry)
+        if len(self.queries) == self.budget + 1:
+            _query_log.warning(json.dumps({
+                "event": "query_budget_exceeded",
+                "page": self.page,
+                "budget": self.budget,
+                "caller": caller,
+            }, ensure_ascii=False))
+        return entry
+
+    @property
+    def over_budget(self):
+        return len(self.queries) > self.budget
+
+    def by_fingerprint(self):
+        """SQL 지문별 집계 (총 시간이 긴 순)"""
+        groups = {}
+        for q in self.queries:
+            g = groups.setdefault(q["sql"], {"sql": q["sql"], "count": 0, "ms": 0.0, "rows": 0, "callers": []})
+            g["count"] += 1
+            g["ms"] += q["ms"]
+            g["rows"] += q["rows"]
+            if q["caller"] not in g["callers"]:
+                g["callers"].append(q["caller"])
+        return sorted(groups.values(), key=lambda g: g["ms"], reverse=True)
+
+    def summary(self, finished=True):
+        return {
+            "event": "rerun_queries",
+            "page": self.page,
+            "finished": finished,
+            "queries": len(self.queries),
+            "budget": self.budget,
+            "over_budget": self.over_budget,
+            "total_ms": round(sum(q["ms"] for q in self.queries), 2),
+            "rows": sum(q["rows"] for q in self.queries),
+            "by_sql": [
+                dict(g, ms=round(g["ms"], 2)) for g in self.by_fingerprint()
+            ],
+        }
+
+
+class InstrumentedCursor:
+    """
+    DB 커서 래퍼: 현재 rerun의 RerunQueryStats에 쿼리를 기록
+
+    - 실행 시간: execute/executemany 구간
+    - 행 수: SELECT는 실제로 fetch한 행 수, 그 외는 rowcount
+    - begin_query_stats()가 없는 스레드(백그라운드 작업 등)에서는 기록 없이 그대로 실행
+    """
+
+    def __init__(self, cur):
+        self._cur = cur
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    def _run(self, method, sql, params):
+        stats = getattr(_stats_local, "stats", None)
+        run = getattr(self._cur, method)
+        if stats is None:
+            return run(sql) if params is None else run(sql, params)
+        start = time.perf_counter()
+        try:
+            return run(sql) if params is None else run(sql, params)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            is_select = sql.lstrip().upper().startswith(("SELECT", "WITH", "EXPLAIN"))
+            rows = 0 if is_select else max(self._cur.rowcount or 0, 0)
+            self._entry = stats.record(sql, duration_ms, rows, _calling_function())
+
+    def execute(self, sql, params=None):
+        return self._run("execute", sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._run("executemany", sql, seq_of_params)
+
+    def _fetched(self, n):
+        if self._entry is not None:
+            self._entry["rows"] += n
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is not None:
+            self._fetched(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._cur.fetchmany() if size is None else self._cur.fetchmany(size)
+        self._fetched(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cur.fetchall()
+        self._fetched(len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cur:
+            self._fetched(1)
+            yield row
+
+    def close(self):
+        self._cur.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _query_budget(page, budget):
+    try:
+        return int(st.secrets["query_budget"][page])
+    except Exception:
+        return DEFAULT_QUERY_BUDGET if budget is None else budget
+
+
+def _query_debug_enabled():
+    if os.getenv("FISA_QUERY_DEBUG") == "1":
+        return True
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def begin_query_stats(page, budget=None):
+    """
+    페이지 맨 위에서 호출: 이번 rerun의 쿼리 기록 시작
+
+    - budget: 이 페이지의 rerun당 쿼리 수 한도 (secrets.toml [query_budget]의 값이 우선)
+    - st.stop()/st.rerun()으로 직전 rerun이 report 없이 끝났으면 그 기록을 여기서 로그로 남김
+    """
+    pending = st.session_state.get("_query_stats")
+    if pending is not None and not pending.reported:
+        pending.reported = True
+        _query_log.info(json.dumps(pending.summary(finished=False), ensure_ascii=False))
+
+    stats = RerunQueryStats(page, _query_budget(page, budget))
+    st.session_state["_query_stats"] = stats
+    _stats_local.stats = stats
+    return stats
+
+
+def report_query_stats():
+    """페이지 맨 아래에서 호출: JSON 로그 한 줄 + (?debug=1 이면) 사이드바 디버그 패널"""
+    stats = getattr(_stats_local, "stats", None)
+    if stats is None or stats.reported:
+        return
+    stats.reported = True
+    _stats_local.stats = None
+    summary = stats.summary()
+    _query_log.info(json.dumps(summary, ensure_ascii=False))
+
+    if not _query_debug_enabled():
+        return
+    with st.sidebar.expander("🛠 쿼리 통계 (이번 rerun)", expanded=stats.over_budget):
+        c1, c2 = st.columns(2)
+        c1.metric("쿼리 수", f"{summary['queries']} / {summary['budget']}")
+        c2.metric("DB 시간", f"{summary['total_ms']:.1f} ms")
+        if stats.over_budget:
+            st.warning(f"쿼리 예산 초과: {summary['queries']}개 (한도 {summary['budget']}개)")
+        if summary["by_sql"]:
+            st.dataframe(
+                [
+                    {"SQL": g["sql"], "횟수": g["count"], "ms": g["ms"], "행": g["rows"],
+                     "호출": ", ".join(g["callers"])}
+                    for g in summary["by_sql"]
+                ],
+                hide_index=True,
+            )
+
+
+# =========================
+# SQLite 연결 (로컬 벤치마크용)
+# =========================
+# pymysql과 같은 방식으로 쓸 수 있도록 맞춤
+# - %s 플레이스홀더 그대로 사용 가능 (내부에서 ? 로 변환)
+# - fetch 결과는 dict
+# - DATE/TIMESTAMP/DATETIME 컬럼은 date/datetime으로 변환
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("DATETIME", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+def _to_qmark(sql):
+    return sql.replace("%s", "?")
+
+
+class SQLiteCursor:
+    def __init__(self, cur, as_dict=True):
+        self._cur = cur
+        self._row = dict if as_dict else tuple
+
+    def execute(self, sql, params=()):
+        self._cur.execute(_to_qmark(sql), tuple(params or ()))
+        return self.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        self._cur.executemany(_to_qmark(sql), [tuple(p) for p in seq_of_params])
+        return self.rowcount
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        return None if row is None else self._row(row)
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self._cur.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def __iter__(self):
+        return (self._row(r) for r in self._cur)
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def close(self):
+        self._cur.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(
+            path,
+            isolation_level=None,  # autocommit (pymysql autocommit=True와 동일하게)
+            check_same_thread=False,  # 풀에서 여러 스레드가 번갈아 사용
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self.open = True
+
+    def cursor(self, tuples=False):
+        # tuples=True: 행을 dict 대신 튜플로 (pymysql SSCursor 대응, fetch_arrow 등에서 사용)
+        return SQLiteCursor(self._conn.cursor(), as_dict=not tuples)
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1")
+
+    def begin(self):
+        self._conn.execute("BEGIN")
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.commit()
+
+    def rollback(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+    def close(self):
+        self.open = False
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# =========================
+# 조회 쿼리 목록 (EXPLAIN 점검 대상)
+# =========================
+QuerySpec = collections.namedtuple("QuerySpec", ["name", "sql", "sample_params", "full_scan_ok", "dialect"])
+REGISTERED_QUERIES = {}
+_SAMPLE_DATE = datetime.date(2000, 1, 1)
+
+
+def register_query(name, sql, sample_params=(), full_scan_ok=(), dialect=None):
+    """
+    페이지에서 쓰는 조회 쿼리를 등록하고 SQL을 그대로 반환
+
+    check_query_plans()가 등록된 쿼리를 모두 EXPLAIN해서 풀 테이블 스캔이 있으면 실패로 보고함
+    - sample_params: EXPLAIN에 넣을 예시 파라미터
+    - full_scan_ok: 풀 스캔을 허용할 테이블(쿼리 안의 별칭) 목록
+      (크기가 고정된 작은 테이블이거나, 전체를 읽는 것이 목적인 쿼리만)
+    - dialect: 한쪽 DB에서만 쓰는 쿼리면 Storage.name ("mysql"/"sqlite"), 다른 DB에서는 점검하지 않음
+    """
+    REGISTERED_QUERIES[name] = QuerySpec(name, sql, tuple(sample_params), tuple(full_scan_ok), dialect)
+    return sql
+
+
+SQL_DATA_VERSIONS = register_query(
+    "data_versions.all",
+    """
+    SELECT table_name, version FROM data_versions
+    """,
+    sample_params=(),
+    full_scan_ok=("data_versions",),  # 테이블 수만큼의 행
+)
+
+SQL_DAILY_REVIEW_SNAPSHOT = register_query(
+    "daily_reviews.snapshot",
+    """
+    SELECT review_date, review, difficulty,
+           COUNT(*) OVER (PARTITION BY difficulty) AS difficulty_count
+    FROM daily_reviews
+    WHERE review_date = %s
+    ORDER BY created_at DESC, id DESC
+    """,
+    sample_params=(_SAMPLE_DATE,),
+)
+
+SQL_KEYWORD_TFIDF_CANDIDATES = register_query(
+    "review_keyword_counts.tfidf_candidates",
+    """
+    SELECT k.token, SUM(k.count) AS total, MAX(COALESCE(d.doc_count, 0)) AS doc_count,
+           (SELECT n.doc_count FROM keyword_doc_freq n WHERE n.token = '*') AS n_docs
+    FROM review_keyword_counts k
+    LEFT JOIN keyword_doc_freq d ON d.token = k.token
+    WHERE k.review_date BETWEEN %s AND %s
+    GROUP BY k.token
+    """,
+    sample_params=(_SAMPLE_DATE, _SAMPLE_DATE),
+)
+
+SQL_KEYWORD_TOKENS_OF_DATE = register_query(
+    "review_keyword_counts.tokens_of_date",
+    """
+    SELECT token FROM review_keyword_counts WHERE review_date = %s
+    """,
+    sample_params=(_SAMPLE_DATE,),
+)
+
+SQL_KEYWORDS_ALL = register_query(
+    "review_keyword_counts.top_all",
+    """
+    SELECT token, SUM(count) AS total
+    FROM review_keyword_counts
+    GROUP BY token
+    ORDER BY total DESC, token
+    LIMIT %s
+    """,
+    sample_params=(5,),
+    full_scan_ok=("review_keyword_counts",),  # 기수 전체 키워드 (원문이 아닌 누적 테이블 전체)
+)
+
+SQL_REVIEW_ROLLUPS_BY_RANGE = register_query(
+    "daily_review_rollups.by_range",
+    """
+    SELECT review_date, review_count, difficulty_sum,
+           difficulty_1, difficulty_2, difficulty_3, difficulty_4, difficulty_5
+    FROM daily_review_rollups
+    WHERE review_date BETWEEN %s AND %s
+    ORDER BY review_date
+    """,
+    sample_params=(_SAMPLE_DATE, _SAMPLE_DATE),
+)
+
+# ---------- 전체 검색 (SEARCH_SOURCES 참고) ----------
+# MySQL: ngram FULLTEXT 인덱스 (natural language mode, 점수는 MySQL relevance)
+_SEARCH_MATCH = "MATCH({cols}) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+_MATCH_REVIEW = _SEARCH_MATCH.format(cols="review")
+_MATCH_COMMENT = _SEARCH_MATCH.format(cols="comment")
+_MATCH_LINK = _SEARCH_MATCH.format(cols="title, description")
+_MATCH_MESSAGE = _SEARCH_MATCH.format(cols="message")
+
+SQL_SEARCH_FULLTEXT = register_query(
+    "search.fulltext",
+    f"""
+    SELECT * FROM (
+        SELECT 'daily_reviews' AS source, id AS doc_id, NULL AS title, review AS body, NULL AS url,
+               created_at, {_MATCH_REVIEW} AS score
+        FROM daily_reviews WHERE {_MATCH_REVIEW}
+        UNION ALL
+        SELECT 'seat_reviews', review_id, NULL, comment, NULL, created_at, {_MATCH_COMMENT}
+        FROM seat_reviews WHERE {_MATCH_COMMENT}
+        UNION ALL
+        SELECT 'useful_links', link_id, title, description, url, created_at, {_MATCH_LINK}
+        FROM useful_links WHERE is_active = 1 AND {_MATCH_LINK}
+        UNION ALL
+        SELECT 'compliments', id, NULL, message, NULL, created_at, {_MATCH_MESSAGE}
+        FROM compliments WHERE {_MATCH_MESSAGE}
+    ) hits
+    ORDER BY score DESC, created_at DESC
+    LIMIT %s OFFSET %s
+    """,
+    sample_params=("파이썬",) * 8 + (10, 0),
+    full_scan_ok=("<derived2>", "<union2,3,4,5>"),  # UNION 중간 결과 (각 테이블은 fulltext 접근)
+    dialect="mysql",
+)
+
+SQL_SEARCH_FULLTEXT_TOTAL = register_query(
+    "search.fulltext_total",
+    f"""
+    SELECT (SELECT COUNT(*) FROM daily_reviews WHERE {_MATCH_REVIEW})
+         + (SELECT COUNT(*) FROM seat_reviews WHERE {_MATCH_COMMENT})
+         + (SELECT COUNT(*) FROM useful_links WHERE is_active = 1 AND {_MATCH_LINK})
+         + (SELECT COUNT(*) FROM compliments WHERE {_MATCH_MESSAGE}) AS total
+    """,
+    sample_params=("파이썬",) * 4,
+    dialect="mysql",
+)
+
+# SQLite: search_postings 역색인 (2-gram → 문서), 가중치 {gram: idf}는 JSON 객체로 넘김
+# - 점수는 BM25: 2-gram마다 idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * 문서 길이 / 평균 문서 길이))
+#   (문서 길이 = gram이 SEARCH_LENGTH_GRAM인 posting의 tf, 0012_search_doc_length.sqlite.sql)
+# - 비활성 링크는 순위/전체 개수에서 모두 뺌 (MySQL 쪽 is_active = 1 조건과 같게)
+SEARCH_LENGTH_GRAM = "*"   # 실제 2-gram은 한글/영문/숫자만이라 겹치지 않음
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_SEARCH_ACTIVE_ONLY = """
+    LEFT JOIN useful_links l ON p.source = 'useful_links' AND l.link_id = p.doc_id
+    WHERE p.source <> 'useful_links' OR l.is_active = 1
+"""
+SQL_SEARCH_DOC_FREQ = register_query(
+    "search_postings.doc_freq",
+    """
+    SELECT gram, COUNT(*) AS df,
+           (SELECT SUM(doc_count) FROM search_index_state) AS n_docs,
+           (SELECT SUM(gram_count) FROM search_index_state) AS n_grams
+    FROM search_postings
+    WHERE gram IN (SELECT value FROM json_each(%s))
+    GROUP BY gram
+    """,
+    sample_params=('["파이", "이썬"]',),
+    full_scan_ok=("json_each", "search_index_state"),  # 검색어 2-gram 목록 / 소스 4행
+    dialect="sqlite",
+)
+
+SQL_SEARCH_POSTINGS = register_query(
+    "search_postings.rank",
+    f"""
+    SELECT p.source, p.doc_id,
+           SUM(w.value * p.tf * ({_BM25_K1} + 1)
+               / (p.tf + {_BM25_K1} * (1 - {_BM25_B} + {_BM25_B} * d.tf / %s))) AS score,
+           COUNT(*) OVER () AS total
+    FROM json_each(%s) w
+    JOIN search_postings p ON p.gram = w.key
+    JOIN search_postings d ON d.gram = '{SEARCH_LENGTH_GRAM}' AND d.source = p.source AND d.doc_id = p.doc_id
+    {_SEARCH_ACTIVE_ONLY}
+    GROUP BY p.source, p.doc_id
+    ORDER BY score DESC, p.doc_id DESC
+    LIMIT %s OFFSET %s
+    """,
+    sample_params=(10.0, '{"파이": 1.0}', 10, 0),
+    full_scan_ok=("w",),  # 검색어 2-gram 목록
+    dialect="sqlite",
+)
+
+# 페이지가 결과 범위를 넘어가서 SQL_SEARCH_POSTINGS가 빈 결과일 때만 (보통은 total을 같이 받음)
+SQL_SEARCH_POSTINGS_TOTAL = register_query(
+    "search_postings.total",
+    f"""
+    SELECT COUNT(*) AS total FROM (
+        SELECT DISTINCT p.source, p.doc_id
+        FROM json_each(%s) w
+        JOIN search_postings p ON p.gram = w.key
+        {_SEARCH_ACTIVE_ONLY}
+    ) matched
+    """,
+    sample_params=('{"파이": 1.0}',),
+    full_scan_ok=("w", "matched"),
+    dialect="sqlite",
+)
+
+SQL_COMPLIMENT_MESSAGES = register_query(
+    "compliments.messages",
+    """
+    SELECT message FROM compliments
+    """,
+    sample_params=(),
+    full_scan_ok=("compliments",),  # compliment_word_freq 다시 만들 때 전체 조회
+)
+
+SQL_COMPLIMENT_TOP_WORDS = register_query(
+    "compliment_word_freq.top",
+    """
+    SELECT word, count FROM compliment_word_freq
+    ORDER BY count DESC
+    LIMIT %s
+    """,
+    sample_params=(200,),
+)
+
+SQL_COMPLIMENT_ID_RANGE = register_query(
+    "compliments.id_range",
+    """
+    SELECT (SELECT MIN(id) FROM compliments) AS lo,
+           (SELECT MAX(id) FROM compliments) AS hi
+    """,
+    sample_params=(),
+    full_scan_ok=("CONSTANT",),  # FROM 없는 바깥 SELECT 1행 (서브쿼리는 각각 PK 끝 한 행)
+)
+
+SQL_COMPLIMENT_BY_ID = register_query(
+    "compliments.by_id",
+    """
+    SELECT id, message FROM compliments WHERE id = %s
+    """,
+    sample_params=(1,),
+)
+
+def compliment_from_id_sql(n_excluded):
+    """from_id 이상에서 id 순으로 처음 나오는, 이미 본 id(n_excluded개)가 아닌 칭찬 한 건"""
+    not_in = f" AND id NOT IN ({', '.join(['%s'] * n_excluded)})" if n_excluded else ""
+    return f"SELECT id, message FROM compliments WHERE id >= %s{not_in} ORDER BY id LIMIT 1"
+
+
+# 제외할 id 개수만 다르고 플랜은 같으므로 두 개짜리로 점검
+register_query("compliments.from_id", compliment_from_id_sql(2), sample_params=(1, 2, 3))
+
+SQL_ACTIVE_STUDENTS = register_query(
+    "seat_students.active",
+    """
+    SELECT student_id, name
+    FROM seat_students
+    WHERE is_active = 1
+    ORDER BY name;
+    """,
+    sample_params=(),
+    full_scan_ok=("seat_students",),  # 반 인원 수로 고정된 작은 테이블
+)
+
+SQL_ACTIVE_SEATS = register_query(
+    "seats.active",
+    """
+    SELECT seat_id, seat_code, row_no, col_no
+    FROM seats
+    WHERE is_active = 1
+    ORDER BY row_no, col_no;
+    """,
+    sample_params=(),
+    full_scan_ok=("seats",),  # 좌석 수로 고정된 작은 테이블
+)
+
+SQL_SEAT_ID_BY_CODE = register_query(
+    "seats.id_by_code",
+    """
+    SELECT seat_id FROM seats WHERE seat_code=%s LIMIT 1;
+    """,
+    sample_params=("A1",),
+)
+
+SQL_ASSIGNMENTS_VIEW = register_query(
+    "seat_assignments.view",
+    """
+    SELECT
+      st.name AS student_name,
+      se.seat_code,
+      se.row_no,
+      se.col_no,
+      a.assigned_at
+    FROM seat_assignments a
+    JOIN seat_students st ON st.student_id = a.student_id
+    JOIN seats se ON se.seat_id = a.seat_id
+    ORDER BY se.row_no, se.col_no;
+    """,
+    sample_params=(),
+    full_scan_ok=("a",),  # 현재 배정표 전체 (학생 수만큼의 행)
+)
+
+SQL_ASSIGNMENT_PAIRS = register_query(
+    "seat_assignments.pairs",
+    """
+    SELECT se.seat_code, st.name AS student_name
+    FROM seat_assignments a
+    JOIN seat_students st ON st.student_id = a.student_id
+    JOIN seats se ON se.seat_id = a.seat_id;
+    """,
+    sample_params=(),
+    full_scan_ok=("a",),  # 현재 배정표 전체 (학생 수만큼의 행)
+)
+
+SQL_REVIEWS_FOR_SEAT = register_query(
+    "seat_reviews.by_seat_code",
+    """
+    SELECT r.rating, r.comment, r.created_at
+    FROM seat_reviews r
+    JOIN seats se ON se.seat_id = r.seat_id
+    WHERE se.seat_code = %s
+    ORDER BY r.created_at DESC;
+    """,
+    sample_params=("A1",),
+)
+
+SQL_AVG_RATINGS = register_query(
+    "seat_reviews.avg_by_seat",
+    """
+    SELECT se.seat_code,
+           AVG(r.rating) AS avg_rating,
+           COUNT(r.review_id) AS cnt
+    FROM seats se
+    LEFT JOIN seat_reviews r ON r.seat_id = se.seat_id
+    GROUP BY se.seat_code;
+    """,
+    sample_params=(),
+    full_scan_ok=("se",),  # 좌석 목록을 기준으로 좌석별 리뷰를 인덱스로 집계
+)
+
+SQL_REVIEWS_BY_SEAT_RECENT_FIRST = register_query(
+    "seat_reviews.recent_by_seat",
+    """
+    SELECT se.seat_code, r.rating, r.comment, r.created_at
+    FROM seat_reviews r
+    JOIN seats se ON se.seat_id = r.seat_id
+    ORDER BY se.seat_code, r.created_at DESC;
+    """,
+    sample_params=(),
+    full_scan_ok=("se",),  # 좌석 목록을 기준으로 좌석별 리뷰를 인덱스 순서대로 읽음
+)
+
+SQL_ACTIVE_CATEGORIES = register_query(
+    "useful_categories.active",
+    """
+    SELECT category_id, category_key, category_name
+    FROM useful_categories
+    WHERE is_active = 1
+    ORDER BY sort_order, category_id;
+    """,
+    sample_params=(),
+    full_scan_ok=("useful_categories",),  # 카테고리 수로 고정된 작은 테이블
+)
+
+# 제출 전 중복 URL 검사 (UNIQUE (category_id, url) 인덱스, 비활성 링크도 같은 제약에 걸리므로 is_active 조건 없음)
+SQL_LINK_EXISTS = register_query(
+    "useful_links.exists_by_url",
+    """
+    SELECT 1 FROM useful_links WHERE category_id = %s AND url = %s LIMIT 1;
+    """,
+    sample_params=(1, "https://example.com"),
+)
+
+SQL_LINKS_BY_CATEGORY = register_query(
+    "useful_links.by_category",
+    """
+    SELECT link_id, title, url, description, created_by, created_at
+    FROM useful_links
+    WHERE is_active = 1 AND category_id = %s
+    ORDER BY created_at DESC;
+    """,
+    sample_params=(1,),
+)
+
+SQL_DRINKS = register_query(
+    "caffeine.all",
+    """
+    SELECT drink_name, caffeine_mg FROM caffeine
+    """,
+    sample_params=(),
+    full_scan_ok=("caffeine",),  # 음료 목록 전체 (작은 고정 테이블)
+)
+
+SQL_AIR_LATEST = register_query(
+    "air_readings.latest",
+    """
+    SELECT measured_at, temp, pm10, pm25, weather_at, air_at, air_data_time
+    FROM air_readings
+    ORDER BY measured_at DESC
+    LIMIT 1
+    """,
+    sample_params=(),
+)
+
+SQL_AIR_READINGS_SINCE = register_query(
+    "air_readings.since",
+    """
+    SELECT measured_at, temp, pm10, pm25
+    FROM air_readings
+    WHERE measured_at >= %s
+    ORDER BY measured_at
+    """,
+    sample_params=(datetime.datetime(2000, 1, 1),),
+)
+
+# 내보내기 (python db.py export <name>): 이름 -> 전체 조회 SQL
+EXPORT_QUERIES = {
+    "daily_reviews": register_query(
+        "export.daily_reviews",
+        """
+        SELECT id, review_date, review, difficulty, created_at
+        FROM daily_reviews
+        ORDER BY id
+        """,
+        full_scan_ok=("daily_reviews",),
+    ),
+    "compliments": register_query(
+        "export.compliments",
+        """
+        SELECT id, message, created_at
+        FROM compliments
+        ORDER BY id
+        """,
+        full_scan_ok=("compliments",),
+    ),
+    "seat_reviews": register_query(
+        "export.seat_reviews",
+        """
+        SELECT r.review_id, se.seat_code, r.rating, r.comment, r.created_at
+        FROM seat_reviews r
+        JOIN seats se ON se.seat_id = r.seat_id
+        ORDER BY r.review_id
+        """,
+        full_scan_ok=("r",),
+    ),
+    "useful_links": register_query(
+        "export.useful_links",
+        """
+        SELECT l.link_id, c.category_key, l.title, l.url, l.description, l.created_by, l.created_at
+        FROM useful_links l
+        JOIN useful_categories c ON c.category_id = l.category_id
+        WHERE l.is_active = 1
+        ORDER BY l.link_id
+        """,
+        full_scan_ok=("l",),
+    ),
+}
+
+
+# =========================
+# 마이그레이션
+# =========================
+MIGRATIONS_DIR = os.path.join(BASE_DIR, "sql", "migrations")
+_MIGRATION_FILE = re.compile(r"^(\d+)_(.+?)(?:\.(mysql|sqlite))?\.sql$")
+
+SQL_CREATE_SCHEMA_MIGRATIONS = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def list_migrations(dialect):
+    """
+    sql/migrations 안의 마이그레이션 목록 [(version, name, path), ...] (버전 순)
+
+    파일 이름 규칙:
+    - NNNN_설명.sql: 모든 DB에 적용
+    - NNNN_설명.mysql.sql / NNNN_설명.sqlite.sql: 해당 DB에만 적용
+    """
+    found = {}
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        m = _MIGRATION_FILE.match(filename)
+        if not m or (m.group(3) and m.group(3) != dialect):
+            continue
+        version = int(m.group(1))
+        if version in found:
+            raise ValueError(f"마이그레이션 버전 중복: {filename}, {found[version][2]}")
+        found[version] = (version, m.group(2), os.path.join(MIGRATIONS_DIR, filename))
+    return [found[v] for v in sorted(found)]
+
+
+def _split_sql(script):
+    lines = [line for line in script.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+# =========================
+# 리뷰 키워드 집계 (review_keyword_counts)
+# =========================
+DOC_COUNT_TOKEN = "*"   # keyword_doc_freq에서 전체 문서(날짜) 수를 담는 행 (실제 토큰은 한글/영문만)
+
+
+def keyword_counts_by_date(rows):
+    """
+    [(review_date, review), ...] → Counter{(review_date, token): 등장 횟수}
+
+    날짜별로 리뷰를 모아서 TOKENIZER.count()를 날짜당 한 번만 부름 (리뷰마다 토큰화하지 않음)
+    """
+    by_date = collections.defaultdict(list)
+    for review_date, review in rows:
+        by_date[review_date].append(review)
+    counts = collections.Counter()
+    for review_date, texts in by_date.items():
+        for token, n in TOKENIZER.count(texts).items():
+            counts[(review_date, token)] += n
+    return counts
+
+
+# =========================
+# 날짜별 리뷰 집계 (daily_review_rollups)
+# =========================
+ROLLUP_SUM_COLUMNS = [
+    "review_count", "difficulty_sum",
+    "difficulty_1", "difficulty_2", "difficulty_3", "difficulty_4", "difficulty_5",
+]
+
+SQL_REBUILD_ROLLUPS = """
+INSERT INTO daily_review_rollups
+    (review_date, review_count, difficulty_sum,
+     difficulty_1, difficulty_2, difficulty_3, difficulty_4, difficulty_5)
+SELECT review_date, COUNT(*), SUM(difficulty),
+       SUM(CASE WHEN difficulty = 1 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 2 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 3 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 4 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 5 THEN 1 ELSE 0 END)
+FROM daily_reviews
+GROUP BY review_date
+"""
+
+
+def review_rollups(rows):
+    """[(review_date, review, difficulty), ...] → upsert_sum용 [(review_date, *ROLLUP_SUM_COLUMNS), ...]"""
+    sums = {}
+    for review_date, _, difficulty in rows:
+        acc = sums.setdefault(review_date, [0] * len(ROLLUP_SUM_COLUMNS))
+        acc[0] += 1
+        acc[1] += difficulty
+        acc[1 + difficulty] += 1
+    return [(review_date, *acc) for review_date, acc in sums.items()]
+
+
+# =========================
+# 전체 검색 (리뷰/자리 리뷰/링크/칭찬)
+# =========================
+# - MySQL: ngram 파서 FULLTEXT 인덱스 (0008_search_fulltext.mysql.sql), INSERT 때 InnoDB가 갱신
+# - SQLite: search_postings 역색인 (0008_search_index.sqlite.sql)
+#   INSERT 트랜잭션 안에서 index_search()가 아직 색인 안 된 행(id > last_id)만 2-gram으로 잘라 추가
+#   MySQL ngram(ngram_token_size=2)과 같은 방식으로 잘라서 두 DB의 검색 결과가 비슷하도록
+# - 두 DB 모두 검색어의 2-gram 중 하나라도 있으면 결과에 포함 (MySQL natural language mode도 2-gram OR)
+#   순위 점수는 다름: MySQL은 InnoDB relevance, SQLite는 문서 길이로 정규화한 BM25 (SQL_SEARCH_POSTINGS)
+#   → 결과 집합과 전체 개수는 같고, 비슷한 점수끼리의 순서는 DB마다 다를 수 있음
+SEARCH_SOURCES = {
+    # source(= 테이블): (id 컬럼, 검색 대상 컬럼)
+    "daily_reviews": ("id", ("review",)),
+    "seat_reviews": ("review_id", ("comment",)),
+    "useful_links": ("link_id", ("title", "description")),
+    "compliments": ("id", ("message",)),
+}
+SEARCH_LABELS = {
+    "daily_reviews": "📝 오늘의 요약",
+    "seat_reviews": "🎲 자리 리뷰",
+    "useful_links": "💡 집단지성",
+    "compliments": "🍀 칭찬",
+}
+SEARCH_PAGE_SIZE = 10
+SEARCH_NGRAM = 2
+_SEARCH_WORD = re.compile(r"[0-9a-z가-힣]+")
+
+
+def search_ngrams(text, n=SEARCH_NGRAM):
+    """검색용 n-gram 등장 횟수 Counter (소문자, 한글/영문/숫자 단어 안에서만, n글자보다 짧은 단어는 버림)"""
+    grams = collections.Counter()
+    for word in _SEARCH_WORD.findall(text.lower()):
+        grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+    return grams
+
+
+def _search_docs_sql(source, n_ids):
+    # 검색 결과 페이지에 보여줄 문서 내용 (SQL_SEARCH_FULLTEXT와 같은 컬럼 이름)
+    select = {
+        "daily_reviews": "id AS doc_id, NULL AS title, review AS body, NULL AS url, created_at "
+                         "FROM daily_reviews WHERE id",
+        "seat_reviews": "review_id AS doc_id, NULL AS title, comment AS body, NULL AS url, created_at "
+                        "FROM seat_reviews WHERE review_id",
+        "useful_links": "link_id AS doc_id, title, description AS body, url, created_at "
+                        "FROM useful_links WHERE is_active = 1 AND link_id",
+        "compliments": "id AS doc_id, NULL AS title, message AS body, NULL AS url, created_at "
+                       "FROM compliments WHERE id",
+    }[source]
+    return f"SELECT {select} IN ({', '.join(['%s'] * n_ids)})"
+
+
+# =========================
+# 읽기/쓰기 분리 (레플리카 라우팅)
+# =========================
+# - 쓰기는 항상 primary, 조회는 레플리카가 설정돼 있으면 레플리카
+# - 방금 쓴 테이블은 sticky_seconds 동안 primary에서 조회 (프로세스 전역)
+#   → 쓰기 직후 캐시를 다시 채울 때 복제가 덜 된 레플리카 값이 캐시에 들어가지 않도록
+# - 방금 제출한 세션은 sticky_seconds 동안 모든 조회를 primary에서 (read-your-writes)
+_SESSION_PRIMARY_KEY = "_read_primary_until"
+
+
+@functools.lru_cache(maxsize=256)
+def sql_tables(sql):
+    """SQL의 FROM/JOIN에 나오는 테이블 이름들"""
+    return frozenset(re.findall(r"\b(?:FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)", sql, re.IGNORECASE))
+
+
+def stick_session_to_primary(seconds):
+    """현재 세션의 조회를 seconds 동안 primary로 (스크립트 스레드가 아니면 아무것도 안 함)"""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return
+    st.session_state[_SESSION_PRIMARY_KEY] = time.monotonic() + seconds
+
+
+def _session_reads_primary():
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return False
+    return st.session_state.get(_SESSION_PRIMARY_KEY, 0) > time.monotonic()
+
+
+# =========================
+# 저장소 인터페이스
+# =========================
+class Storage:
+    """
+    테이블별 데이터 접근 인터페이스
+
+    - 페이지는 SQL을 직접 쓰지 않고 get_storage()의 메서드만 호출
+    - SQL은 MySQL/SQLite 공통 문법으로 작성하고,
+      방언 차이(upsert, AUTO_INCREMENT 초기화, EXPLAIN)만 하위 클래스에서 처리
+    - 커넥션은 저장소마다 하나의 ConnectionPool에서 꺼내 씀
+    - replica=True면 조회 전용 풀을 하나 더 두고 read_connection()이 골라 씀
+    """
+
+    name = None
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, pool_timeout=DEFAULT_POOL_TIMEOUT,
+                 pool_recycle=DEFAULT_POOL_RECYCLE, pool_ping=True, replica=False,
+                 sticky_seconds=DEFAULT_REPLICA_STICKY_SECONDS):
+        pool_kwargs = dict(size=pool_size, timeout=pool_timeout, recycle=pool_recycle, ping=pool_ping)
+        self.pool = ConnectionPool(self.connect, **pool_kwargs)
+        self.replica_pool = ConnectionPool(self.connect_replica, **pool_kwargs) if replica else None
+        self.sticky_seconds = sticky_seconds
+        self._written_at = {}   # table -> 이 프로세스가 마지막으로 쓴 시각(monotonic)
+
+    # ---------- 백엔드별로 구현 ----------
+    def connect(self):
+        raise NotImplementedError
+
+    def connect_replica(self):
+        raise NotImplementedError
+
+    def upsert_sum_sql(self, table, key_columns, sum_columns):
+        """키가 없으면 INSERT, 있으면 sum_columns 값을 더하는 upsert SQL"""
+        raise NotImplementedError
+
+    def reset_auto_increment(self, cur, table):
+        raise NotImplementedError
+
+    def locking_read_sql(self, sql):
+        """트랜잭션 안에서 읽은 행을 커밋할 때까지 다른 쓰기로부터 잠그는 SELECT"""
+        raise NotImplementedError
+
+    def index_search(self, cur, source):
+        """쓰기 트랜잭션 안에서 source 테이블의 새 행을 검색 색인에 반영 (DB가 직접 관리하면 할 일 없음)"""
+        raise NotImplementedError
+
+    def rebuild_search_index(self):
+        """검색 색인을 처음부터 다시 만들고 색인한 문서 수를 반환 (DB가 직접 관리하면 None)"""
+        raise NotImplementedError
+
+    def search_page(self, query, limit, offset):
+        """검색어에 맞는 문서 ([{source, doc_id, title, body, url, created_at, score}, ...] 점수 순, 전체 개수)"""
+        raise NotImplementedError
+
+    def stream_cursor(self, conn):
+        """행을 튜플로, 가능하면 서버에서 조금씩 받아오는 커서 (대용량 조회용)"""
+        raise NotImplementedError
+
+    def explain(self, sql, params=()):
+        """쿼리 실행 계획 (로컬에서 페이지별 쿼리 플랜 확인용)"""
+        raise NotImplementedError
+
+    def full_table_scans(self, sql, params=()):
+        """실행 계획에서 풀 테이블 스캔하는 테이블(별칭) 목록"""
+        raise NotImplementedError
+
+    # ---------- 공통 ----------
+    def connection(self, timeout=None):
+        """쓰기(및 primary에서 읽어야 하는 작업)용 커넥션"""
+        return self.pool.acquire(timeout=timeout)
+
+    def read_connection(self, sql=None, timeout=None):
+        """
+        조회용 커넥션: 레플리카가 있으면 레플리카에서, 단 아래 경우는 primary에서
+
+        - 이 세션이 방금 제출함 (read-your-writes)
+        - sql이 읽는 테이블에 이 프로세스가 sticky_seconds 안에 씀
+        """
+        if self.replica_pool is None or self._reads_primary(sql):
+            return self.pool.acquire(timeout=timeout)
+        return self.replica_pool.acquire(timeout=timeout)
+
+    def _reads_primary(self, sql):
+        if _session_reads_primary():
+            return True
+        if sql is None:
+            return False
+        since = time.monotonic() - self.sticky_seconds
+        return any(self._written_at.get(t, 0) > since for t in sql_tables(sql))
+
+    def migrate(self):
+        """아직 적용하지 않은 마이그레이션을 버전 순서대로 적용하고, 이번에 적용한 버전 목록을 반환"""
+        with self.connection() as conn:
+            return self._migrate(conn)
+
+    def _migrate(self, conn):
+        # MySQL DDL은 트랜잭션으로 묶이지 않으므로 파일 하나에 서로 독립적인 문장만 넣을 것
+        applied_now = []
+        with conn.cursor() as cur:
+            cur.execute(SQL_CREATE_SCHEMA_MIGRATIONS)
+            cur.execute("SELECT version FROM schema_migrations")
+            applied = {int(r["version"]) for r in cur.fetchall()}
+            for version, name, path in list_migrations(self.name):
+                if version in applied:
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    for stmt in _split_sql(f.read()):
+                        cur.execute(stmt)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                applied_now.append(version)
+        return applied_now
+
+    def _bump_version(self, cur, table):
+        # 같은 커넥션에서 쓰기 직후 호출 (data_versions 참고), 올린 버전을 반환
+        # 롤백될 수 있으므로 여기서는 DB만 바꾸고, 커밋이 끝난 뒤 _note_committed()로 반영
+        cur.execute(self.upsert_sum_sql("data_versions", ["table_name"], ["version"]), (table, 1))
+        cur.execute("SELECT version FROM data_versions WHERE table_name = %s", (table,))
+        return int(cur.fetchone()["version"])
+
+    def _note_committed(self, versions):
+        # versions({table: _bump_version() 결과})가 커밋된 뒤 호출
+        # → 이 프로세스의 primary 고정(read-your-writes)과 쿼리 캐시 버전 갱신
+        for table, version in versions.items():
+            self._written_at[table] = time.monotonic()
+            get_query_cache().note_local_write(table, version)
+        if versions:
+            stick_session_to_primary(self.sticky_seconds)
+
+    def _insert_many(self, table, sql, rows, also=None):
+        # 여러 행 INSERT + 버전 증가를 한 트랜잭션으로 (중간에 실패하면 아무것도 반영 안 됨)
+        # also(cur): 같은 트랜잭션에서 함께 갱신할 파생 테이블 처리, 올린 버전 {table: version}을 반환
+        versions = {}
+        with self.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cur:
+                    cur.executemany(sql, rows)
+                    if also is not None:
+                        versions.update(also(cur))
+                    if table in SEARCH_SOURCES:
+                        self.index_search(cur, table)
+                    versions[table] = self._bump_version(cur, table)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._note_committed(versions)
+
+    def _stream(self, sql, params, chunk_size):
+        # 첫 값은 컬럼 이름 목록, 그 다음부터 chunk_size 행씩의 튜플 리스트
+        # 제너레이터가 끝나거나 닫힐 때(GC 포함) 커서를 닫고 커넥션을 풀에 반납
+        with self.read_connection(sql) as conn, self.stream_cursor(conn) as cur:
+            cur.execute(sql, params)
+            yield [d[0] for d in cur.description]
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+
+    def iter_chunks(self, sql, params=None, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        조회 결과를 chunk_size 행(튜플)씩 넘겨주는 제너레이터
+
+        메모리에는 한 번에 한 청크만 올라감 (MySQL은 SSCursor라 서버에서도 조금씩 받아옴)
+        끝까지 읽지 않고 그만둘 거면 close()해서 커넥션을 바로 반납할 것
+        """
+        stream = self._stream(sql, params, chunk_size)
+        next(stream)
+        yield from stream
+
+    def iter_rows(self, sql, params=None, chunk_size=STREAM_CHUNK_SIZE, as_dict=False):
+        """iter_chunks()를 한 행씩 풀어서 넘겨주는 제너레이터 (as_dict=True면 행을 dict로)"""
+        stream = self._stream(sql, params, chunk_size)
+        names = next(stream)
+        for rows in stream:
+            if as_dict:
+                for row in rows:
+                    yield dict(zip(names, row))
+            else:
+                yield from rows
+
+    def fetch_arrow(self, sql, params=None, batch_size=ARROW_BATCH_SIZE):
+        """
+        조회 결과를 pyarrow.Table로 반환
+
+        - 행마다 dict를 만들지 않고 batch_size 행씩 받아서 컬럼 단위 RecordBatch로 쌓음
+        - 결과는 불변이라 캐시에 그대로 두고 여러 세션이 공유해도 안전
+        - pandas가 필요하면 table.to_pandas(types_mapper=pd.ArrowDtype) (Arrow 버퍼를 그대로 사용)
+        """
+        stream = self._stream(sql, params, batch_size)
+        names = next(stream)
+        batches = [
+            pa.RecordBatch.from_arrays([pa.array(values) for values in zip(*rows)], names=names)
+            for rows in stream
+        ]
+        if not batches:
+            return pa.table({name: pa.array([], pa.null()) for name in names})
+        # 배치마다 추론한 타입이 다를 수 있으므로(예: 앞 배치는 전부 NULL) 넓은 쪽으로 맞춤
+        return pa.concat_tables(
+            [pa.Table.from_batches([b]) for b in batches], promote_options="permissive"
+        ).combine_chunks()
+
+    def fetch_data_versions(self):
+        # 레플리카에서 읽어도 안전: 버전 증가는 데이터와 같은 순서로 복제되므로
+        # 레플리카에서 새 버전이 보이면 그 데이터도 이미 레플리카에 있음
+        with self.read_connection() as conn, conn.cursor() as cur:
+            cur.execute(SQL_DATA_VERSIONS)
+            return {r["table_name"]: int(r["version"]) for r in cur.fetchall()}
+
+    # ---------- daily_reviews ----------
+    def insert_daily_review(self, review_date, review, difficulty):
+        self.insert_daily_reviews([(review_date, review, difficulty)])
+
+    def insert_daily_reviews(self, rows):
+        """
+        rows: [(review_date, review, difficulty), ...]
+
+        같은 트랜잭션에서 review_keyword_counts에 날짜별 토큰 등장 횟수를,
+        daily_review_rollups에 날짜별 리뷰 수/난이도 분포를 더함
+        """
+        counts = keyword_counts_by_date((review_date, review) for review_date, review, _ in rows)
+
+        def add_keyword_counts(cur):
+            if not counts:
+                return {}
+            new_docs = self._new_keyword_docs(cur, counts)
+            cur.executemany(
+                self.upsert_sum_sql("review_keyword_counts", ["review_date", "token"], ["count"]),
+                [(review_date, token, n) for (review_date, token), n in counts.items()]
+            )
+            if new_docs:
+                cur.executemany(
+                    self.upsert_sum_sql("keyword_doc_freq", ["token"], ["doc_count"]),
+                    list(new_docs.items())
+                )
+            # keyword_doc_freq는 review_keyword_counts와 항상 같이 바뀌므로 버전은 하나로 관리
+            return {"review_keyword_counts": self._bump_version(cur, "review_keyword_counts")}
+
+        def add_rollups(cur):
+            cur.executemany(
+                self.upsert_sum_sql("daily_review_rollups", ["review_date"], ROLLUP_SUM_COLUMNS),
+                review_rollups(rows)
+            )
+            return {"daily_review_rollups": self._bump_version(cur, "daily_review_rollups")}
+
+        def add_derived(cur):
+            return {**add_keyword_counts(cur), **add_rollups(cur)}
+
+        self._insert_many(
+            "daily_reviews",
+            "INSERT INTO daily_reviews (review_date, review, difficulty) VALUES (%s, %s, %s)",
+            rows,
+            also=add_derived,
+        )
+
+    def fetch_daily_review_snapshot(self, review_date):
+        """
+        (그 날짜 리뷰 최신순, {난이도: 리뷰 수})를 쿼리 한 번으로
+
+        난이도 분포는 윈도 함수로 DB에서 세서 행마다 붙여 옴 (파이썬에서 다시 세지 않음)
+        """
+        with self.read_connection(SQL_DAILY_REVIEW_SNAPSHOT) as conn, conn.cursor() as cur:
+            cur.execute(SQL_DAILY_REVIEW_SNAPSHOT, (review_date,))
+            rows = cur.fetchall()
+        return rows, {r["difficulty"]: int(r["difficulty_count"]) for r in rows}
+
+    # ---------- daily_review_rollups ----------
+    def fetch_review_rollups(self, start, end):
+        """start~end(포함) 날짜별 집계 행 (날짜 순, 리뷰가 없는 날은 행이 없음)"""
+        with self.read_connection(SQL_REVIEW_ROLLUPS_BY_RANGE) as conn, conn.cursor() as cur:
+            cur.execute(SQL_REVIEW_ROLLUPS_BY_RANGE, (start, end))
+            return cur.fetchall()
+
+    def rebuild_review_rollups(self):
+        """
+        daily_reviews로 daily_review_rollups를 처음부터 다시 만들고 날짜 수를 반환
+
+        집계는 DB 안에서 INSERT ... SELECT 한 번으로 (리뷰 원문을 파이썬으로 가져오지 않음)
+        """
+        with self.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM daily_review_rollups")
+                    cur.execute(SQL_REBUILD_ROLLUPS)
+                    cur.execute("SELECT COUNT(*) AS n FROM daily_review_rollups")
+                    count = int(cur.fetchone()["n"])
+                    version = self._bump_version(cur, "daily_review_rollups")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._note_committed({"daily_review_rollups": version})
+        return count
+
+    # ---------- review_keyword_counts / keyword_doc_freq ----------
+    def _new_keyword_docs(self, cur, counts):
+        """
+        counts({(날짜, 토큰): 횟수})를 더하기 전에 keyword_doc_freq에 더할 값 Counter{토큰: 새로 생긴 날짜 수}
+
+        그 날짜에 처음 나온 토큰은 +1, 키워드가 처음 생긴 날짜면 DOC_COUNT_TOKEN도 +1
+        같은 날짜에 동시에 INSERT해도 두 번 세지 않도록 기존 토큰은 잠그고 읽음
+        """
+        new_docs = collections.Counter()
+        by_date = collections.defaultdict(set)
+        for review_date, token in counts:
+            by_date[review_date].add(token)
+        for review_date, tokens in by_date.items():
+            cur.execute(self.locking_read_sql(SQL_KEYWORD_TOKENS_OF_DATE), (review_date,))
+            existing = {r["token"] for r in cur.fetchall()}
+            if not existing:
+                new_docs[DOC_COUNT_TOKEN] += 1
+            new_docs.update(tokens - existing)
+        return new_docs
+
+    def fetch_top_keywords(self, start, end=None, limit=5, pending=()):
+        """
+        start~end(포함) 기간 키워드 TF-IDF 상위 limit개 [(token, 점수), ...], end가 없으면 start 하루
+
+        문서 = 날짜 하루, 문서 빈도는 keyword_doc_freq에 누적돼 있으므로
+        읽는 행 수는 기간 안의 (날짜, 토큰) 수뿐 (리뷰 이력이 쌓여도 늘지 않음)
+
+        pending: 아직 DB에 반영되지 않은 이 기간의 [(review_date, review), ...]
+        (제출한 세션에서 바로 보이도록 등장 횟수에 더함, 기간에 처음 나온 토큰의 문서 수는 pending 안에서만 셈)
+        """
+        end = start if end is None else end
+        with self.read_connection(SQL_KEYWORD_TFIDF_CANDIDATES) as conn, conn.cursor() as cur:
+            cur.execute(SQL_KEYWORD_TFIDF_CANDIDATES, (start, end))
+            rows = cur.fetchall()
+        if not rows and not pending:
+            return []
+        n_docs = int(rows[0]["n_docs"] or 0) if rows else 0
+        candidates = {r["token"]: [int(r["total"]), int(r["doc_count"])] for r in rows}
+        if pending:
+            extra = keyword_counts_by_date(pending)
+            n_docs = max(n_docs, len({review_date for review_date, _ in extra}))
+            new_tokens = {token for _, token in extra} - candidates.keys()
+            for (_, token), n in extra.items():
+                candidates.setdefault(token, [0, 0])[0] += n
+                if token in new_tokens:
+                    candidates[token][1] += 1
+        return rank_tfidf([(token, tf, df) for token, (tf, df) in candidates.items()], n_docs, limit)
+
+    def fetch_top_keywords_all(self, limit=5, pending=()):
+        """
+        기수 전체 키워드 상위 limit개 [(token, 횟수), ...]
+
+        pending: 아직 DB에 반영되지 않은 [(review_date, review), ...] (등장 횟수에 더함)
+        상위 limit + pending 토큰 수만큼만 읽어서 합치므로 그 밖의 토큰이 pending으로 올라오는 경우는 근사
+        """
+        extra = collections.Counter()
+        for (_, token), n in keyword_counts_by_date(pending).items():
+            extra[token] += n
+        with self.read_connection(SQL_KEYWORDS_ALL) as conn, conn.cursor() as cur:
+            cur.execute(SQL_KEYWORDS_ALL, (limit + len(extra),))
+            totals = collections.Counter({r["token"]: int(r["total"]) for r in cur.fetchall()})
+        totals.update(extra)
+        return sorted(totals.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+    def rebuild_keyword_counts(self):
+        """
+        daily_reviews 원문으로 review_keyword_counts(+ keyword_doc_freq)를 처음부터 다시 만들고 (날짜, 토큰) 개수를 반환
+
+        마이그레이션 직후나 keywords.py 규칙을 바꾼 뒤에 한 번 실행 (리뷰가 들어오지 않는 시간에)
+        원문은 청크 단위로 읽으므로 메모리에는 (날짜, 토큰)별 합계만 쌓임
+        """
+        counts = collections.Counter()
+        for rows in self.iter_chunks("SELECT review_date, review FROM daily_reviews"):
+            counts.update(keyword_counts_by_date(rows))
+
+        with self.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM review_keyword_counts")
+                    cur.executemany(
+                        "INSERT INTO review_keyword_counts (review_date, token, count) VALUES (%s, %s, %s)",
+                        [(review_date, token, n) for (review_date, token), n in counts.items()]
+                    )
+                    cur.execute("DELETE FROM keyword_doc_freq")
+                    cur.execute(
+                        "INSERT INTO keyword_doc_freq (token, doc_count) "
+                        "SELECT token, COUNT(*) FROM review_keyword_counts GROUP BY token"
+                    )
+                    cur.execute(
+                        "INSERT INTO keyword_doc_freq (token, doc_count) "
+                        "SELECT %s, COUNT(DISTINCT review_date) FROM review_keyword_counts",
+                        (DOC_COUNT_TOKEN,)
+                    )
+                    version = self._bump_version(cur, "review_keyword_counts")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._note_committed({"review_keyword_counts": version})
+        return len(counts)
+
+    # ---------- compliments ----------
+    def insert_compliment(self, message):
+        self.insert_compliments([(message,)])
+
+    def insert_compliments(self, rows):
+        """
+        rows: [(message,), ...]
+
+        같은 트랜잭션에서 compliment_word_freq에 워드클라우드 단어 등장 횟수를 더함
+        """
+        counts = cloud_word_counts(message for message, in rows)
+
+        def add_word_freq(cur):
+            if not counts:
+                return {}
+            cur.executemany(
+                self.upsert_sum_sql("compliment_word_freq", ["word"], ["count"]),
+                list(counts.items())
+            )
+            return {"compliment_word_freq": self._bump_version(cur, "compliment_word_freq")}
+
+        self._insert_many(
+            "compliments", "INSERT INTO compliments (message) VALUES (%s)", rows, also=add_word_freq
+        )
+
+    def iter_compliment_message_chunks(self, chunk_size=STREAM_CHUNK_SIZE):
+        """[message, ...] 리스트를 chunk_size개씩"""
+        for rows in self.iter_chunks(SQL_COMPLIMENT_MESSAGES, chunk_size=chunk_size):
+            yield [r[0] for r in rows]
+
+    def fetch_compliment_top_words(self, limit):
+        """워드클라우드용 상위 limit개 단어 [(word, 횟수), ...] (칭찬이 몇 개든 limit행만 읽음)"""
+        with self.read_connection(SQL_COMPLIMENT_TOP_WORDS) as conn, conn.cursor() as cur:
+            cur.execute(SQL_COMPLIMENT_TOP_WORDS, (limit,))
+            return [(r["word"], int(r["count"])) for r in cur.fetchall()]
+
+    def rebuild_compliment_word_freq(self):
+        """칭찬 원문으로 compliment_word_freq를 처음부터 다시 만들고 단어 수를 반환 (원문은 청크 단위로 읽음)"""
+        counts = collections.Counter()
+        for messages in self.iter_compliment_message_chunks():
+            counts.update(cloud_word_counts(messages))
+
+        with self.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM compliment_word_freq")
+                    cur.executemany(
+                        "INSERT INTO compliment_word_freq (word, count) VALUES (%s, %s)",
+                        list(counts.items())
+                    )
+                    version = self._bump_version(cur, "compliment_word_freq")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._note_committed({"compliment_word_freq": version})
+        return len(counts)
+
+    def fetch_compliment_id_range(self):
+        """(가장 작은 id, 가장 큰 id), 칭찬이 없으면 None (PK 양 끝만 읽음)"""
+        with self.read_connection(SQL_COMPLIMENT_ID_RANGE) as conn, conn.cursor() as cur:
+            cur.execute(SQL_COMPLIMENT_ID_RANGE)
+            row = cur.fetchone()
+        return None if row is None or row["lo"] is None else (int(row["lo"]), int(row["hi"]))
+
+    def fetch_random_compliment(self, id_range, exclude=(), attempts=RANDOM_PICK_ATTEMPTS, rng=random):
+        """
+        랜덤 칭찬 한 건 (id, message), exclude(이미 본 id)는 빼고 / 남은 게 없으면 None
+
+        - id_range 안에서 id를 뽑아 PK로 한 행만 조회, 지워져서 빈 id거나 이미 본 id면 다시 뽑기
+        - attempts번 안에 못 찾으면(빈 id가 많거나 거의 다 본 경우) 임의 위치부터 id 순으로
+          처음 나오는 안 본 칭찬 한 행 (NOT IN으로 DB에서 거름, 끝까지 가면 처음부터 한 번 더)
+        본 칭찬이 몇 개든 읽는 행은 PK 조회 몇 번 + 한두 행
+        """
+        lo, hi = id_range
+        with self.read_connection(SQL_COMPLIMENT_BY_ID) as conn, conn.cursor() as cur:
+            for _ in range(attempts):
+                pick = rng.randint(lo, hi)
+                if pick in exclude:
+                    continue
+                cur.execute(SQL_COMPLIMENT_BY_ID, (pick,))
+                row = cur.fetchone()
+                if row:
+                    return int(row["id"]), row["message"]
+
+            for from_id in (rng.randint(lo, hi), lo):
+                # from_id보다 작은 id는 어차피 안 나오므로 제외 목록에서 뺌
+                skip = sorted(i for i in exclude if i >= from_id)
+                cur.execute(compliment_from_id_sql(len(skip)), (from_id, *skip))
+                row = cur.fetchone()
+                if row:
+                    return int(row["id"]), row["message"]
+        return None
+
+    # ---------- seat_students / seats ----------
+    def fetch_students(self):
+        with self.read_connection(SQL_ACTIVE_STUDENTS) as conn, conn.cursor() as cur:
+            cur.execute(SQL_ACTIVE_STUDENTS)
+            return cur.fetchall()
+
+    def fetch_seats(self):
+        with self.read_connection(SQL_ACTIVE_SEATS) as conn, conn.cursor() as cur:
+            cur.execute(SQL_ACTIVE_SEATS)
+            return cur.fetchall()
+
+    def fetch_seat_id_by_seat_code(self, seat_code):
+        with self.read_connection(SQL_SEAT_ID_BY_CODE) as conn, conn.cursor() as cur:
+            cur.execute(SQL_SEAT_ID_BY_CODE, (seat_code,))
+            row = cur.fetchone()
+        return None if not row else row["seat_id"]
+
+    # ---------- seat_assignments ----------
+    def clear_assignments(self):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM seat_assignments;")
+            self.reset_auto_increment(cur, "seat_assignments")
+            version = self._bump_version(cur, "seat_assignments")
+        self._note_committed({"seat_assignments": version})
+
+    def insert_assignments(self, pairs):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO seat_assignments (student_id, seat_id) VALUES (%s, %s);",
+                pairs
+            )
+            version = self._bump_version(cur, "seat_assignments")
+        self._note_committed({"seat_assignments": version})
+
+    def fetch_assignments_view(self):
+        with self.read_connection(SQL_ASSIGNMENTS_VIEW) as conn, conn.cursor() as cur:
+            cur.execute(SQL_ASSIGNMENTS_VIEW)
+            return cur.fetchall()
+
+    def fetch_assignment_pairs(self):
+        with self.read_connection(SQL_ASSIGNMENT_PAIRS) as conn, conn.cursor() as cur:
+            cur.execute(SQL_ASSIGNMENT_PAIRS)
+            return cur.fetchall()
+
+    # ---------- seat_reviews ----------
+    def insert_seat_review(self, seat_id, rating, comment):
+        self.insert_seat_reviews([(seat_id, rating, comment)])
+
+    def insert_seat_reviews(self, rows):
+        """rows: [(seat_id, rating, comment), ...]"""
+        self._insert_many(
+            "seat_reviews",
+            "INSERT INTO seat_reviews (seat_id, rating, comment) VALUES (%s, %s, %s)",
+            rows
+        )
+
+    def fetch_all_reviews_for_seat(self, seat_code):
+        with self.read_connection(SQL_REVIEWS_FOR_SEAT) as conn, conn.cursor() as cur:
+            cur.execute(SQL_REVIEWS_FOR_SEAT, (seat_code,))
+            return cur.fetchall()
+
+    def fetch_avg_ratings(self):
+        # LEFT JOIN: 리뷰가 없는 좌석도 포함 (avg_rating은 NULL)
+        with self.read_connection(SQL_AVG_RATINGS) as conn, conn.cursor() as cur:
+            cur.execute(SQL_AVG_RATINGS)
+            return cur.fetchall()
+
+    def iter_reviews_by_seat_recent_first(self, chunk_size=STREAM_CHUNK_SIZE):
+        """{seat_code, rating, comment, created_at} 행을 seat_code, 최신순으로 하나씩"""
+        return self.iter_rows(SQL_REVIEWS_BY_SEAT_RECENT_FIRST, chunk_size=chunk_size, as_dict=True)
+
+    # ---------- useful_categories / useful_links ----------
+    def fetch_categories(self):
+        with self.read_connection(SQL_ACTIVE_CATEGORIES) as conn, conn.cursor() as cur:
+            cur.execute(SQL_ACTIVE_CATEGORIES)
+            return cur.fetchall()
+
+    def fetch_links_by_category(self, category_id):
+        with self.read_connection(SQL_LINKS_BY_CATEGORY) as conn, conn.cursor() as cur:
+            cur.execute(SQL_LINKS_BY_CATEGORY, (category_id,))
+            return cur.fetchall()
+
+    def link_exists(self, category_id, url):
+        # 방금 제출한 링크도 잡도록 레플리카가 아니라 primary에서 확인
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute(SQL_LINK_EXISTS, (category_id, url))
+            return cur.fetchone() is not None
+
+    def insert_link(self, category_id, title, url, description, created_by):
+        self.insert_links([(category_id, title, url, description, created_by)])
+
+    def insert_links(self, rows):
+        """rows: [(category_id, title, url, description, created_by), ...]"""
+        self._insert_many(
+            "useful_links",
+            """
+            INSERT INTO useful_links (category_id, title, url, description, created_by)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            rows
+        )
+
+    # ---------- 기온/미세먼지 (air.AirPoller가 수집) ----------
+    def insert_air_reading(self, measured_at, reading):
+        """reading: air.AirReading (temp, pm10, pm25, weather_at, air_at, air_data_time)"""
+        self._insert_many(
+            "air_readings",
+            """
+            INSERT INTO air_readings (measured_at, temp, pm10, pm25, weather_at, air_at, air_data_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            [(measured_at, *reading)]
+        )
+
+    def fetch_latest_air_reading(self):
+        """가장 최근 행 (dict) 또는 None"""
+        with self.read_connection(SQL_AIR_LATEST) as conn, conn.cursor() as cur:
+            cur.execute(SQL_AIR_LATEST)
+            return cur.fetchone()
+
+    def fetch_air_readings_since(self, since):
+        """since 이후 [{measured_at, temp, pm10, pm25}, ...] (시각 순)"""
+        with self.read_connection(SQL_AIR_READINGS_SINCE) as conn, conn.cursor() as cur:
+            cur.execute(SQL_AIR_READINGS_SINCE, (since,))
+            return cur.fetchall()
+
+    # ---------- 전체 검색 ----------
+    def search(self, query, page=1, per_page=SEARCH_PAGE_SIZE):
+        """
+        네 테이블 전체 검색, page번째(1부터) 결과 (hits, 전체 개수)
+
+        검색어에 2글자 이상인 단어가 없으면 빈 결과
+        """
+        if not search_ngrams(query):
+            return [], 0
+        return self.search_page(query, per_page, (page - 1) * per_page)
+
+    # ---------- 내보내기 ----------
+    def export_csv(self, name, fileobj, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        EXPORT_QUERIES[name] 결과를 CSV로 fileobj에 기록하고 행 수를 반환
+
+        청크 단위로 읽고 바로 쓰므로 테이블 크기와 상관없이 메모리 사용량은 청크 하나 수준
+        """
+        stream = self._stream(EXPORT_QUERIES[name], None, chunk_size)
+        writer = csv.writer(fileobj)
+        writer.writerow(next(stream))
+        count = 0
+        for rows in stream:
+            writer.writerows(rows)
+            count += len(rows)
+        return count
+
+    # ---------- caffeine ----------
+    def fetch_drinks_arrow(self):
+        """pyarrow.Table[drink_name, caffeine_mg]"""
+        return self.fetch_arrow(SQL_DRINKS)
+
+
+class MySQLStorage(Storage):
+    name = "mysql"
+
+    def __init__(self, cfg, replica_cfg=None):
+        self.cfg = cfg
+        self.replica_cfg = replica_cfg
+        super().__init__(
+            pool_size=int(cfg.get("pool_size", DEFAULT_POOL_SIZE)),
+            pool_timeout=float(cfg.get("pool_timeout", DEFAULT_POOL_TIMEOUT)),
+            pool_recycle=float(cfg.get("pool_recycle", DEFAULT_POOL_RECYCLE)),
+            pool_ping=bool(cfg.get("pool_ping", True)),
+            replica=replica_cfg is not None,
+            sticky_seconds=float((replica_cfg or {}).get("sticky_seconds", DEFAULT_REPLICA_STICKY_SECONDS)),
+        )
+
+    def connect(self):
+        return _connect_mysql(self.cfg)
+
+    def connect_replica(self):
+        return _connect_mysql(self.replica_cfg)
+
+    def upsert_sum_sql(self, table, key_columns, sum_columns):
+        columns = list(key_columns) + list(sum_columns)
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in sum_columns)
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+
+    def reset_auto_increment(self, cur, table):
+        cur.execute(f"ALTER TABLE {table} AUTO_INCREMENT = 1;")
+
+    def locking_read_sql(self, sql):
+        return f"{sql.rstrip()} FOR UPDATE"
+
+    def index_search(self, cur, source):
+        # FULLTEXT 인덱스는 InnoDB가 INSERT 때 함께 갱신
+        pass
+
+    def rebuild_search_index(self):
+        return None
+
+    def search_page(self, query, limit, offset):
+        sql = SQL_SEARCH_FULLTEXT
+        with self.read_connection(sql) as conn, conn.cursor() as cur:
+            cur.execute(sql, (query,) * 8 + (limit, offset))
+            hits = cur.fetchall()
+            cur.execute(SQL_SEARCH_FULLTEXT_TOTAL, (query,) * 4)
+            total = int(cur.fetchone()["total"])
+        return hits, total
+
+    def stream_cursor(self, conn):
+        # SSCursor: 결과를 한 번에 버퍼링하지 않고 fetchmany 할 때마다 서버에서 받아옴
+        return conn.cursor(pymysql.cursors.SSCursor)
+
+    def explain(self, sql, params=()):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute("EXPLAIN " + sql, params)
+            return cur.fetchall()
+
+    def full_table_scans(self, sql, params=()):
+        # type=ALL: 인덱스 없이 테이블 전체를 읽는 접근 방식
+        return [r["table"] for r in self.explain(sql, params) if r.get("type") == "ALL"]
+
+
+class SQLiteStorage(Storage):
+    """
+    파일 하나로 동작하는 SQLite 저장소 (MySQL 없이 로컬 벤치마크/부하 테스트용)
+
+    처음 연결할 때 sql/sqlite/schema.sql로 테이블을 만들고 마이그레이션까지 적용함
+
+    replica_path를 주면 그 파일을 조회용 레플리카로 사용 (읽기/쓰기 분리를 로컬에서 확인하는 용도)
+    - 실제 복제는 없고, sync_replica()를 호출할 때 primary 내용을 통째로 복사함 (= 레플리카가 따라잡음)
+    """
+
+    name = "sqlite"
+    SCHEMA_PATH = os.path.join(BASE_DIR, "sql", "sqlite", "schema.sql")
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, replica_path=None, **pool_kwargs):
+        self.path = path
+        self.replica_path = replica_path
+        self._schema_lock = threading.Lock()
+        self._schema_ready = set()   # 스키마를 적용한 파일 경로
+        super().__init__(replica=replica_path is not None, **pool_kwargs)
+
+    def _open(self, path):
+        conn = SQLiteConnection(path)
+        with self._schema_lock:
+            if path not in self._schema_ready:
+                # WAL: 읽기와 쓰기가 서로 막지 않도록 (파일 DB 한정 설정)
+                conn._conn.execute("PRAGMA journal_mode = WAL")
+                with open(self.SCHEMA_PATH, encoding="utf-8") as f:
+                    conn._conn.executescript(f.read())
+                self._migrate(conn)
+                self._schema_ready.add(path)
+        return conn
+
+    def connect(self):
+        return self._open(self.path)
+
+    def connect_replica(self):
+        return self._open(self.replica_path)
+
+    def sync_replica(self):
+        """primary 파일 내용을 레플리카 파일로 복사 (로컬 테스트에서 복제를 흉내내는 용도)"""
+        src = sqlite3.connect(self.path)
+        dst = sqlite3.connect(self.replica_path)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+    def upsert_sum_sql(self, table, key_columns, sum_columns):
+        columns = list(key_columns) + list(sum_columns)
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in sum_columns)
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}"
+        )
+
+    def reset_auto_increment(self, cur, table):
+        cur.execute("DELETE FROM sqlite_sequence WHERE name = %s;", (table,))
+
+    def locking_read_sql(self, sql):
+        # SQLite는 쓰기 트랜잭션이 DB 전체를 잠그므로 (앞에서 이미 INSERT함) 그대로
+        return sql
+
+    def index_search(self, cur, source):
+        # 쓰기 트랜잭션 안이라 다른 쓰기와 겹치지 않음 → last_id 이후 행을 빠짐없이 한 번씩만 색인
+        id_col, columns = SEARCH_SOURCES[source]
+        cur.execute("SELECT last_id FROM search_index_state WHERE source = %s", (source,))
+        row = cur.fetchone()
+        last_id = row["last_id"] if row else 0
+        cur.execute(
+            f"SELECT {id_col} AS doc_id, {', '.join(columns)} FROM {source} "
+            f"WHERE {id_col} > %s ORDER BY {id_col}",
+            (last_id,)
+        )
+        docs = cur.fetchall()
+        if not docs:
+            return
+        postings = []
+        gram_count = 0
+        for doc in docs:
+            grams = search_ngrams(" ".join(doc[c] or "" for c in columns))
+            postings.extend((gram, source, doc["doc_id"], tf) for gram, tf in grams.items())
+            if grams:
+                # 문서 길이 (BM25 정규화용)
+                length = sum(grams.values())
+                postings.append((SEARCH_LENGTH_GRAM, source, doc["doc_id"], length))
+                gram_count += length
+        cur.executemany(
+            "INSERT INTO search_postings (gram, source, doc_id, tf) VALUES (%s, %s, %s, %s)",
+            postings
+        )
+        cur.execute(
+            "INSERT INTO search_index_state (source, last_id, doc_count, gram_count) VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (source) DO UPDATE SET last_id = excluded.last_id, "
+            "doc_count = doc_count + excluded.doc_count, gram_count = gram_count + excluded.gram_count",
+            (source, docs[-1]["doc_id"], len(docs), gram_count)
+        )
+
+    def rebuild_search_index(self):
+        with self.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM search_postings")
+                    cur.execute("DELETE FROM search_index_state")
+                    for source in SEARCH_SOURCES:
+                        self.index_search(cur, source)
+                    cur.execute("SELECT COALESCE(SUM(doc_count), 0) AS n FROM search_index_state")
+                    count = int(cur.fetchone()["n"])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return count
+
+    def search_page(self, query, limit, offset):
+        # 점수 = BM25 (SQL_SEARCH_POSTINGS), idf = ln(1 + 전체 문서 수 / 그 2-gram이 나온 문서 수)
+        grams = list(search_ngrams(query))
+        with self.read_connection(SQL_SEARCH_POSTINGS) as conn, conn.cursor() as cur:
+            cur.execute(SQL_SEARCH_DOC_FREQ, (json.dumps(grams),))
+            rows = cur.fetchall()
+            if not rows:
+                return [], 0
+            weights = json.dumps({
+                r["gram"]: math.log(1 + int(r["n_docs"]) / int(r["df"])) for r in rows
+            })
+            avg_length = int(rows[0]["n_grams"]) / int(rows[0]["n_docs"])
+            cur.execute(SQL_SEARCH_POSTINGS, (avg_length, weights, limit, offset))
+            ranked = cur.fetchall()
+            if ranked:
+                total = int(ranked[0]["total"])
+            else:
+                cur.execute(SQL_SEARCH_POSTINGS_TOTAL, (weights,))
+                total = int(cur.fetchone()["total"])
+
+            by_source = collections.defaultdict(list)
+            for r in ranked:
+                by_source[r["source"]].append(r["doc_id"])
+            docs = {}
+            for source, ids in by_source.items():
+                cur.execute(_search_docs_sql(source, len(ids)), ids)
+                for doc in cur.fetchall():
+                    docs[(source, doc["doc_id"])] = doc
+
+        # 순위를 매긴 뒤 비활성화된 링크처럼 그 사이 보여주면 안 되게 된 문서는 빠짐
+        hits = []
+        for r in ranked:
+            doc = docs.get((r["source"], r["doc_id"]))
+            if doc is not None:
+                hits.append({"source": r["source"], **doc, "score": r["score"]})
+        return hits, total
+
+    def stream_cursor(self, conn):
+        # sqlite3 커서는 원래 한 단계씩 읽어오므로 행 형태만 튜플로
+        return conn.cursor(True)
+
+    def explain(self, sql, params=()):
+        with self.connection() as conn, conn.cursor() as cur:
+            cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return cur.fetchall()
+
+    def full_table_scans(self, sql, params=()):
+        # - "SCAN t": 인덱스 없이 전체 읽기 ("SCAN t USING INDEX ..."는 인덱스 순서로 읽는 것이라 제외)
+        # - "AUTOMATIC ... INDEX": 쿼리마다 테이블 전체를 읽어 임시 인덱스를 만듦 (= 인덱스 누락)
+        scans = []
+        for r in self.explain(sql, params):
+            words = r["detail"].split()
+            if (words[0] == "SCAN" and "INDEX" not in words) or "AUTOMATIC" in words:
+                # SQLite 3.36 이전 형식은 "SCAN TABLE t"
+                table = words[2] if words[1] == "TABLE" else words[1]
+                # "SCAN (subquery-N)": 윈도 함수/서브쿼리 중간 결과를 읽는 것이라 테이블 스캔이 아님
+                if not table.startswith("("):
+                    scans.append(table)
+        return scans
+
+
+def _storage_cfg():
+    try:
+        return dict(st.secrets["storage"])
+    except Exception:
+        return {}
+
+
+@st.cache_resource
+def get_storage():
+    """
+    프로세스 전역 저장소 (모든 세션/페이지가 공유)
+
+    백엔드 선택 우선순위:
+    1) 환경변수 FISA_DB_BACKEND=sqlite (+ FISA_SQLITE_PATH, FISA_SQLITE_REPLICA_PATH)
+    2) secrets.toml [storage] backend = "sqlite" (+ path, replica_path)
+    3) 기본값: MySQL (secrets.toml [mysql] 섹션, pool_size/pool_timeout/pool_recycle/pool_ping 조정 가능)
+
+    조회용 레플리카(선택): MySQL은 secrets.toml [mysql_replica] 섹션 (host 등 + sticky_seconds)
+    """
+    cfg = _storage_cfg()
+    backend = os.getenv("FISA_DB_BACKEND") or cfg.get("backend", "mysql")
+    if backend == "sqlite":
+        path = os.getenv("FISA_SQLITE_PATH") or cfg.get("path", DEFAULT_SQLITE_PATH)
+        replica_path = os.getenv("FISA_SQLITE_REPLICA_PATH") or cfg.get("replica_path")
+        return SQLiteStorage(
+            path,
+            replica_path=replica_path,
+            sticky_seconds=float(cfg.get("replica_sticky_seconds", DEFAULT_REPLICA_STICKY_SECONDS)),
+        )
+    if backend != "mysql":
+        raise ValueError(f"지원하지 않는 저장소 백엔드: {backend}")
+    return MySQLStorage(load_mysql_cfg(), load_mysql_cfg("mysql_replica", required=False))
+
+
+def get_pool():
+    return get_storage().pool
+
+
+def get_connection(timeout=None):
+    """
+    풀에서 커넥션 하나를 꺼냄
+
+    사용법:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                ...
+    블록을 벗어나면 커넥션은 닫히지 않고 풀로 반납됨
+    """
+    return get_pool().acquire(timeout=timeout)
+
+
+# =========================
+# 조회 결과 캐시
+# =========================
+_MISSING = object()
+
+
+def _copy_cached(value):
+    """
+    캐시 값의 복사본: 리스트/dict(행)/튜플(namedtuple 스냅샷)은 안쪽까지 새로 만들고 나머지는 그대로
+
+    캐시 값은 조회 결과(행 dict 리스트, 그걸 담은 namedtuple 등)뿐이라 deepcopy 대신 이 모양만 복사
+    (날짜/문자열/bytes 같은 값은 바꿀 수 없으므로 공유해도 됨)
+    """
+    if isinstance(value, list):
+        return [_copy_cached(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_cached(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        items = [_copy_cached(v) for v in value]
+        return type(value)(*items) if hasattr(value, "_fields") else tuple(items)
+    return value
+
+
+class QueryCache:
+    """
+    테이블별 read-through 조회 캐시
+
+    - 테이블마다 TTLCache 하나 (TTL + 최대 개수 제한)
+    - 캐시 키: (함수 이름, 인자)
+    - 꺼낼 때마다 행까지 복사해서 돌려주므로 세션끼리 같은 행 객체를 공유하지 않음
+    - 쓰기 경로에서 invalidate()로 영향받는 키만 골라서 삭제
+    - 다른 레플리카의 쓰기는 data_versions 버전 비교로 감지해서 테이블 단위로 삭제
+    """
+
+    def __init__(self, ttls=None, maxsize=DEFAULT_CACHE_MAXSIZE):
+        self._ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self._maxsize = maxsize
+        self._tables = {}
+        self._versions = {}      # table -> 이 프로세스가 마지막으로 확인한 버전
+        self._last_poll = 0.0
+        self._lock = threading.RLock()
+        self._listeners = collections.defaultdict(dict)   # table -> {이름: callback}
+
+    def _bucket(self, table):
+        bucket = self._tables.get(table)
+        if bucket is None:
+            ttl = self._ttls.get(table, DEFAULT_CACHE_TTL)
+            bucket = self._tables[table] = TTLCache(maxsize=self._maxsize, ttl=ttl)
+        return bucket
+
+    def get_or_load(self, table, key, loader):
+        with self._lock:
+            value = self._bucket(table).get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            with self._lock:
+                self._bucket(table)[key] = value
+        # 캐시 원본은 여러 세션이 같이 보므로 호출부가 받은 값을 바꿔도(random.shuffle, 행에 키 추가 등)
+        # 원본은 유지되도록 매번 복사본을 돌려줌
+        return _copy_cached(value)
+
+    def invalidate(self, table, name=None, args=None):
+        """
+        - name 없음: 테이블 전체 삭제
+        - name만: 해당 함수의 모든 인자 조합 삭제
+        - name + args: 정확히 그 키 하나만 삭제
+        """
+        with self._lock:
+            bucket = self._tables.get(table)
+            if bucket is None:
+                return
+            if name is None:
+                bucket.clear()
+            elif args is not None:
+                bucket.pop((name, args), None)
+            else:
+                for key in [k for k in bucket.keys() if k[0] == name]:
+                    bucket.pop(key, None)
+
+    def invalidate_partition(self, table, value):
+        """
+        인자 하나짜리 키 중 value가 아닌 것(= 다른 날짜/카테고리)만 남기고 나머지는 삭제
+
+        테이블 캐시의 인자 하나짜리 조회가 모두 같은 값(예: review_date)으로 키가 잡혀 있을 때만 사용
+        (쓰기 큐에서 넘어온 값은 JSON을 거치므로 문자열로 비교)
+        """
+        with self._lock:
+            bucket = self._tables.get(table)
+            if bucket is None:
+                return
+            for key in list(bucket.keys()):
+                args = key[1]
+                if len(args) == 1 and str(args[0]) != str(value):
+                    continue
+                bucket.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+    def add_listener(self, table, name, callback):
+        """
+        table 데이터가 바뀌었을 때(쓰기 큐 반영 후 / 다른 레플리카의 쓰기 감지 후) 호출할 callback()
+
+        같은 name으로 다시 등록하면 교체 (페이지 rerun마다 등록해도 하나만 남음)
+        callback은 쓰기 큐 스레드 등에서 불리므로 오래 걸리는 일은 다른 곳에 넘기고 바로 리턴할 것
+        """
+        with self._lock:
+            self._listeners[table][name] = callback
+
+    def notify_changed(self, table):
+        with self._lock:
+            callbacks = list(self._listeners.get(table, {}).items())
+        for name, callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                _query_log.warning(json.dumps({
+                    "event": "cache_listener_failed", "table": table, "listener": name, "error": repr(e),
+                }, ensure_ascii=False))
+
+    def claim_poll(self, min_interval):
+        """마지막 버전 조회 후 min_interval이 지났으면 True (이번 호출이 조회 담당)"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_poll < min_interval:
+                return False
+            self._last_poll = now
+            return True
+
+    def apply_versions(self, versions):
+        """data_versions 조회 결과를 반영하고, 버전이 바뀐 테이블 목록을 반환"""
+        changed = []
+        with self._lock:
+            for table, version in versions.items():
+                if self._versions.get(table, 0) != version:
+                    self._versions[table] = version
+                    self.invalidate(table)
+                    changed.append(table)
+        return changed
+
+    def note_local_write(self, table, version):
+        """
+        이 프로세스가 직접 버전을 올린 경우
+
+        직전 버전을 알고 있었다면(= 사이에 다른 레플리카 쓰기가 없었다면) 이미 필요한 키만
+        무효화했으므로 버전만 갱신. 아니면 다음 조회 때 테이블 전체가 무효화되도록 그대로 둠
+        """
+        with self._lock:
+            if self._versions.get(table, 0) == version - 1:
+                self._versions[table] = version
+
+
+@st.cache_resource
+def get_query_cache():
+    """프로세스 전역 조회 캐시 (모든 세션/페이지가 공유)"""
+    return QueryCache()
+
+
+def cached_query(table):
+    """
+    페이지 조회 함수에 붙이는 캐시 데코레이터
+
+    사용법:
+        @cached_query("useful_links")
+        def fetch_links_by_category(category_id): ...
+
+        fetch_links_by_category.invalidate(category_id)  # 그 카테고리만 삭제
+        fetch_links_by_category.invalidate()             # 이 함수의 캐시 전체 삭제
+
+    캐시 저장소는 db 모듈(프로세스 전역)에 있으므로 rerun마다 함수가 다시 정의돼도 유지됨
+    """
+    def decorator(func):
+        name = func.__name__
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            # 위치/키워드 인자, 기본값 생략 여부와 상관없이 같은 호출은 같은 키가 되도록
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(bound.arguments.values())
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, make_key(args, kwargs))
+            return get_query_cache().get_or_load(table, key, lambda: func(*args, **kwargs))
+
+        def invalidate(*args, **kwargs):
+            key = make_key(args, kwargs) if (args or kwargs) else None
+            get_query_cache().invalidate(table, name, key)
+
+        wrapper.invalidate = invalidate
+        wrapper.table = table
+        return wrapper
+
+    return decorator
+
+
+# =========================
+# 레플리카 간 캐시 무효화 (data_versions)
+# =========================
+def sync_data_versions(min_interval=DATA_VERSION_POLL_INTERVAL):
+    """
+    페이지 상단에서 rerun마다 호출
+
+    data_versions(PK 조회, 테이블 수만큼의 행)를 읽고 버전이 바뀐 테이블의 캐시만 버림.
+    같은 프로세스의 동시 rerun은 min_interval 안에서 한 번의 조회를 공유함
+    """
+    cache = get_query_cache()
+    if not cache.claim_poll(min_interval):
+        return []
+    changed = cache.apply_versions(get_storage().fetch_data_versions())
+    for table in changed:
+        cache.notify_changed(table)
+    return changed
+
+
+# =========================
+# 쓰기 지연 큐 (write-behind)
+# =========================
+# 폼 제출은 로컬 SQLite 스풀에 한 줄 append만 하고 바로 리턴 (DB 왕복 없음)
+# 백그라운드 스레드가 스풀을 종류별 여러 행 INSERT로 묶어서 DB에 반영하고, 반영된 줄만 스풀에서 삭제
+# - DB 장애 중에는 스풀에 쌓아두고 재시도 간격을 늘려가며 다시 시도 (프로세스가 죽어도 스풀은 남음)
+# - 중복 URL 등 데이터 자체 문제로 실패한 줄은 failed=1로 남기고 로그만 남김 (다른 제출은 계속 반영)
+#   페이지는 check_write()로 걸러낼 수 있는 것(CHECK, 길이, 중복 URL)을 제출 전에 검사하고,
+#   submit_write()로 제출해서 그래도 거절된 줄은 pop_failed_writes()로 제출한 세션에 알림
+# - 다시 시도할 실패인지는 is_retryable_error()로 구분, 그래도 WRITE_BEHIND_MAX_ATTEMPTS번 넘게 실패한 줄은
+#   failed=1로 빼서 한 줄 때문에 뒤의 제출이 모두 막히지 않게 함
+# - 반영 보장은 at-least-once: DB 반영 직후 스풀 삭제 전에 프로세스가 죽으면 재시작 후 한 번 더 들어갈 수 있음
+# - 스풀 파일 하나는 프로세스 하나만 사용할 것
+
+# 제출 종류 -> (배치 INSERT 메서드, {반영 후 무효화할 테이블: 캐시 파티션 인자 위치})
+# - 파티션이 있으면 반영 후 그 값(날짜, 카테고리)의 캐시만 무효화 (QueryCache.invalidate_partition)
+# - None이면 테이블 캐시 전체 무효화
+WRITE_BEHIND_KINDS = {
+    "daily_review": ("insert_daily_reviews", {
+        "daily_reviews": 0, "review_keyword_counts": None, "daily_review_rollups": None,
+    }),
+    "compliment": ("insert_compliments", {"compliments": None, "compliment_word_freq": None}),
+    "seat_review": ("insert_seat_reviews", {"seat_reviews": None}),
+    "link": ("insert_links", {"useful_links": 0}),   # category_id
+}
+
+# DB에 닿지 못했거나 잠깐 막힌 경우 = 나중에 다시 시도할 실패
+# pymysql은 매핑되지 않은 errno(CHECK 위반 3819, 없는 컬럼 1054 등)도 OperationalError로 올리므로
+# 예외 클래스가 아니라 errno로 구분 (나머지는 데이터/스키마 문제 → 다시 해도 똑같이 실패)
+_RETRYABLE_MYSQL_ERRNOS = {
+    1040,   # Too many connections
+    1205,   # Lock wait timeout
+    1213,   # Deadlock
+    2002, 2003,   # 서버에 연결할 수 없음
+    2006,   # MySQL server has gone away
+    2013,   # Lost connection during query
+    2055,   # Lost connection (system error)
+}
+_RETRYABLE_SQLITE_ERRORS = ("SQLITE_BUSY", "SQLITE_LOCKED", "SQLITE_IOERR", "SQLITE_CANTOPEN", "SQLITE_FULL")
+
+
+def is_retryable_error(exc):
+    """나중에 다시 하면 될 수 있는 실패인지 (연결 끊김/타임아웃/잠금), 아니면 그 데이터는 다시 해도 실패"""
+    if isinstance(exc, (TimeoutError, pymysql.err.InterfaceError)):
+        return True   # 풀 대기 시간 초과 / 이미 끊긴 커넥션
+    if isinstance(exc, pymysql.err.OperationalError):
+        return bool(exc.args) and exc.args[0] in _RETRYABLE_MYSQL_ERRNOS
+    if isinstance(exc, sqlite3.OperationalError):
+        return getattr(exc, "sqlite_errorname", "").startswith(_RETRYABLE_SQLITE_ERRORS)
+    return False
+
+
+# 스풀 한 줄 (lookup() 반환값)
+SpoolEntry = collections.namedtuple("SpoolEntry", ["kind", "args", "failed", "last_error"])
+
+SQL_CREATE_SPOOL = """
+CREATE TABLE IF NOT EXISTS spool (
+    spool_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind       TEXT    NOT NULL,
+    payload    TEXT    NOT NULL,
+    created_at REAL    NOT NULL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    failed     INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+)
+"""
+
+
+class WriteBehindQueue:
+    """
+    로컬 스풀 + 백그라운드 배치 반영
+
+    사용법:
+        get_write_queue().submit("compliment", message)
+        get_write_queue().submit("daily_review", review_date, review, difficulty)
+
+    반영이 끝나면 해당 테이블의 조회 캐시(파티션이 있으면 그 값의 캐시만)를 무효화하고 data_versions도 올리므로
+    다른 레플리카도 다음 rerun에서 새 데이터를 봄
+    """
+
+    def __init__(self, storage, path=DEFAULT_SPOOL_PATH, linger=WRITE_BEHIND_LINGER,
+                 batch_size=WRITE_BEHIND_BATCH_SIZE, retry_interval=WRITE_BEHIND_RETRY_INTERVAL,
+                 max_backoff=WRITE_BEHIND_MAX_BACKOFF, max_attempts=WRITE_BEHIND_MAX_ATTEMPTS, start=True):
+        self._storage = storage
+        self.path = path
+        self.linger = linger
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        # 프로세스 크래시에는 안전하고(WAL), 제출마다 fsync는 하지 않음(synchronous=NORMAL)
+        self._spool = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._spool.execute("PRAGMA journal_mode=WAL")
+        self._spool.execute("PRAGMA synchronous=NORMAL")
+        self._spool.execute(SQL_CREATE_SPOOL)
+        self._lock = threading.Lock()
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        if start:
+            self.start()
+
+    # ---------- 제출 (페이지 쪽) ----------
+    def submit(self, kind, *args):
+        """스풀에 한 건 추가하고 spool_id를 반환 (DB 반영은 백그라운드에서)"""
+        if kind not in WRITE_BEHIND_KINDS:
+            raise ValueError(f"알 수 없는 쓰기 종류: {kind}")
+        payload = json.dumps(args, ensure_ascii=False, default=str)
+        with self._lock:
+            cur = self._spool.execute(
+                "INSERT INTO spool (kind, payload, created_at) VALUES (?, ?, ?)",
+                (kind, payload, time.time())
+            )
+            spool_id = cur.lastrowid
+        # 제출한 세션은 반영될 때까지 레플리카가 아닌 primary에서 조회 (read-your-writes)
+        stick_session_to_primary(self._storage.sticky_seconds)
+        self._wake.set()
+        return spool_id
+
+    def pending_count(self):
+        with self._lock:
+            return self._spool.execute("SELECT COUNT(*) FROM spool WHERE failed = 0").fetchone()[0]
+
+    def failed_rows(self):
+        """반영을 포기한 제출 목록 (수동 확인용)"""
+        with self._lock:
+            return self._spool.execute(
+                "SELECT spool_id, kind, payload, attempts, last_error FROM spool WHERE failed = 1"
+            ).fetchall()
+
+    def lookup(self, spool_ids):
+        """아직 스풀에 남아 있는 줄만 {spool_id: SpoolEntry} (반영돼서 삭제된 id는 빠짐)"""
+        if not spool_ids:
+            return {}
+        placeholders = ", ".join("?" * len(spool_ids))
+        with self._lock:
+            rows = self._spool.execute(
+                f"SELECT spool_id, kind, payload, failed, last_error FROM spool WHERE spool_id IN ({placeholders})",
+                tuple(spool_ids)
+            ).fetchall()
+        return {
+            spool_id: SpoolEntry(kind, tuple(json.loads(payload)), bool(failed), last_error)
+            for spool_id, kind, payload, failed, last_error in rows
+        }
+
+    # ---------- 반영 (백그라운드) ----------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def close(self, flush=True):
+        """스레드를 멈추고, flush=True면 남은 스풀을 한 번 더 반영 시도"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if flush:
+            try:
+                self.flush()
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                # 스풀에 남아 있으므로 다음 실행에서 반영
+
+    def flush(self):
+        """스풀이 빌 때까지 반영하고, 이번에 반영한 건수를 반환 (DB에 못 닿으면 예외)"""
+        total = 0
+        while True:
+            done, fetched = self._flush_batch()
+            total += done
+            if fetched < self.batch_size:
+                return total
+
+    def _run(self):
+        backoff = 0.0
+        while not self._stopping.is_set():
+            # 제출이 없어도 retry_interval마다 깨어나서 남은 스풀(재시작 직후, 장애 복구 후) 처리
+            self._wake.wait(self.retry_interval)
+            if self._stopping.is_set():
+                return
+            self._wake.clear()
+            # 수업 끝날 때처럼 몰리는 제출을 한 배치로 묶기 위해 잠깐 대기
+            self._stopping.wait(self.linger)
+            try:
+                self.flush()
+                backoff = 0.0
+            except Exception as e:
+                if not is_retryable_error(e):
+                    _query_log.exception(f"write-behind 반영 중 예상하지 못한 오류: {e!r}")
+                    self._stopping.wait(self.retry_interval)
+                    continue
+                backoff = min(self.max_backoff, max(self.retry_interval, backoff * 2))
+                _query_log.warning(json.dumps({
+                    "event": "write_behind_retry",
+                    "pending": self.pending_count(),
+                    "retry_in": backoff,
+                    "error": repr(e),
+                }, ensure_ascii=False))
+                self._stopping.wait(backoff)
+
+    def _flush_batch(self):
+        with self._lock:
+            rows = self._spool.execute(
+                "SELECT spool_id, kind, payload FROM spool WHERE failed = 0 ORDER BY spool_id LIMIT ?",
+                (self.batch_size,)
+            ).fetchall()
+        if not rows:
+            return 0, 0
+
+        by_kind = {}
+        for spool_id, kind, payload in rows:
+            by_kind.setdefault(kind, []).append((spool_id, tuple(json.loads(payload))))
+
+        done = []
+        try:
+            for kind, items in by_kind.items():
+                method, tables = WRITE_BEHIND_KINDS[kind]
+                insert_many = getattr(self._storage, method)
+                try:
+                    insert_many([args for _, args in items])
+                    done.extend(spool_id for spool_id, _ in items)
+                except Exception as e:
+                    if is_retryable_error(e):
+                        raise
+                    # 배치 안의 한 건 때문에 실패한 경우 → 한 건씩 다시 넣어서 문제 있는 줄만 골라냄
+                    done.extend(self._insert_one_by_one(kind, insert_many, items))
+                for table, partition in tables.items():
+                    self._invalidate(table, partition, items)
+        except Exception as e:
+            # 다시 시도할 실패든 예상 못한 실패든 시도 횟수를 세서 끝없이 같은 줄만 붙잡지 않게 함
+            done_ids = set(done)
+            self._mark_attempt([spool_id for spool_id, _, _ in rows if spool_id not in done_ids], e)
+            raise
+        finally:
+            self._delete(done)
+        return len(done), len(rows)
+
+    def _invalidate(self, table, partition, items):
+        cache = get_query_cache()
+        if partition is None:
+            cache.invalidate(table)
+        else:
+            for value in {args[partition] for _, args in items}:
+                cache.invalidate_partition(table, value)
+        cache.notify_changed(table)
+
+    def _insert_one_by_one(self, kind, insert_many, items):
+        done = []
+        for spool_id, args in items:
+            try:
+                insert_many([args])
+                done.append(spool_id)
+            except Exception as e:
+                if is_retryable_error(e):
+                    raise
+                with self._lock:
+                    self._spool.execute(
+                        "UPDATE spool SET failed = 1, attempts = attempts + 1, last_error = ? WHERE spool_id = ?",
+                        (repr(e), spool_id)
+                    )
+                self._log_dropped(kind, spool_id, e)
+        return done
+
+    def _mark_attempt(self, spool_ids, error):
+        # 시도 횟수 +1, max_attempts에 닿은 줄은 failed=1로 빼냄
+        if not spool_ids:
+            return
+        with self._lock:
+            self._spool.executemany(
+                "UPDATE spool SET attempts = attempts + 1, last_error = ? WHERE spool_id = ?",
+                [(repr(error), i) for i in spool_ids]
+            )
+            placeholders = ", ".join("?" * len(spool_ids))
+            given_up = self._spool.execute(
+                f"SELECT spool_id, kind FROM spool WHERE spool_id IN ({placeholders}) AND attempts >= ?",
+                (*spool_ids, self.max_attempts)
+            ).fetchall()
+            self._spool.executemany("UPDATE spool SET failed = 1 WHERE spool_id = ?", [(i,) for i, _ in given_up])
+        for spool_id, kind in given_up:
+            self._log_dropped(kind, spool_id, error)
+
+    def _log_dropped(self, kind, spool_id, error):
+        _query_log.warning(json.dumps({
+            "event": "write_behind_dropped",
+            "kind": kind,
+            "spool_id": spool_id,
+            "error": repr(error),
+        }, ensure_ascii=False))
+
+    def _delete(self, spool_ids):
+        if not spool_ids:
+            return
+        with self._lock:
+            self._spool.executemany("DELETE FROM spool WHERE spool_id = ?", [(i,) for i in spool_ids])
+
+
+@st.cache_resource
+def get_write_queue():
+    """
+    프로세스 전역 쓰기 지연 큐
+
+    스풀 경로: 환경변수 FISA_SPOOL_PATH > secrets.toml [storage] spool_path > 기본값(fisa_spool.sqlite3)
+    """
+    path = os.getenv("FISA_SPOOL_PATH") or _storage_cfg().get("spool_path", DEFAULT_SPOOL_PATH)
+    wq = WriteBehindQueue(get_storage(), path)
+    atexit.register(wq.close)
+    return wq
+
+
+# ---------- 페이지용: 제출 전 검사 / 세션별 제출 추적 ----------
+_SESSION_WRITES_KEY = "_write_behind_spool_ids"
+
+# 스키마의 VARCHAR 길이 (sql/create_*.sql과 맞출 것)
+SEAT_REVIEW_COMMENT_MAX = 200
+LINK_FIELD_LIMITS = (("제목", 200), ("URL", 500), ("설명", 500), ("작성자", 50))   # title, url, description, created_by
+
+
+def check_write(kind, *args):
+    """
+    submit_write() 전에 호출: DB가 거절할 제출이면 안내 문구, 괜찮으면 None
+
+    스풀에 들어간 뒤 거절되면 제출한 사람은 다음 rerun에서야 알게 되므로
+    CHECK 제약, VARCHAR 길이, 중복 URL처럼 미리 알 수 있는 것은 여기서 거름
+    """
+    if kind == "daily_review":
+        _, _, difficulty = args
+        if difficulty not in range(1, 6):
+            return "난이도는 1~5 중에서 골라주세요."
+    elif kind == "seat_review":
+        _, rating, comment = args
+        if rating not in range(1, 6):
+            return "별점은 1~5점이에요."
+        if len(comment) > SEAT_REVIEW_COMMENT_MAX:
+            return f"한줄평은 {SEAT_REVIEW_COMMENT_MAX}자까지 쓸 수 있어요."
+    elif kind == "link":
+        category_id, _, url, _, _ = args
+        for value, (label, limit) in zip(args[1:], LINK_FIELD_LIMITS):
+            if value and len(value) > limit:
+                return f"{label}은(는) {limit}자까지 쓸 수 있어요."
+        # DB에 있는 것 + 이 세션이 방금 제출해서 아직 반영 대기 중인 것
+        pending = {a[2] for a in pending_writes("link") if a[0] == category_id}
+        if url in pending or get_storage().link_exists(category_id, url):
+            return "이미 등록된 링크예요."
+    return None
+
+
+def submit_write(kind, *args):
+    """쓰기 큐에 제출하고 spool_id를 현재 세션의 제출 목록에 기록 (pending_writes() / pop_failed_writes()용)"""
+    spool_id = get_write_queue().submit(kind, *args)
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        st.session_state.setdefault(_SESSION_WRITES_KEY, []).append(spool_id)
+    return spool_id
+
+
+def _session_entries():
+    # 현재 세션이 제출해서 아직 스풀에 있는 줄, 반영이 끝나 스풀에서 지워진 id는 세션 목록에서도 정리
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return {}
+    ids = st.session_state.get(_SESSION_WRITES_KEY)
+    if not ids:
+        return {}
+    entries = get_write_queue().lookup(ids)
+    st.session_state[_SESSION_WRITES_KEY] = [i for i in ids if i in entries]
+    return entries
+
+
+def pending_writes(kind):
+    """현재 세션이 제출했고 아직 DB 반영 대기 중인 kind 제출의 인자 목록 (최근 제출 먼저)"""
+    return [e.args for _, e in sorted(_session_entries().items(), reverse=True) if e.kind == kind and not e.failed]
+
+
+def pop_failed_writes(kind):
+    """
+    현재 세션의 kind 제출 중 DB가 거절한 것 [(args, last_error), ...]
+
+    한 번 돌려준 줄은 세션 목록에서 빼므로 같은 알림이 rerun마다 반복되지 않음
+    (스풀에는 failed=1로 남아 있어서 failed_rows()로 확인 가능)
+    """
+    entries = _session_entries()
+    failed = [(i, e) for i, e in sorted(entries.items()) if e.kind == kind and e.failed]
+    if failed:
+        popped = {i for i, _ in failed}
+        st.session_state[_SESSION_WRITES_KEY] = [i for i in st.session_state[_SESSION_WRITES_KEY] if i not in popped]
+    return [(e.args, e.last_error) for _, e in failed]
+
+
+# =========================
+# 쿼리 플랜 점검
+# =========================
+def check_query_plans(storage=None):
+    """
+    등록된 조회 쿼리를 모두 EXPLAIN해서 허용되지 않은 풀 테이블 스캔을 찾음
+
+    반환: [(쿼리 이름, 테이블), ...] (비어 있으면 통과)
+    """
+    storage = storage or get_storage()
+    problems = []
+    for spec in REGISTERED_QUERIES.values():
+        if spec.dialect not in (None, storage.name):
+            continue
+        for table in storage.full_table_scans(spec.sql, spec.sample_params):
+            if table not in spec.full_scan_ok:
+                problems.append((spec.name, table))
+    return problems
+
+
+if __name__ == "__main__":
+    # python db.py migrate      : 마이그레이션 적용
+    # python db.py check-plans  : 풀 테이블 스캔 점검 (문제가 있으면 종료 코드 1)
+    # python db.py export compliments [-o compliments.csv] : CSV 내보내기 (기본은 표준출력)
+    # python db.py backfill-keywords : review_keyword_counts, keyword_doc_freq를 리뷰 원문으로 다시 만듦
+    # python db.py backfill-rollups : daily_review_rollups를 daily_reviews로 다시 만듦
+    # python db.py backfill-search : 검색 색인(SQLite search_postings)을 처음부터 다시 만듦
+    # python db.py backfill-wordfreq : compliment_word_freq를 칭찬 원문으로 다시 만듦
+    # 대상 DB는 get_storage()와 같은 규칙으로 선택 (FISA_DB_BACKEND 등)
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=[
+        "migrate", "check-plans", "export", "backfill-keywords", "backfill-rollups", "backfill-search",
+        "backfill-wordfreq",
+    ])
+    parser.add_argument("name", nargs="?", choices=sorted(EXPORT_QUERIES))
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args()
+
+    storage = get_storage()
+    if args.command == "migrate":
+        applied = storage.migrate()
+        print(f"적용한 마이그레이션: {applied or '없음'}")
+    elif args.command == "backfill-keywords":
+        print(f"review_keyword_counts/keyword_doc_freq: (날짜, 토큰) {storage.rebuild_keyword_counts()}개")
+    elif args.command == "backfill-rollups":
+        print(f"daily_review_rollups: 날짜 {storage.rebuild_review_rollups()}개")
+    elif args.command == "backfill-wordfreq":
+        print(f"compliment_word_freq: 단어 {storage.rebuild_compliment_word_freq()}개")
+    elif args.command == "backfill-search":
+        count = storage.rebuild_search_index()
+        if count is None:
+            print("검색 색인은 DB가 직접 관리함 (MySQL FULLTEXT), 다시 만들 것이 없음")
+        else:
+            print(f"search_postings: 문서 {count}개 색인")
+    elif args.command == "export":
+        if args.name is None:
+            parser.error("export할 대상을 지정하세요")
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                count = storage.export_csv(args.name, f)
+            print(f"{args.name}: {count}행 -> {args.output}", file=sys.stderr)
+        else:
+            storage.export_csv(args.name, sys.stdout)
+    else:
+        problems = check_query_plans(storage)
+        for name, table in problems:
+            print(f"풀 테이블 스캔: {name} ({table})")
+        if problems:
+            sys.exit(1)
+        print(f"등록된 쿼리 {len(REGISTERED_QUERIES)}개 모두 통과")
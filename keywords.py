@@ -0,0 +1,182 @@
+import functools
+import math
+import re
+from collections import Counter, defaultdict
+
+from wordcloud import STOPWORDS as WORDCLOUD_STOPWORDS
+
+# =========================
+# 리뷰 키워드 추출 규칙
+# =========================
+# 1_오늘의요약 페이지와 db.py(리뷰 INSERT 때 review_keyword_counts 누적)가 같은 규칙을 쓰도록 한곳에 둠
+# 규칙을 바꾸면 python db.py backfill-keywords 로 누적 테이블을 다시 만들어야 함
+# (bench/keywords_bench.py --check 로 예전 구현과 결과가 같은지 확인)
+
+ENDINGS = [
+    "하는", "했다", "하였다", "해서", "하여", "하고",
+    "되는", "되었다", "배웠다", "배우는",
+    "사용하는", "활용하는",
+    "이다", "였다",
+    "에서", "으로", "에게",
+    "을", "를", "은", "는", "이", "가"
+]
+
+STOPWORDS = {
+    "오늘", "오늘은", "수업", "정말", "너무", "조금",
+    "같다", "것", "방법", "등", "등의",
+    "하고", "및", "또", "또는", "그리고"
+}
+
+DEFAULT_TOKEN_CACHE_SIZE = 65536   # 토큰 → 정규화 결과 캐시 크기 (한 기수 어휘는 보통 수천 개)
+
+_END = ""   # trie 노드에서 "여기서 끝나는 어미의 우선순위"를 담는 키 (글자 하나짜리 키와 겹치지 않음)
+
+
+class Tokenizer:
+    """
+    리뷰 키워드 토큰화기 (한 번 만들어서 재사용)
+
+    - 특수문자 제거 정규식은 미리 컴파일
+    - 어미 제거: 어미를 뒤집어서 만든 trie를 토큰 끝에서부터 한 번만 훑음
+      여러 어미가 맞으면 endings 목록에서 앞에 있는 것을 고름 (기존 endswith 순회와 같은 결과,
+      예: "사용하는"은 목록 앞쪽의 "하는"이 먼저 맞으므로 "사용")
+    - 토큰 → 키워드(정규화 + 길이/불용어 필터) 결과는 LRU 캐시
+    - 여러 리뷰를 한 번에: tokenize_many(), count(), extract_keywords()
+    """
+
+    def __init__(self, endings=ENDINGS, stopwords=STOPWORDS, min_len=2, max_len=6,
+                 cache_size=DEFAULT_TOKEN_CACHE_SIZE):
+        self._pattern = re.compile(r"[^가-힣a-zA-Z ]")
+        self._stopwords = frozenset(stopwords)
+        self.min_len = min_len
+        self.max_len = max_len
+
+        self._trie = {}
+        for priority, ending in enumerate(endings):
+            node = self._trie
+            for ch in reversed(ending):
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, priority)   # 같은 어미가 두 번 있으면 앞의 것
+
+        self.keyword = functools.lru_cache(maxsize=cache_size)(self._keyword)
+
+    def normalize(self, token):
+        """토큰 끝의 어미 하나를 떼어냄 (맞는 어미가 없으면 그대로)"""
+        node = self._trie
+        best_priority = best_len = None
+        for depth, ch in enumerate(reversed(token), 1):
+            node = node.get(ch)
+            if node is None:
+                break
+            priority = node.get(_END)
+            if priority is not None and (best_priority is None or priority < best_priority):
+                best_priority, best_len = priority, depth
+        return token if best_len is None else token[:-best_len]
+
+    def _keyword(self, token):
+        # 정규화한 토큰, 키워드가 아니면(길이/불용어) None
+        token = self.normalize(token)
+        if self.min_len <= len(token) <= self.max_len and token not in self._stopwords:
+            return token
+        return None
+
+    def tokenize(self, text):
+        """리뷰 한 개에서 키워드 후보 토큰 목록 (등장한 순서, 중복 포함)"""
+        keyword = self.keyword
+        return [
+            kw for kw in map(keyword, self._pattern.sub("", text).split())
+            if kw is not None
+        ]
+
+    def tokenize_many(self, texts):
+        """리뷰 여러 개를 각각 토큰화 [[토큰, ...], ...]"""
+        return [self.tokenize(text) for text in texts]
+
+    def count(self, texts):
+        """
+        리뷰 여러 개 전체의 토큰 등장 횟수 Counter
+
+        리뷰를 공백으로 이어붙여서 정규식/split을 한 번에 처리 (공백은 지워지지 않으므로
+        리뷰 경계가 토큰을 합치지 않음), 등장 순서도 리뷰 순서 그대로 유지됨
+        """
+        keyword = self.keyword
+        return Counter(
+            kw for kw in map(keyword, self._pattern.sub("", " ".join(texts)).split())
+            if kw is not None
+        )
+
+    def extract_keywords(self, texts, top_n=5):
+        return [w for w, _ in self.count(texts).most_common(top_n)]
+
+
+def rank_tfidf(candidates, n_docs, top_n=5):
+    """
+    TF-IDF 상위 top_n개 [(token, 점수), ...]
+
+    - candidates: [(token, 기간 안 등장 횟수, 그 토큰이 나온 문서 수), ...]
+    - n_docs: 전체 문서 수 (주요 키워드에서는 문서 = 리뷰가 있는 날짜 하루)
+    - idf = ln((1 + n_docs) / (1 + 문서 수)) → 매일 나오는 토큰은 0점
+      점수가 같으면 등장 횟수가 많은 순, 그다음 토큰 순 (문서가 하루뿐이면 횟수 순과 같음)
+    """
+    scored = [
+        (tf * math.log((1 + n_docs) / (1 + df)), tf, token)
+        for token, tf, df in candidates
+    ]
+    scored.sort(key=lambda x: (-x[0], -x[1], x[2]))
+    return [(token, score) for score, _, token in scored[:top_n]]
+
+
+# 프로세스 전역 기본 토큰화기 (캐시를 공유하도록 모듈에서 하나만 만듦)
+TOKENIZER = Tokenizer()
+
+# 예전 함수 이름 호환
+normalize_korean_token = TOKENIZER.normalize
+tokenize_review = TOKENIZER.tokenize
+extract_keywords = TOKENIZER.extract_keywords
+
+
+# =========================
+# 칭찬 워드클라우드 단어 규칙
+# =========================
+# WordCloud.process_text()와 같은 규칙으로 단어를 셈 (db.py가 칭찬 INSERT 때 compliment_word_freq에 누적)
+# - 단어: \w[\w']*, 끝의 's 제거, 숫자만인 단어 제외, 영어 불용어 제외
+# - 대소문자/복수형 합치기는 그릴 때 상위 단어끼리만 (merge_cloud_words)
+# - 두 단어 묶음(collocation)은 셀 수 없으므로 빠짐 (전체 말뭉치 기준 통계가 필요함)
+# 규칙을 바꾸면 python db.py backfill-wordfreq 로 누적 테이블을 다시 만들어야 함
+
+CLOUD_WORD_MAX_LEN = 64   # compliment_word_freq.word 컬럼 길이
+_CLOUD_WORD = re.compile(r"\w[\w']*")
+_CLOUD_STOPWORDS = frozenset(w.lower() for w in WORDCLOUD_STOPWORDS)
+
+
+def cloud_word_counts(texts):
+    """칭찬 여러 개의 워드클라우드 단어 등장 횟수 Counter (대소문자 그대로)"""
+    counts = Counter()
+    for word in _CLOUD_WORD.findall(" ".join(texts)):
+        if word.lower().endswith("'s"):
+            word = word[:-2]
+        if (not word or word.isdigit() or len(word) > CLOUD_WORD_MAX_LEN
+                or word.lower() in _CLOUD_STOPWORDS):
+            continue
+        counts[word] += 1
+    return counts
+
+
+def merge_cloud_words(word_counts):
+    """
+    [(단어, 횟수), ...] → {단어: 횟수} (WordCloud의 process_tokens와 같은 방식)
+
+    대소문자만 다른 단어는 가장 많이 쓰인 표기로 합치고, 끝에 s를 뗀 단어가 있으면 복수형으로 보고 합침
+    """
+    cases = defaultdict(Counter)
+    for word, n in word_counts:
+        cases[word.lower()][word] += n
+    for key in list(cases):
+        if key.endswith("s") and not key.endswith("ss") and key[:-1] in cases:
+            singular = cases[key[:-1]]
+            for word, n in cases.pop(key).items():
+                singular[word[:-1]] += n
+    return {
+        max(variants.items(), key=lambda x: x[1])[0]: sum(variants.values())
+        for variants in cases.values()
+    }
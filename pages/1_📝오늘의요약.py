@@ -2,8 +2,7 @@ import streamlit as st
 import datetime
 import sys
 import os
-import re
-from collections import Counter
+from collections import namedtuple
 import matplotlib.pyplot as plt
 import koreanize_matplotlib
 
@@ -11,7 +10,11 @@ import koreanize_matplotlib
 # db.py import 경로 설정
 # =========================
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from db import get_connection
+from db import (
+    get_storage, check_write, submit_write, pending_writes, pop_failed_writes, cached_query,
+    sync_data_versions, begin_query_stats, report_query_stats,
+)
+from charts import cached_chart, content_hash
 
 emoji_map = {
     1: "😀",
@@ -21,6 +24,9 @@ emoji_map = {
     5: "🤯"
 }
 
+labels_map = {1:"쉬움",2:"보통",3:"약간 어려움",4:"어려움",5:"매우 어려움"}
+colors_map = {1:"#B8E1DD",2:"#C7D8F2",3:"#FFF1A8",4:"#FFD6A5",5:"#FFADAD"}
+
 st.set_page_config(
     page_title="오늘의 한 줄 리뷰",
     layout="centered"
@@ -28,9 +34,109 @@ st.set_page_config(
 
 st.title("📘 오늘의 수업을 요약해주세요")
 
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("1_오늘의요약")
+
+# 다른 레플리카에서 바뀐 테이블이 있으면 해당 캐시만 버림
+sync_data_versions()
+
+# =========================
+# 날짜별 스냅샷 (쿼리 한 번 + 날짜별 캐시)
+# =========================
+# reviews: 그 날짜 리뷰 최신순 / difficulty_counts: {난이도: 리뷰 수} (DB에서 집계)
+DailyReviewSnapshot = namedtuple("DailyReviewSnapshot", ["reviews", "difficulty_counts"])
+
+
+@cached_query("daily_reviews")
+def fetch_daily_snapshot(review_date):
+    """
+    날짜 하나의 리뷰 목록 + 난이도 분포를 한 번에 만들어서 날짜별로 캐시
+
+    새 리뷰가 DB에 반영되면 쓰기 큐가 그 날짜의 스냅샷만 무효화함
+    """
+    reviews, difficulty_counts = get_storage().fetch_daily_review_snapshot(review_date)
+    return DailyReviewSnapshot(reviews, difficulty_counts)
+
+
+def fetch_pending_reviews():
+    """
+    이 세션이 제출했지만 아직 DB 반영 대기 중인 리뷰 [(review_date, review, difficulty), ...] (최근 것부터)
+
+    쓰기 큐가 반영하기 전에도 내가 쓴 리뷰는 목록/난이도 분포/키워드에 바로 보이도록 덧붙일 때 사용
+    (스풀에는 JSON으로 들어가므로 날짜는 문자열 → date로)
+    """
+    return [
+        (datetime.date.fromisoformat(review_date), review, difficulty)
+        for review_date, review, difficulty in pending_writes("daily_review")
+    ]
+
+
+def with_pending_reviews(snapshot, review_date, pending):
+    """캐시된 스냅샷은 그대로 두고, 그 날짜의 반영 대기 중 리뷰를 앞에 붙인 새 스냅샷"""
+    mine = [
+        {"review_date": d, "review": review, "difficulty": difficulty, "pending": True}
+        for d, review, difficulty in pending if d == review_date
+    ]
+    if not mine:
+        return snapshot
+    difficulty_counts = dict(snapshot.difficulty_counts)
+    for r in mine:
+        difficulty_counts[r["difficulty"]] = difficulty_counts.get(r["difficulty"], 0) + 1
+    return DailyReviewSnapshot(mine + list(snapshot.reviews), difficulty_counts)
+
+
+# =========================
+# 주요 키워드 (review_keyword_counts 누적 테이블 top-N)
+# =========================
+# 리뷰 INSERT 때 keywords.py 규칙으로 날짜별 토큰 횟수를 미리 쌓아두므로 원문을 다시 토큰화하지 않음
+# 날짜/주/달은 TF-IDF 순 (매일 나오는 말보다 그 기간에만 많이 나온 말이 위로)
+# 기수 전체는 비교할 나머지 기간이 없으므로 등장 횟수 순
+KEYWORD_SCOPES = ["선택한 날", "그 주", "그 달", "기수 전체"]
+
+
+def keyword_period(selected_date, scope):
+    """(시작일, 종료일, 제목) / 기수 전체는 시작일, 종료일이 None"""
+    if scope == "그 주":
+        start = selected_date - datetime.timedelta(days=selected_date.weekday())
+        end = start + datetime.timedelta(days=6)
+        return start, end, f"{start.month}월 {start.day}일 ~ {end.month}월 {end.day}일"
+    if scope == "그 달":
+        start = selected_date.replace(day=1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+        return start, end, f"{start.year}년 {start.month}월"
+    if scope == "기수 전체":
+        return None, None, "기수 전체"
+    return selected_date, selected_date, f"{selected_date.month}월 {selected_date.day}일"
+
+
+@cached_query("review_keyword_counts")
+def fetch_top_keywords(start, end, limit=5):
+    if start is None:
+        return get_storage().fetch_top_keywords_all(limit)
+    return get_storage().fetch_top_keywords(start, end, limit)
+
+
+def fetch_top_keywords_with_pending(start, end, pending, limit=5):
+    """
+    기간 안에 이 세션의 반영 대기 중 리뷰가 있으면 그 리뷰까지 더해서 순위 (캐시를 거치지 않음)
+
+    반영이 끝나면 pending이 비므로 다시 캐시된 fetch_top_keywords()를 씀
+    """
+    mine = [(d, review) for d, review, _ in pending if start is None or start <= d <= end]
+    if not mine:
+        return fetch_top_keywords(start, end, limit)
+    if start is None:
+        return get_storage().fetch_top_keywords_all(limit, pending=mine)
+    return get_storage().fetch_top_keywords(start, end, limit, pending=mine)
+
+
 # =========================
 # 입력 폼
 # =========================
+# 이 세션에서 제출했지만 DB 반영 단계에서 거절된 리뷰 알림
+for (failed_date, failed_text, _), _ in pop_failed_writes("daily_review"):
+    st.error(f"{failed_date} 리뷰 「{failed_text}」는 저장되지 못했어요. 다시 제출해주세요.")
+
 with st.form(key="daily_review_form", clear_on_submit=True):
 
     review_date = st.date_input("📅 수업 날짜", value=datetime.date.today())
@@ -51,19 +157,14 @@ with st.form(key="daily_review_form", clear_on_submit=True):
     submitted = st.form_submit_button("제출")
 
     if submitted:
+        problem = check_write("daily_review", review_date, review_text, difficulty)
         if not review_text.strip():
             st.warning("리뷰 내용을 입력해주세요!")
+        elif problem:
+            st.warning(problem)
         else:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO daily_reviews (review_date, review, difficulty)
-                VALUES (%s, %s, %s)
-                """,
-                (review_date, review_text, difficulty)
-            )
-            conn.close()
+            # 스풀에 넣고 바로 리턴, DB 반영과 캐시 무효화는 백그라운드 쓰기 큐가 처리
+            submit_write("daily_review", review_date, review_text, difficulty)
             st.success("오늘의 리뷰가 저장되었습니다 ✨")
 
 st.divider()
@@ -74,81 +175,27 @@ st.divider()
 st.subheader("📅 지난 수업 리뷰 조회")
 selected_date = st.date_input("조회할 날짜 선택")
 
-conn = get_connection()
-cur = conn.cursor()
-cur.execute(
-    """
-    SELECT review, difficulty
-    FROM daily_reviews
-    WHERE review_date = %s
-    """,
-    (selected_date,)
-)
-rows = cur.fetchall()
-conn.close()
-
-# =========================
-# 키워드 추출
-# =========================
-def normalize_korean_token(token):
-    endings = [
-        "하는", "했다", "하였다", "해서", "하여", "하고",
-        "되는", "되었다", "배웠다", "배우는",
-        "사용하는", "활용하는",
-        "이다", "였다",
-        "에서", "으로", "에게",
-        "을", "를", "은", "는", "이", "가"
-    ]
-    for end in endings:
-        if token.endswith(end):
-            return token[:-len(end)]
-    return token
-
-
-def extract_keywords(texts, top_n=5):
-    stopwords = {
-        "오늘", "오늘은", "수업", "정말", "너무", "조금",
-        "같다", "것", "방법", "등", "등의",
-        "하고", "및", "또", "또는", "그리고"
-    }
-
-    words = []
-
-    for text in texts:
-        cleaned = re.sub(r"[^가-힣a-zA-Z ]", "", text)
-        for token in cleaned.split():
-            token = normalize_korean_token(token)
-            if 2 <= len(token) <= 6 and token not in stopwords:
-                words.append(token)
-
-    return [w for w, _ in Counter(words).most_common(top_n)]
+# 아래 목록/분포/키워드는 이 세션이 방금 제출해서 아직 DB 반영 대기 중인 리뷰까지 포함
+pending_reviews = fetch_pending_reviews()
+snapshot = with_pending_reviews(fetch_daily_snapshot(selected_date), selected_date, pending_reviews)
 
 st.subheader("🔑 주요 키워드")
 
-if rows:
-    keywords = extract_keywords([r["review"] for r in rows])
-    st.markdown(f"### #{selected_date.month}월 {selected_date.day}일의 주요 키워드  \n{'  '.join(keywords)}")
+keyword_scope = st.radio("키워드 범위", KEYWORD_SCOPES, horizontal=True, label_visibility="collapsed")
+start, end, period_title = keyword_period(selected_date, keyword_scope)
+keywords = [token for token, _ in fetch_top_keywords_with_pending(start, end, pending_reviews)]
+
+if keywords:
+    st.markdown(f"### #{period_title}의 주요 키워드  \n{'  '.join(keywords)}")
 else:
-    st.info("해당 날짜에 작성된 리뷰가 없어요.")
+    st.info("해당 기간에 작성된 리뷰가 없어요.")
 
 st.divider()
 
 # =========================
 # 선택 날짜 리뷰 + 그래프
 # =========================
-conn = get_connection()
-cur = conn.cursor()
-cur.execute(
-    """
-    SELECT review_date, review, difficulty
-    FROM daily_reviews
-    WHERE review_date = %s
-    ORDER BY created_at DESC
-    """,
-    (selected_date,)
-)
-filtered_rows = cur.fetchall()
-conn.close()
+filtered_rows = snapshot.reviews
 
 st.subheader("📚 선택한 날짜의 리뷰")
 left, right = st.columns([6, 4])
@@ -156,7 +203,8 @@ left, right = st.columns([6, 4])
 with left:
     if filtered_rows:
         for r in filtered_rows:
-            st.markdown(f"**📅 {r['review_date']} | 난이도 {emoji_map[r['difficulty']]}**")
+            pending = " · ⏳ 반영 중" if r.get("pending") else ""
+            st.markdown(f"**📅 {r['review_date']} | 난이도 {emoji_map[r['difficulty']]}**{pending}")
             st.write(r["review"])
             st.divider()
     else:
@@ -165,10 +213,7 @@ with left:
 with right:
     st.markdown("### 수업 난이도 분포")
     if filtered_rows:
-        diff_counter = Counter([r["difficulty"] for r in filtered_rows])
-
-        labels_map = {1:"쉬움",2:"보통",3:"약간 어려움",4:"어려움",5:"매우 어려움"}
-        colors_map = {1:"#B8E1DD",2:"#C7D8F2",3:"#FFF1A8",4:"#FFD6A5",5:"#FFADAD"}
+        diff_counter = snapshot.difficulty_counts
 
         labels, sizes, colors = [], [], []
         for k in sorted(diff_counter):
@@ -176,10 +221,75 @@ with right:
             sizes.append(diff_counter[k])
             colors.append(colors_map[k])
 
-        fig, ax = plt.subplots(figsize=(4,4))
-        ax.pie(sizes, labels=labels, colors=colors, autopct="%1.0f%%", startangle=90)
-        ax.axis("equal")
-        st.pyplot(fig)
-        plt.close(fig)
+        def draw_pie():
+            fig, ax = plt.subplots(figsize=(4,4))
+            ax.pie(sizes, labels=labels, colors=colors, autopct="%1.0f%%", startangle=90)
+            ax.axis("equal")
+            return fig
+
+        # 분포가 같으면(날짜가 달라도) 같은 그림 → 캐시된 PNG
+        cached_chart("difficulty_pie", content_hash(sorted(diff_counter.items())), draw_pie)
     else:
         st.info("그래프를 표시할 데이터가 없어요.")
+
+# =========================
+# 기간별 난이도 추이 (daily_review_rollups 날짜별 집계)
+# =========================
+# 리뷰 INSERT 때 날짜별 합계를 미리 쌓아두므로 한 학기(약 120일)를 봐도 읽는 행은 날짜 수만큼
+TREND_DEFAULT_DAYS = 120
+
+
+@cached_query("daily_review_rollups")
+def fetch_difficulty_trend(start, end):
+    return get_storage().fetch_review_rollups(start, end)
+
+
+st.divider()
+st.subheader("📈 기간별 난이도 추이")
+
+today = datetime.date.today()
+trend_range = st.date_input(
+    "조회 기간",
+    value=(today - datetime.timedelta(days=TREND_DEFAULT_DAYS - 1), today),
+    key="trend_range"
+)
+
+if len(trend_range) != 2:
+    st.info("끝 날짜까지 선택해주세요.")
+else:
+    rollups = fetch_difficulty_trend(*trend_range)
+    if not rollups:
+        st.info("해당 기간에 작성된 리뷰가 없어요.")
+    else:
+        total_reviews = sum(r["review_count"] for r in rollups)
+        total_difficulty = sum(r["difficulty_sum"] for r in rollups)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("리뷰 수", f"{total_reviews:,}개")
+        col2.metric("평균 난이도", f"{total_difficulty / total_reviews:.2f}")
+        col3.metric("리뷰가 있는 날", f"{len(rollups)}일")
+
+        # 날짜별 난이도 분포(누적 막대) + 평균 난이도(선)
+        def draw_trend():
+            dates = [r["review_date"] for r in rollups]
+            fig, ax = plt.subplots(figsize=(8, 4))
+            bottom = [0] * len(rollups)
+            for k in sorted(labels_map):
+                counts = [r[f"difficulty_{k}"] for r in rollups]
+                ax.bar(dates, counts, bottom=bottom, color=colors_map[k], label=labels_map[k], width=0.9)
+                bottom = [b + c for b, c in zip(bottom, counts)]
+            ax.set_ylabel("리뷰 수")
+            ax.legend(loc="upper left", fontsize=8, ncol=5)
+
+            ax2 = ax.twinx()
+            ax2.plot(dates, [r["difficulty_sum"] / r["review_count"] for r in rollups], color="#555555", marker=".")
+            ax2.set_ylim(1, 5)
+            ax2.set_ylabel("평균 난이도")
+
+            fig.autofmt_xdate()
+            return fig
+
+        cached_chart("difficulty_trend", content_hash(rollups), draw_trend)
+
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
@@ -1,45 +1,93 @@
 import streamlit as st
 import os
+import sys
 import requests
 import json
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz  # 1. 타임존 라이브러리 임포트
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from air import get_air_poller, now_kst, AIR_KOREA_STATION
+from charts import downsample_series, gradient_bar_figure
+from db import get_storage, cached_query, sync_data_versions, begin_query_stats, report_query_stats
+
 # .env 파일 로드
 load_dotenv()
 
-OPENWEATHER_KEY = os.getenv("OPENWEATHER_KEY")
-AIR_KOREA_KEY = os.getenv("AIR_KOREA_KEY")
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
 # --- 페이지 설정 ---
 st.set_page_config(page_title="상암동 환기 요정", page_icon="🌬️")
 
+# 한국 타임존
+korea_tz = pytz.timezone('Asia/Seoul')
+
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("2_환기요정")
+
+# 다른 레플리카의 수집기가 새 행을 넣었으면 해당 캐시만 버림
+sync_data_versions()
+
+
+# --- 데이터 수집 ---
+# 외부 API는 air.py의 백그라운드 수집기만 부름 (poll_interval마다 air_readings에 INSERT)
+# 페이지는 DB의 최신 행/이력만 읽음, 새 행이 들어오면 캐시가 무효화됨
+HISTORY_RANGES = {"최근 24시간": 24, "최근 7일": 24 * 7, "최근 30일": 24 * 30}
+HISTORY_POINTS = 400   # 추이 차트 계열마다 보내는 최대 점 수 (30일 × 5분 간격 ≈ 8,600점 → 400점)
+HISTORY_SERIES = {"pm10": "미세먼지(PM10)", "pm25": "초미세먼지(PM2.5)", "temp": "기온(°C)"}
+
+
+@cached_query("air_readings")
+def fetch_latest_air_reading():
+    return get_storage().fetch_latest_air_reading()
+
+
+@cached_query("air_readings")
+def fetch_air_history(hours, points=HISTORY_POINTS):
+    """
+    최근 hours시간 이력을 계열별로 points개까지 LTTB로 줄여서 {컬럼: (시각 목록, 값 목록)}, 2행 미만이면 {}
+
+    (기간, 해상도)별로 캐시, 새 행이 들어오면 무효화되므로 줄이는 계산은 수집 주기당 한 번
+    """
+    rows = get_storage().fetch_air_readings_since(now_kst() - timedelta(hours=hours))
+    if len(rows) < 2:
+        return {}
+    return downsample_series(
+        [r["measured_at"] for r in rows],
+        {col: [r[col] for r in rows] for col in HISTORY_SERIES},
+        points
+    )
+
 
-# --- 데이터 수집 함수 ---
 def get_realtime_data():
-    temp, pm10, pm25 = 20, 0, 0
-    try:
-        # 날씨
-        w_url = f"https://api.openweathermap.org/data/2.5/weather?q=Seoul&appid={OPENWEATHER_KEY}&units=metric"
-        w_res = requests.get(w_url).json()
-        temp = w_res['main']['temp']
-        
-        # 미세먼지
-        a_url = "http://apis.data.go.kr/B552584/ArpltnInforInqireSvc/getMsrstnAcctoRltmMesureDnsty"
-        a_params = {
-            'serviceKey': AIR_KOREA_KEY, 'returnType': 'json', 
-            'stationName': '마포구', 'dataTerm': 'DAILY', 'ver': '1.0'
-        }
-        a_res = requests.get(a_url, params=a_params).json()
-        item = a_res['response']['body']['items'][0]
-        pm10 = int(item['pm10Value']) if item['pm10Value'].isdigit() else 0
-        pm25 = int(item['pm25Value']) if item['pm25Value'].isdigit() else 0
-    except Exception as e:
-        st.error(f"데이터 수집 오류: {e}")
-    return temp, pm10, pm25
+    """air_readings 최신 행 (기온, PM10, PM2.5 + 소스별 받아온 시각) / 아직 한 행도 없으면 None"""
+    poller = get_air_poller()
+    latest = fetch_latest_air_reading()
+    if latest is None:
+        # 처음 띄운 직후 한 번만 페이지가 직접 기다림
+        try:
+            with st.spinner("날씨/미세먼지를 가져오는 중..."):
+                poller.poll_once()
+        except Exception as e:
+            st.error(f"데이터 수집 오류: {e}")
+            return None
+        latest = fetch_latest_air_reading()
+        if latest is None:
+            return None
+
+    age = (now_kst() - latest["measured_at"]).total_seconds()
+    if age > poller.interval * 2:
+        # 수집이 계속 실패하는 중 → 마지막으로 성공한 값
+        st.caption(f"⚠️ 최신 데이터를 받아오지 못해 {latest['measured_at'].strftime('%H:%M')} 기준 값을 보여드려요.")
+    else:
+        # 마지막 수집에서 한쪽 소스만 실패한 경우 그쪽은 이전 값 (다른 쪽보다 받아온 시각이 이름)
+        newest = max(latest["weather_at"], latest["air_at"])
+        for label, at in (("기온은", latest["weather_at"]), ("미세먼지는", latest["air_at"])):
+            if at < newest:
+                st.caption(f"⚠️ {label} {at.strftime('%H:%M')} 기준 값이에요.")
+    return latest
 
 
 # --- 커스텀 시각화 함수 (그래프) ---
@@ -77,180 +125,14 @@ def get_level_color(level):
 
 
 def draw_thin_gradient_bar(pm10_value, pm25_value):
-    """정확한 위치의 그라데이션 바"""
+    """정확한 위치의 그라데이션 바 (바탕은 캐시된 것을 쓰고 화살표만 새로 얹음, charts.py 참고)"""
     
     try:
         # 백분위 계산
         pm10_percent, pm10_level = get_air_quality_percentage(pm10_value, 'PM10')
         pm25_percent, pm25_level = get_air_quality_percentage(pm25_value, 'PM2.5')
         
-        fig = go.Figure()
-        
-        # 200개 세그먼트로 부드러운 그라데이션
-        num_segments = 200
-        
-        for i in range(num_segments):
-            progress = i / num_segments * 100
-            
-            # 부드러운 색상 보간
-            if progress < 25:  # 좋음 (파랑 계열)
-                ratio = progress / 25
-                r = int(0 + (146 - 0) * ratio)
-                g = int(191 + (208 - 191) * ratio)
-                b = int(255 + (80 - 255) * ratio)
-            elif progress < 50:  # 보통 (초록 계열)
-                ratio = (progress - 25) / 25
-                r = int(146)
-                g = int(208)
-                b = int(80)
-            elif progress < 75:  # 나쁨 (주황 계열)
-                ratio = (progress - 50) / 25
-                r = int(146 + (255 - 146) * ratio)
-                g = int(208 + (165 - 208) * ratio)
-                b = int(80 + (0 - 80) * ratio)
-            else:  # 매우나쁨 (빨강 계열)
-                ratio = (progress - 75) / 25
-                r = int(255)
-                g = int(165 - (165 * ratio))
-                b = int(0)
-            
-            color = f'rgb({r},{g},{b})'
-            
-            fig.add_trace(go.Bar(
-                x=[100/num_segments],
-                y=[2],
-                orientation='h',
-                marker=dict(
-                    color=color,
-                    line=dict(width=0)
-                ),
-                width=0.8,
-                showlegend=False,
-                hoverinfo='skip',
-                base=i * (100/num_segments)
-            ))
-        
-        # 양쪽 끝 둥글게
-        fig.add_shape(
-            type="circle",
-            xref="x", yref="y",
-            x0=-2, y0=1.6, x1=2, y1=2.4,
-            fillcolor='rgb(0,191,255)',
-            line=dict(width=0)
-        )
-        
-        fig.add_shape(
-            type="circle",
-            xref="x", yref="y",
-            x0=98, y0=1.6, x1=102, y1=2.4,
-            fillcolor='rgb(255,0,0)',
-            line=dict(width=0)
-        )
-                
-        # 레이아웃 설정
-        fig.update_layout(
-            barmode='stack',
-            height=150,
-            margin=dict(l=10, r=10, t=60, b=0),
-            xaxis=dict(
-                range=[-3, 103],
-                showticklabels=False,
-                showgrid=False,
-                zeroline=False
-            ),
-            yaxis=dict(
-                showticklabels=False,
-                showgrid=False,
-                fixedrange=True,
-                range=[-0.3, 3]
-            ),
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            bargap=0
-        )
-                
-        # 등급 구분선
-        for x in [25, 50, 75]:
-            fig.add_shape(
-                type="line",
-                x0=x, y0=1.6, x1=x, y1=2.4,
-                line=dict(color="rgba(255,255,255,0.8)", width=2, dash="dash")
-            )
-        
-        # 상단 이모지 + 등급
-        emoji_labels = [
-            ('😊', '좋음', 12.5),
-            ('🙂', '보통', 37.5),
-            ('😷', '나쁨', 62.5),
-            ('🚨', '매우나쁨', 87.5)
-        ]
-        
-        for emoji, label, pos in emoji_labels:
-            fig.add_annotation(
-                x=pos, y=3.0,
-                text=f'<span style="font-size:15px">{emoji}</span><br><span style="font-size:12px">{label}</span>',
-                showarrow=False,
-                xref='x', yref='y'
-            )
-        
-        # 중단 기준치 숫자
-        thresholds = [
-            (0, '0', 'left'),
-            (25, '30/15', 'center'),
-            (50, '80/35', 'center'),
-            (75, '150/75', 'center')
-        ]
-        
-        for pos, text, align in thresholds:
-            fig.add_annotation(
-                x=pos, y=2.5,
-                text=f'<span style="font-size:12px; color:#666">{text}</span>',
-                showarrow=False,
-                xref='x', yref='y',
-                xanchor=align
-            )
-        
-        # 바 아래 화살표
-        fig.add_trace(go.Scatter(
-            x=[pm10_percent],
-            y=[1],
-            mode='markers',
-            marker=dict(
-                symbol='triangle-up',
-                size=20,
-                color='#ff9800',
-                line=dict(color='white', width=2)
-            ),
-            showlegend=False,
-            hoverinfo='skip',
-            name='PM10'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=[pm25_percent],
-            y=[0.85],
-            mode='markers',
-            marker=dict(
-                symbol='triangle-up',
-                size=20,
-                color='#9c27b0',
-                line=dict(color='white', width=2)
-            ),
-            showlegend=False,
-            hoverinfo='skip',
-            name='PM2.5'
-        ))
-        
-        # 우측 하단 범례
-        fig.add_annotation(
-            x=100, y=1,
-            text='<span style="color:#ff9800; font-size:14px">▲</span> <span style="font-size:9px">미세먼지(PM10)</span>  '
-                 '<span style="color:#9c27b0; font-size:14px">▲</span> <span style="font-size:9px">초미세먼지(PM2.5)</span>',
-            showarrow=False,
-            xref='x', yref='y',
-            xanchor='right'
-        )
-        
+        fig = gradient_bar_figure(pm10_percent, pm25_percent)
         return fig, pm10_level, pm25_level
     
     except Exception as e:
@@ -261,8 +143,6 @@ def draw_thin_gradient_bar(pm10_value, pm25_value):
 # --- 메인 화면 ---
 st.title("🌬️ FISA 환기 요정")
 
-# 2. 한국 타임존 설정 및 현재 시각 구하기
-korea_tz = pytz.timezone('Asia/Seoul')
 now_korea = datetime.now(korea_tz)
 
 time_placeholder = st.empty()
@@ -270,7 +150,12 @@ time_placeholder = st.empty()
 time_placeholder.markdown(f"**현재 시각:** {now_korea.strftime('%Y-%m-%d %H:%M:%S')}")
 
 # 데이터 로드
-t, p10, p25 = get_realtime_data()
+reading = get_realtime_data()
+if reading is None:
+    st.stop()
+t, p10, p25 = reading["temp"], reading["pm10"], reading["pm25"]
+if reading["air_data_time"]:
+    st.caption(f"미세먼지 측정 시각: {reading['air_data_time']} ({AIR_KOREA_STATION})")
 
 # 등급 계산 (배지용)
 pm10_percent, pm10_level = get_air_quality_percentage(p10, 'PM10')
@@ -385,6 +270,38 @@ with st.expander("🔎 점수 산출 근거 확인"):
     else:
         st.write("감점 사유 없음. 공기 질이 아주 좋습니다!")
 
+# --- 기온/미세먼지 추이 ---
+st.divider()
+st.subheader("📈 기온/미세먼지 추이")
+
+history_label = st.radio("기간", list(HISTORY_RANGES), horizontal=True, label_visibility="collapsed")
+history = fetch_air_history(HISTORY_RANGES[history_label])
+
+if not history:
+    st.info("아직 쌓인 측정값이 많지 않아요. 잠시 후 다시 확인해주세요.")
+else:
+    hist_fig = go.Figure()
+    for col, color, dash, yaxis in (
+        ("pm10", "#ff9800", "solid", "y"),
+        ("pm25", "#9c27b0", "solid", "y"),
+        ("temp", "#999999", "dot", "y2"),
+    ):
+        times, values = history[col]
+        hist_fig.add_trace(go.Scatter(
+            x=times, y=values, name=HISTORY_SERIES[col], mode="lines",
+            line=dict(color=color, dash=dash), yaxis=yaxis
+        ))
+    hist_fig.update_layout(
+        height=320,
+        margin=dict(l=10, r=10, t=10, b=0),
+        yaxis=dict(title="μg/m³", rangemode="tozero"),
+        yaxis2=dict(title="°C", overlaying="y", side="right", showgrid=False),
+        legend=dict(orientation="h", y=-0.2),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+    )
+    st.plotly_chart(hist_fig, width='stretch')
+
 # --- 슬랙 전송 섹션 ---
 st.divider()
 
@@ -424,3 +341,6 @@ if send_button:
             st.success("슬랙 채널에 성공적으로 공지되었습니다!")
         else:
             st.error("발송 실패. 웹훅 URL을 확인하세요.")
+
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
@@ -1,8 +1,5 @@
-import os
-import tomllib
 import random
 import streamlit as st
-import pymysql
 
 # ===========================
 # Streamlit 기본 설정
@@ -12,126 +9,36 @@ import pymysql
 st.set_page_config(page_title="랜덤 자리배정", page_icon="🎲", layout="wide")
 
 # ===========================
-# DB 설정 로드
+# DB 커넥션
 # ===========================
-def load_mysql_cfg():
-    """
-    MySQL 접속 정보를 로드하는 함수
-
-    우선순위:
-    1) st.secrets["mysql"] (Streamlit Cloud / 로컬 .streamlit/secrets.toml 자동 로드)
-    2) (대안) pages/.streamlit/secrets.toml을 직접 읽어서 로드
-
-    이렇게 해두면:
-    - Streamlit Cloud 배포 시 secrets 관리가 쉬움
-    - 로컬에서도 pages 내부에서 실행하는 경우를 커버 가능
-    """
-    # 1) Streamlit secrets에서 먼저 시도
-    # - Streamlit Cloud는 st.secrets에 등록해두면 자동으로 주입됨
-    # - 로컬도 프로젝트 루트의 .streamlit/secrets.toml이 있으면 st.secrets로 접근 가능
-    try:
-        cfg = st.secrets["mysql"]
-        return {
-            "host": cfg["host"],
-            "port": int(cfg.get("port", 3306)),
-            "user": cfg["user"],
-            "password": cfg["password"],
-            "database": cfg["database"],
-        }
-    except Exception:
-        # secrets가 없거나 키가 없을 때는 2번 방식으로 넘어감
-        pass
-
-    # 2) pages/.streamlit/secrets.toml 직접 로드
-    # - 멀티페이지 구조에서 "pages 폴더에서 직접 실행"하는 상황을 대비
-    base_dir = os.path.dirname(__file__)  # 현재 파일 기준(= pages 폴더)
-    secrets_path = os.path.join(base_dir, ".streamlit", "secrets.toml")
-
-    if not os.path.exists(secrets_path):
-        # 배포/로컬 어디서든 secrets 파일이 없으면 바로 중단
-        st.error(f"secrets.toml 없음: {secrets_path}")
-        st.stop()
-
-    # tomllib: Python 3.11+ 내장 TOML 파서
-    with open(secrets_path, "rb") as f:
-        data = tomllib.load(f)
-
-    if "mysql" not in data:
-        # [mysql] 섹션이 없으면 커넥션 정보가 없으므로 중단
-        st.error("secrets.toml에 [mysql] 섹션이 없습니다.")
-        st.stop()
-
-    cfg = data["mysql"]
-    return {
-        "host": cfg["host"],
-        "port": int(cfg.get("port", 3306)),
-        "user": cfg["user"],
-        "password": cfg["password"],
-        "database": cfg["database"],
-    }
-
-def get_conn():
-    """
-    MySQL DB 커넥션 생성
-
-    주요 포인트:
-    - DictCursor: fetch 결과를 dict로 받아서 r["seat_code"] 같은 접근이 가능
-    - autocommit=True: DML(INSERT/DELETE) 후 commit을 따로 호출하지 않아도 바로 반영
-      (좌석 배정/리뷰 저장 같은 단순 트랜잭션에 편리)
-    - timeout 설정: 네트워크/클라우드 환경에서 무한 대기 방지
-    """
-    cfg = load_mysql_cfg()
-    return pymysql.connect(
-        host=cfg["host"],
-        port=cfg["port"],
-        user=cfg["user"],
-        password=cfg["password"],
-        database=cfg["database"],
-        charset="utf8mb4",  # 한글/이모지 저장을 포함한 안전한 UTF-8 설정
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True,
-        connect_timeout=5,
-        read_timeout=10,
-        write_timeout=10,
-    )
+# - SQL/커넥션 관리는 db.py의 저장소(get_storage())가 담당
+#   (공용 커넥션 풀 사용, MySQL 대신 로컬 SQLite로도 실행 가능)
+# - @cached_query: 버튼 클릭마다 전체 rerun이 일어나므로 조회 결과를 테이블 단위로 캐시
+#   (배정/리뷰 저장 시 해당 테이블의 관련 키만 무효화)
+from db import (
+    get_storage, check_write, submit_write, pending_writes, pop_failed_writes, cached_query, sync_data_versions,
+    begin_query_stats, report_query_stats,
+)
 
 # ===========================
 # DB: 학생/좌석/배정
 # ===========================
+@cached_query("seat_students")
 def fetch_students():
     """
     활성 학생 목록 조회
     - is_active=1: 실제 운영에서 비활성 학생(휴강/중도포기 등) 제외 가능
     - ORDER BY name: UI 노출 시 안정적인 정렬
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT student_id, name
-            FROM seat_students
-            WHERE is_active = 1
-            ORDER BY name;
-        """)
-        rows = cur.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_students()
 
+@cached_query("seats")
 def fetch_seats():
     """
     활성 좌석 목록 조회
     - row_no/col_no로 정렬하면 좌석 배치 렌더링과 동일한 순서 유지 가능
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT seat_id, seat_code, row_no, col_no
-            FROM seats
-            WHERE is_active = 1
-            ORDER BY row_no, col_no;
-        """)
-        rows = cur.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_seats()
 
 def clear_assignments():
     """
@@ -145,11 +52,9 @@ def clear_assignments():
     - AUTO_INCREMENT를 1로 재설정하면 배정 히스토리 테이블이 아니라 "현황 테이블"로 운용하는 느낌이 됨
     - 만약 배정 기록(회차별)을 남기고 싶다면 DELETE 대신 assignment_round 컬럼 추가 설계가 더 적합
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("DELETE FROM seat_assignments;")
-        cur.execute("ALTER TABLE seat_assignments AUTO_INCREMENT = 1;")
-    conn.close()
+    get_storage().clear_assignments()
+    fetch_assignments_view.invalidate()
+    fetch_assignments_map.invalidate()
 
 def insert_assignments(pairs):
     """
@@ -158,14 +63,11 @@ def insert_assignments(pairs):
     - executemany: 다건 INSERT 시 루프 돌며 execute 하는 것보다 빠르고 코드도 간결
     - pairs 예시: [(1, 12), (2, 3), ...]
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.executemany(
-            "INSERT INTO seat_assignments (student_id, seat_id) VALUES (%s, %s);",
-            pairs
-        )
-    conn.close()
+    get_storage().insert_assignments(pairs)
+    fetch_assignments_view.invalidate()
+    fetch_assignments_map.invalidate()
 
+@cached_query("seat_assignments")
 def fetch_assignments_view():
     """
     배정 결과를 좌석 순서대로 조회
@@ -173,24 +75,9 @@ def fetch_assignments_view():
     - seat_assignments(배정) + seat_students(학생) + seats(좌석) 조인
     - ORDER BY row_no, col_no: 화면 렌더링과 동일한 좌석 순서로 결과를 얻기 위함
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT
-              st.name AS student_name,
-              se.seat_code,
-              se.row_no,
-              se.col_no,
-              a.assigned_at
-            FROM seat_assignments a
-            JOIN seat_students st ON st.student_id = a.student_id
-            JOIN seats se ON se.seat_id = a.seat_id
-            ORDER BY se.row_no, se.col_no;
-        """)
-        rows = cur.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_assignments_view()
 
+@cached_query("seat_assignments")
 def fetch_assignments_map():
     """
     seat_code -> student_name 매핑 생성(좌석 렌더링용)
@@ -199,21 +86,13 @@ def fetch_assignments_map():
     - UI에서 좌석을 그릴 때는 "좌석코드별 현재 학생"을 빠르게 lookup하는 dict가 편함
     - DB 결과(rows)를 그대로 쓰면 매번 검색 비용이 들 수 있어 dict로 변환
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT se.seat_code, st.name AS student_name
-            FROM seat_assignments a
-            JOIN seat_students st ON st.student_id = a.student_id
-            JOIN seats se ON se.seat_id = a.seat_id;
-        """)
-        rows = cur.fetchall()
-    conn.close()
+    rows = get_storage().fetch_assignment_pairs()
     return {r["seat_code"]: r["student_name"] for r in rows}
 
 # ===========================
 # DB: 리뷰 (신버전: seat_id 기반)
 # ===========================
+@cached_query("seats")
 def fetch_seat_id_by_seat_code(seat_code: str):
     """
     seat_code(A1 같은 화면용 코드) -> seat_id(DB PK) 변환
@@ -222,12 +101,7 @@ def fetch_seat_id_by_seat_code(seat_code: str):
     - 리뷰는 좌석의 고유키(seat_id)에 귀속시키는 것이 정규화 관점에서 안전함
     - seat_code가 변경되더라도 seat_id가 유지되면 리뷰 데이터는 안정적으로 남음
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("SELECT seat_id FROM seats WHERE seat_code=%s LIMIT 1;", (seat_code,))
-        row = cur.fetchone()
-    conn.close()
-    return None if not row else row["seat_id"]
+    return get_storage().fetch_seat_id_by_seat_code(seat_code)
 
 def insert_review(seat_code: str, rating: int, comment: str):
     """
@@ -236,20 +110,23 @@ def insert_review(seat_code: str, rating: int, comment: str):
     핵심:
     - 배정 테이블과 리뷰 테이블을 분리해서 "리뷰는 누적 자산"으로 관리
     - seat_code는 UI 입력값이므로 DB 저장 시 seat_id로 변환해서 저장
+    - 별점 범위/한줄평 길이처럼 DB가 거절할 값은 제출 전에 걸러서 안내 문구를 반환 (통과하면 None)
     """
     seat_id = fetch_seat_id_by_seat_code(seat_code)
     if seat_id is None:
         # 존재하지 않는 좌석코드가 들어오면 데이터 무결성이 깨지므로 예외 처리
         raise ValueError(f"존재하지 않는 좌석 코드: {seat_code}")
 
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            INSERT INTO seat_reviews (seat_id, rating, comment)
-            VALUES (%s, %s, %s);
-        """, (seat_id, rating, comment))
-    conn.close()
+    problem = check_write("seat_review", seat_id, rating, comment)
+    if problem:
+        return problem
+
+    # 스풀에 넣고 바로 리턴
+    # - DB 반영은 백그라운드 쓰기 큐가 배치로 처리하고, 반영 후 seat_reviews 캐시를 무효화함
+    submit_write("seat_review", seat_id, rating, comment)
+    return None
 
+@cached_query("seat_reviews")
 def fetch_all_reviews_for_seat(seat_code: str):
     """
     특정 좌석의 전체 리뷰(최신순)
@@ -258,19 +135,23 @@ def fetch_all_reviews_for_seat(seat_code: str):
     - 현재 스키마에서는 리뷰 작성자를 저장하지 않으므로 student_name 조인 불가
     - 작성자를 남기고 싶다면 seat_reviews에 작성자(익명 닉네임/학생ID) 컬럼을 추가하는 방식이 필요
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT r.rating, r.comment, r.created_at
-            FROM seat_reviews r
-            JOIN seats se ON se.seat_id = r.seat_id
-            WHERE se.seat_code = %s
-            ORDER BY r.created_at DESC;
-        """, (seat_code,))
-        rows = cur.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_all_reviews_for_seat(seat_code)
 
+def fetch_pending_reviews_for_seat(seat_code: str):
+    """
+    이 세션이 저장했지만 아직 DB 반영 대기 중인 리뷰(최신순)
+
+    - 쓰기 큐가 배치로 반영하기 전에도 내가 쓴 리뷰는 바로 보이도록 목록 앞에 붙임
+    - 반영이 끝나면 스풀에서 빠지고 seat_reviews 캐시가 무효화되어 DB 조회 결과에 포함됨
+    """
+    seat_id = fetch_seat_id_by_seat_code(seat_code)
+    return [
+        {"rating": rating, "comment": comment, "created_at": None, "pending": True}
+        for sid, rating, comment in pending_writes("seat_review")
+        if sid == seat_id
+    ]
+
+@cached_query("seat_reviews")
 def fetch_avg_rating_map():
     """
     seat_code -> (평균 별점, 리뷰 개수)
@@ -278,18 +159,7 @@ def fetch_avg_rating_map():
     - LEFT JOIN: 리뷰가 없는 좌석도 포함시키기 위해 사용
     - AVG는 리뷰가 없으면 NULL이 나오므로 Python에서 None 처리 필요
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT se.seat_code,
-                   AVG(r.rating) AS avg_rating,
-                   COUNT(r.review_id) AS cnt
-            FROM seats se
-            LEFT JOIN seat_reviews r ON r.seat_id = se.seat_id
-            GROUP BY se.seat_code;
-        """)
-        rows = cur.fetchall()
-    conn.close()
+    rows = get_storage().fetch_avg_ratings()
     return {
         r["seat_code"]: (
             float(r["avg_rating"]) if r["avg_rating"] is not None else None,
@@ -298,39 +168,24 @@ def fetch_avg_rating_map():
         for r in rows
     }
 
+@cached_query("seat_reviews")
 def fetch_recent_reviews_tooltip_map(limit_per_seat: int = 3):
     """
     seat_code -> tooltip_text (최근 리뷰 limit개)
 
     구현 포인트:
     - Streamlit의 button help 파라미터를 활용해 hover tooltip로 정보를 제공
-    - 좌석별 최신 리뷰 N개만 보여주기 위해 Python에서 limit 로직 수행
+    - 전체 리뷰를 한 번에 받지 않고 스트리밍으로 한 줄씩 보면서 좌석별 최신 limit개만 남김
+      (메모리에는 DB 청크 하나 + 좌석 수 x limit 줄만 올라감)
       (DB에서 좌석별 top-N을 바로 뽑는 쿼리도 가능하지만 구현 난이도가 올라감)
     """
-    conn = get_conn()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT se.seat_code, r.rating, r.comment, r.created_at
-            FROM seat_reviews r
-            JOIN seats se ON se.seat_id = r.seat_id
-            ORDER BY se.seat_code, r.created_at DESC;
-        """)
-        rows = cur.fetchall()
-    conn.close()
-
     tooltips = {}
-    counts = {}
-    for r in rows:
-        sc = r["seat_code"]
-        counts.setdefault(sc, 0)
+    for r in get_storage().iter_reviews_by_seat_recent_first():
+        lines = tooltips.setdefault(r["seat_code"], [])
 
         # 좌석별 최근 limit개까지만 누적
-        if counts[sc] >= limit_per_seat:
-            continue
-
-        counts[sc] += 1
-        tooltips.setdefault(sc, [])
-        tooltips[sc].append(f"• {int(r['rating'])}점: {r['comment']}")
+        if len(lines) < limit_per_seat:
+            lines.append(f"• {int(r['rating'])}점: {r['comment']}")
 
     return {sc: "\n".join(lines) for sc, lines in tooltips.items()}
 
@@ -425,6 +280,12 @@ def render_review_section(title, start_row, end_row, cols, avg_map, tooltip_map)
 # ===========================
 st.title("🎲 두근두근 랜덤 자리뽑기")
 
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("3_랜덤자리뽑기")
+
+# 다른 레플리카에서 배정/리뷰가 바뀌었으면 해당 테이블 캐시만 버림
+sync_data_versions()
+
 # 학생 / 좌석 로드
 # - DB 연결 실패 시 앱이 계속 실행되면 이후 로직도 줄줄이 실패하므로 초기에 중단 처리
 try:
@@ -523,17 +384,22 @@ with left:
         st.info("위 좌석표에서 좌석 버튼을 클릭하면, 해당 좌석의 전체 리뷰가 여기에 보여요.")
     else:
         st.markdown(f"**선택 좌석: {sel}**")
-        all_reviews = fetch_all_reviews_for_seat(sel)
+        all_reviews = fetch_pending_reviews_for_seat(sel) + fetch_all_reviews_for_seat(sel)
 
         if not all_reviews:
             st.warning("아직 리뷰가 없습니다.")
         else:
             # 최신순으로 가져온 리뷰를 리스트 형태로 출력
             for rv in all_reviews:
-                st.markdown(f"- **{rv['rating']}점** · {rv['comment']}")
+                pending = " · ⏳ 반영 중" if rv.get("pending") else ""
+                st.markdown(f"- **{rv['rating']}점** · {rv['comment']}{pending}")
 
 with right:
     st.markdown("### ✍️ 리뷰 작성")
+
+    # 이 세션에서 저장했지만 DB 반영 단계에서 거절된 리뷰 알림
+    for (_, failed_rating, failed_comment), _ in pop_failed_writes("seat_review"):
+        st.error(f"리뷰 「{failed_rating}점 · {failed_comment}」는 저장되지 못했어요. 다시 저장해주세요.")
     sel = st.session_state.get("selected_seat")
 
     if not sel:
@@ -541,6 +407,11 @@ with right:
     else:
         st.success(f"선택 좌석: {sel}")
 
+        # 저장 직후 rerun 전에 남긴 완료 문구 (rerun하면 그 전 st.success는 사라지므로 세션에 보관)
+        saved_message = st.session_state.pop("review_saved_message", None)
+        if saved_message:
+            st.success(saved_message)
+
         # slider: 별점 입력(1~5)
         # text_area: 200자 제한
         rating = st.slider("별점", 1, 5, 5, 1, key="review_rating_by_seat")
@@ -553,15 +424,22 @@ with right:
 
         # 저장 버튼 클릭 시:
         # - 공백 리뷰 방지
-        # - 저장 후 rerun으로 즉시 반영
+        # - 리뷰 목록(왼쪽)은 이 버튼보다 먼저 그려지므로 저장 후 rerun
+        #   (DB 반영 전이라도 반영 대기 중인 내 리뷰를 목록에 합쳐서 보여줌)
         if st.button("💾 리뷰 저장", width="stretch", key="review_save_by_seat"):
             if not comment.strip():
                 st.warning("한줄평을 입력해줘!")
             else:
                 try:
-                    insert_review(sel, rating, comment.strip())
-                    st.success("저장 완료! (리뷰는 누적됩니다)")
-                    st.rerun()
+                    problem = insert_review(sel, rating, comment.strip())
+                    if problem:
+                        st.warning(problem)
+                    else:
+                        st.session_state["review_saved_message"] = "저장 완료! (리뷰는 누적됩니다)"
+                        st.rerun()
                 except Exception as e:
                     st.error("리뷰 저장 실패")
                     st.exception(e)
+
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
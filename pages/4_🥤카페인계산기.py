@@ -1,21 +1,23 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import streamlit as st
-import pymysql
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
 
 # =========================
-# 1. DB 설정
+# 1. DB 설정 (공용 저장소 사용)
 # =========================
-db_config = {
-    "host": st.secrets["mysql"]["host"],
-    "user": st.secrets["mysql"]["user"],
-    "password": st.secrets["mysql"]["password"],
-    "db": st.secrets["mysql"]["database"],
-    "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor,
-}
+from db import get_storage, cached_query, begin_query_stats, report_query_stats
+
+
+@cached_query("caffeine")
+def fetch_drinks():
+    # pyarrow.Table (캐시에는 불변 Arrow 테이블을 두고, DataFrame은 rerun마다 그 버퍼 위에 만듦)
+    return get_storage().fetch_drinks_arrow()
 
 st.set_page_config(
     page_title="카페인 대시보드",
@@ -63,6 +65,9 @@ st.markdown(
 st.title("☕️ 스마트 카페인 관리 대시보드")
 st.write("오늘 커피를 몇 잔 마셨나요? 섭취한 카페인을 시각화 해드릴게요.")
 
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("4_카페인계산기")
+
 # =========================
 # 2. session_state 초기화
 # =========================
@@ -73,12 +78,9 @@ if "show_result" not in st.session_state:
 # 3. DB 데이터 로드
 # =========================
 try:
-    with pymysql.connect(**db_config) as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT drink_name, caffeine_mg FROM caffeine")
-            data = cursor.fetchall()
+    data = fetch_drinks()
 
-    df = pd.DataFrame(data)
+    df = data.to_pandas(types_mapper=pd.ArrowDtype)
 
     # =========================
     # 4. 사이드바 입력
@@ -289,5 +291,5 @@ try:
 except Exception as e:
     st.error(f"데이터 로드 중 오류가 발생했습니다: {e}")
 
-
-
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
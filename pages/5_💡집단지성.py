@@ -1,47 +1,47 @@
 import re
 import streamlit as st
-from db import get_connection
+from db import (
+    get_storage, check_write, submit_write, pending_writes, pop_failed_writes, cached_query, sync_data_versions,
+    begin_query_stats, report_query_stats,
+)
 
 st.set_page_config(page_title="집단지성", page_icon="🔗", layout="wide")
 st.title("🔗 집단지성")
 
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("5_집단지성")
+
+# 다른 레플리카에서 링크가 추가됐으면 해당 캐시만 버림
+sync_data_versions()
+
 # ---------------------------
 # DB 함수
 # ---------------------------
+@cached_query("useful_categories")
 def fetch_categories():
-    conn = get_connection()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT category_id, category_key, category_name
-            FROM useful_categories
-            WHERE is_active = 1
-            ORDER BY sort_order, category_id;
-        """)
-        rows = cur.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_categories()
 
+@cached_query("useful_links")
 def fetch_links_by_category(category_id: int):
-    conn = get_connection()
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT link_id, title, url, description, created_by, created_at
-            FROM useful_links
-            WHERE is_active = 1 AND category_id = %s
-            ORDER BY created_at DESC;
-        """, (category_id,))
-        rows = cur.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_links_by_category(category_id)
+
+def fetch_pending_links(category_id: int):
+    # 이 세션이 추가했지만 아직 DB 반영 대기 중인 링크 (목록 앞에 "반영 중"으로 붙여서 바로 보이게)
+    return [
+        {"link_id": None, "title": title, "url": url, "description": description,
+         "created_by": created_by, "created_at": None, "pending": True}
+        for cid, title, url, description, created_by in pending_writes("link")
+        if cid == category_id
+    ]
 
 def insert_link(category_id: int, title: str, url: str, description: str | None, created_by: str | None):
-    conn = get_connection()
-    with conn.cursor() as cur:
-        cur.execute("""
-            INSERT INTO useful_links (category_id, title, url, description, created_by)
-            VALUES (%s, %s, %s, %s, %s);
-        """, (category_id, title, url, description, created_by))
-    conn.close()
+    # 이미 등록된 URL / 길이 초과는 제출 전에 DB에서 바로 확인해서 안내 문구 반환
+    # 통과하면 스풀에 넣고 바로 리턴 (DB 반영과 캐시 무효화는 백그라운드 쓰기 큐가 처리)
+    args = (category_id, title, url, description, created_by)
+    problem = check_write("link", *args)
+    if problem is None:
+        submit_write("link", *args)
+    return problem
 
 
 # ---------------------------
@@ -65,6 +65,7 @@ def render_cards(items, cols=3):
             with c[j]:
                 desc = it["description"] if it["description"] else "설명 없음"
                 author = it["created_by"] if it["created_by"] else "익명"
+                badge = ' <span style="font-size: 12px; color: #9ca3af;">⏳ 반영 중</span>' if it.get("pending") else ""
 
                 st.markdown(
                     f"""
@@ -76,7 +77,7 @@ def render_cards(items, cols=3):
                         min-height: 150px;
                     ">
                         <div style="font-size: 16px; font-weight: 800; margin-bottom: 6px;">
-                            {it['title']}
+                            {it['title']}{badge}
                         </div>
                         <div style="font-size: 13px; color: #374151; margin-bottom: 10px;">
                             {desc}
@@ -115,6 +116,10 @@ cat_key_map = {c["category_name"]: c["category_key"] for c in categories}
 # ---------------------------
 # 링크 추가 폼
 # ---------------------------
+# 이 세션에서 제출했지만 DB 반영 단계에서 거절된 링크 알림
+for (_, failed_title, failed_url, _, _), _ in pop_failed_writes("link"):
+    st.error(f"「{failed_title}」({failed_url}) 링크는 저장되지 못했어요. 이미 등록된 링크인지 확인해주세요.")
+
 with st.expander("➕ 링크 추가하기", expanded=True):
     st.markdown("- 카테고리를 고르고 사이트/자료/플리 링크를 등록해요.")
     st.markdown("- 같은 카테고리에서 **동일 URL은 중복 저장되지 않아요.**")
@@ -152,17 +157,20 @@ with st.expander("➕ 링크 추가하기", expanded=True):
             st.warning("URL은 http:// 또는 https:// 로 시작해야 해요.")
         else:
             try:
-                insert_link(
+                problem = insert_link(
                     category_id=cat_map[cat_name],
                     title=title,
                     url=url,
                     description=description,
                     created_by=created_by
                 )
-                st.success("저장 완료! 아래 목록에 반영됐어요.")
-                st.rerun()
+                # 아래 탭은 이 폼 다음에 그려지고 반영 대기 중인 링크도 합쳐서 보여주므로 rerun 불필요
+                if problem:
+                    st.warning(problem)
+                else:
+                    st.success("저장 완료! 다른 사람에게는 잠시 후 반영돼요.")
             except Exception as e:
-                st.error("저장 실패: 이미 등록된 링크이거나 DB 오류일 수 있어요.")
+                st.error("저장 실패: 잠시 후 다시 시도해주세요.")
                 st.exception(e)
 
 st.divider()
@@ -175,7 +183,7 @@ tabs = st.tabs(cat_name_list)
 for tab, cinfo in zip(tabs, categories):
     with tab:
         try:
-            items = fetch_links_by_category(cinfo["category_id"])
+            items = fetch_pending_links(cinfo["category_id"]) + fetch_links_by_category(cinfo["category_id"])
         except Exception as e:
             st.error("❌ 링크 조회 실패")
             st.exception(e)
@@ -186,3 +194,6 @@ for tab, cinfo in zip(tabs, categories):
             render_cards(items, cols=2)
         else:
             render_cards(items, cols=3)
+
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
@@ -3,10 +3,12 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
-import random
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from db import get_connection
+from db import (
+    get_storage, submit_write, pending_writes, pop_failed_writes, get_query_cache, cached_query,
+    sync_data_versions, begin_query_stats, report_query_stats,
+)
+from charts import content_hash, get_chart_renderer, render_wordcloud_png
+from keywords import merge_cloud_words
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 FONT_PATH = os.path.join(BASE_DIR, "assets", "NanumGothic-Bold.ttf")
@@ -18,26 +20,73 @@ st.set_page_config(
 
 st.title("☁️ 복복복 칭찬 감옥")
 
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("6_복복복")
+
+# 다른 레플리카에서 칭찬이 추가됐으면 해당 캐시만 버림
+sync_data_versions()
+
 # =========================
 # DB에서 칭찬 데이터 가져오기
 # =========================
-def fetch_compliments():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT message FROM compliments")
-    rows = cur.fetchall()
-    conn.close()
-    return [r["message"] for r in rows]   # ✅ 핵심 수정
+@cached_query("compliments")
+def fetch_compliment_id_range():
+    """(가장 작은 id, 가장 큰 id) 또는 None, 랜덤 칭찬은 이 범위에서 id를 뽑아 한 건만 조회"""
+    return get_storage().fetch_compliment_id_range()
+
+# 워드클라우드에 올릴 최대 단어 수 (WordCloud 기본 max_words와 같음)
+WORDCLOUD_MAX_WORDS = 200
+
+
+@cached_query("compliment_word_freq")
+def fetch_compliment_word_freq():
+    """
+    워드클라우드 입력 {단어: 횟수} (상위 단어만), 그 내용 해시
+
+    칭찬 INSERT 때 compliment_word_freq에 단어 횟수를 미리 쌓아두므로 원문을 읽거나 다시 토큰화하지 않음
+    해시는 워드클라우드 PNG 캐시 키 (칭찬이 추가돼서 이 캐시가 다시 채워질 때만 계산)
+    """
+    freqs = merge_cloud_words(get_storage().fetch_compliment_top_words(WORDCLOUD_MAX_WORDS))
+    return freqs, content_hash(freqs)
+
+
+def refresh_wordcloud():
+    """
+    최신 단어 빈도로 워드클라우드를 백그라운드 프로세스에서 그리기 시작 (이미 있거나 그리는 중이면 무시)
+
+    칭찬이 DB에 반영되면 쓰기 큐 스레드에서도 불림 → 다음에 페이지를 여는 사람은 보통 완성된 그림을 봄
+    """
+    freqs, freqs_hash = fetch_compliment_word_freq()
+    if freqs:
+        get_chart_renderer().request(
+            "compliment_wordcloud", freqs_hash, render_wordcloud_png,
+            freqs, FONT_PATH, 800, 400, WORDCLOUD_MAX_WORDS
+        )
+    return freqs, freqs_hash
+
+
+get_query_cache().add_listener("compliment_word_freq", "compliment_wordcloud", refresh_wordcloud)
 
 # =========================
 # 랜덤 칭찬
 # =========================
 st.subheader("🎁 오늘의 랜덤 칭찬")
 
+# 이 세션에서 이미 본 칭찬 id (다 보고 나면 비우고 처음부터)
+seen_ids = st.session_state.setdefault("seen_compliment_ids", set())
+
 if st.button("눌러서 칭찬 받기 💙"):
-    compliments = fetch_compliments()
-    if compliments:
-        st.success(random.choice(compliments))
+    id_range = fetch_compliment_id_range()
+    picked = None
+    if id_range:
+        picked = get_storage().fetch_random_compliment(id_range, exclude=seen_ids)
+        if picked is None and seen_ids:
+            seen_ids.clear()
+            picked = get_storage().fetch_random_compliment(id_range)
+    if picked is not None:
+        compliment_id, message = picked
+        seen_ids.add(compliment_id)
+        st.success(message)
     else:
         st.warning("아직 저장된 칭찬이 없어요!")
 
@@ -48,25 +97,63 @@ st.divider()
 # =========================
 st.subheader("☁️ 칭찬 구름")
 
-compliments = fetch_compliments()
+WORDCLOUD_POLL_SECONDS = 2
+
 
-if compliments:
-    text = " ".join(compliments)
+def wordcloud_state():
+    """
+    (칭찬 단어 빈도, 마지막으로 완성된 PNG, 그 PNG가 지금 빈도로 그린 것인지, 그리다 실패했으면 오류)
 
-    wc = WordCloud(
-        font_path=FONT_PATH,
-        background_color="white",
-        width=800,
-        height=400
-    ).generate(text)
+    rerun마다 한 번만 호출
+    """
+    freqs, freqs_hash = refresh_wordcloud()
+    if not freqs:
+        return freqs, None, True, None
+    return (freqs, *get_chart_renderer().latest("compliment_wordcloud", freqs_hash))
 
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.imshow(wc)
-    ax.axis("off")
-    st.pyplot(fig)
-    plt.close(fig)
+
+def wordcloud_settled(state):
+    # 더 기다려도 바뀌지 않는 상태 (새 그림 완성 또는 실패) → 주기적으로 다시 확인할 필요 없음
+    _, _, fresh, error = state
+    return fresh or error is not None
+
+
+def show_wordcloud(state):
+    """마지막으로 완성된 그림을 보여주고, 새 그림을 그리는 중이면 표시 (그리는 시간은 rerun에 포함되지 않음)"""
+    freqs, png, fresh, error = state
+    if not freqs:
+        st.info("아직 칭찬 데이터가 없어요!")
+    elif png is None:
+        if error is None:
+            st.info("☁️ 칭찬 구름을 그리는 중이에요...")
+        else:
+            st.error("칭찬 구름을 그리지 못했어요. 잠시 후 다시 들어와 주세요.")
+    else:
+        st.image(png, width="stretch")
+        if error is not None:
+            st.caption("⚠️ 새 칭찬을 반영한 그림을 그리지 못해서 이전 그림을 보여주고 있어요")
+        elif not fresh:
+            st.caption("🔄 새 칭찬을 반영해서 다시 그리는 중이에요")
+
+
+wordcloud = wordcloud_state()
+# 처음 한 번은 위에서 구한 상태를 그대로 쓰고, run_every로 다시 실행될 때만 새로 확인
+first_poll = [wordcloud]
+
+
+def poll_wordcloud():
+    state = first_poll.pop() if first_poll else wordcloud_state()
+    if wordcloud_settled(state):
+        # 새 그림 완성 또는 실패 → 전체 rerun으로 fragment(주기 실행)를 없애고 일반 렌더링으로
+        st.rerun()
+    show_wordcloud(state)
+
+
+# 새 그림이 준비될 때까지는 이 부분만 주기적으로 다시 실행해서 완성되면 바로 바꿔 보여줌
+if wordcloud_settled(wordcloud):
+    show_wordcloud(wordcloud)
 else:
-    st.info("아직 칭찬 데이터가 없어요!")
+    st.fragment(run_every=WORDCLOUD_POLL_SECONDS)(poll_wordcloud)()
 
 st.divider()
 
@@ -75,6 +162,10 @@ st.divider()
 # =========================
 st.subheader("💌 익명 칭찬 남기기")
 
+# 이 세션에서 보냈지만 DB 반영 단계에서 거절된 칭찬 알림
+for (failed_message,), _ in pop_failed_writes("compliment"):
+    st.error(f"칭찬 「{failed_message}」은 저장되지 못했어요. 다시 보내주세요.")
+
 with st.form(key="compliment_form", clear_on_submit=True):
     message = st.text_area(
         "같은 반 친구를 위한 응원 한마디를 적어주세요",
@@ -87,11 +178,16 @@ with st.form(key="compliment_form", clear_on_submit=True):
         if not message.strip():
             st.warning("칭찬 내용을 입력해주세요!")
         else:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute(
-                "INSERT INTO compliments (message) VALUES (%s)",
-                (message,)
-            )
-            conn.close()
+            # 스풀에 넣고 바로 리턴, DB 반영과 캐시 무효화는 백그라운드 쓰기 큐가 처리
+            submit_write("compliment", message)
             st.success("칭찬이 성공적으로 저장됐어요 💙")
+
+# 이 세션이 보냈지만 아직 DB 반영 대기 중인 칭찬 (반영되면 랜덤 칭찬/칭찬 구름에 들어감)
+my_pending = pending_writes("compliment")
+if my_pending:
+    st.caption("⏳ 내가 보낸 칭찬 (반영 중)")
+    for (pending_message,) in my_pending:
+        st.markdown(f"- {pending_message}")
+
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
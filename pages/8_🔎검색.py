@@ -0,0 +1,59 @@
+import math
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+from db import get_storage, SEARCH_LABELS, SEARCH_PAGE_SIZE, begin_query_stats, report_query_stats
+
+st.set_page_config(page_title="전체 검색", page_icon="🔎", layout="centered")
+st.title("🔎 전체 검색")
+st.caption("오늘의 요약, 자리 리뷰, 집단지성 링크, 칭찬 메시지를 한 번에 찾아봐요.")
+
+# 이번 rerun에서 실행되는 쿼리 기록 시작 (페이지 맨 아래 report_query_stats()에서 집계)
+begin_query_stats("8_검색")
+
+# 검색 결과는 검색어마다 달라서 캐시하지 않음 (색인을 타므로 매번 조회해도 수십 ms)
+
+
+# =========================
+# 페이지 이동
+# =========================
+def move_page(delta):
+    st.session_state.search_page += delta
+
+
+query = st.text_input("검색어", placeholder="예: 도커 실습, 판다스, 코딩테스트").strip()
+
+# 검색어가 바뀌면 첫 페이지부터
+if st.session_state.get("search_query") != query:
+    st.session_state.search_query = query
+    st.session_state.search_page = 1
+
+if not query:
+    st.info("검색어를 입력해주세요. (두 글자 이상)")
+else:
+    page = st.session_state.search_page
+    hits, total = get_storage().search(query, page=page, per_page=SEARCH_PAGE_SIZE)
+
+    if total == 0:
+        st.info("검색 결과가 없어요.")
+    else:
+        pages = math.ceil(total / SEARCH_PAGE_SIZE)
+        st.markdown(f"**{total:,}건** 중 {page} / {pages} 페이지")
+
+        for hit in hits:
+            created = hit["created_at"].strftime("%Y-%m-%d") if hit["created_at"] else ""
+            st.markdown(f"**{SEARCH_LABELS[hit['source']]}** · {created}")
+            if hit["url"]:
+                st.markdown(f"[{hit['title']}]({hit['url']})")
+            if hit["body"]:
+                st.write(hit["body"])
+            st.divider()
+
+        prev_col, _, next_col = st.columns([1, 4, 1])
+        prev_col.button("◀ 이전", on_click=move_page, args=(-1,), disabled=page <= 1)
+        next_col.button("다음 ▶", on_click=move_page, args=(1,), disabled=page >= pages)
+
+# 이번 rerun의 쿼리 통계: JSON 로그 + (?debug=1) 사이드바 패널
+report_query_stats()
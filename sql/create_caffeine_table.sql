@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS caffeine (
+    drink_id INT AUTO_INCREMENT PRIMARY KEY,
+    drink_name VARCHAR(50) NOT NULL UNIQUE,
+    caffeine_mg INT NOT NULL
+);
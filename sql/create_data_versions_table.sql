@@ -0,0 +1,8 @@
+-- 테이블별 데이터 버전 (여러 Streamlit 레플리카 간 캐시 무효화용)
+-- 쓰기 경로에서 version을 1씩 올리고, 각 레플리카는 rerun마다 이 테이블만 조회해서
+-- 버전이 바뀐 테이블의 캐시만 버림
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,31 @@
+CREATE TABLE IF NOT EXISTS seat_students (
+    student_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(50) NOT NULL,
+    is_active TINYINT(1) NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS seats (
+    seat_id INT AUTO_INCREMENT PRIMARY KEY,
+    seat_code VARCHAR(10) NOT NULL UNIQUE,
+    row_no INT NOT NULL,
+    col_no INT NOT NULL,
+    is_active TINYINT(1) NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS seat_assignments (
+    assignment_id INT AUTO_INCREMENT PRIMARY KEY,
+    student_id INT NOT NULL,
+    seat_id INT NOT NULL,
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES seat_students(student_id),
+    FOREIGN KEY (seat_id) REFERENCES seats(seat_id)
+);
+
+CREATE TABLE IF NOT EXISTS seat_reviews (
+    review_id INT AUTO_INCREMENT PRIMARY KEY,
+    seat_id INT NOT NULL,
+    rating INT NOT NULL CHECK (rating BETWEEN 1 AND 5),
+    comment VARCHAR(200) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (seat_id) REFERENCES seats(seat_id)
+);
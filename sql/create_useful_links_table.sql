@@ -0,0 +1,20 @@
+CREATE TABLE IF NOT EXISTS useful_categories (
+    category_id INT AUTO_INCREMENT PRIMARY KEY,
+    category_key VARCHAR(30) NOT NULL UNIQUE,
+    category_name VARCHAR(50) NOT NULL,
+    sort_order INT NOT NULL DEFAULT 0,
+    is_active TINYINT(1) NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS useful_links (
+    link_id INT AUTO_INCREMENT PRIMARY KEY,
+    category_id INT NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    url VARCHAR(500) NOT NULL,
+    description VARCHAR(500),
+    created_by VARCHAR(50),
+    is_active TINYINT(1) NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_useful_links_category_url (category_id, url),
+    FOREIGN KEY (category_id) REFERENCES useful_categories(category_id)
+);
@@ -0,0 +1,2 @@
+-- 1_오늘의요약: WHERE review_date = ? ORDER BY created_at DESC
+CREATE INDEX idx_daily_reviews_date_created ON daily_reviews (review_date, created_at);
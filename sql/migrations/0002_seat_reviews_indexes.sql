@@ -0,0 +1,4 @@
+-- 3_랜덤자리뽑기
+-- - 좌석별 전체 리뷰: WHERE seat_id = ? ORDER BY created_at DESC
+-- - 평균 별점(LEFT JOIN ... GROUP BY): rating까지 포함해서 테이블을 읽지 않고 인덱스만으로 집계
+CREATE INDEX idx_seat_reviews_seat_created ON seat_reviews (seat_id, created_at, rating);
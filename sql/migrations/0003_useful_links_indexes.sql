@@ -0,0 +1,2 @@
+-- 5_집단지성: WHERE is_active = 1 AND category_id = ? ORDER BY created_at DESC
+CREATE INDEX idx_useful_links_active_category_created ON useful_links (is_active, category_id, created_at);
@@ -0,0 +1,3 @@
+-- MySQL은 FOREIGN KEY에 인덱스를 자동으로 만들지만 SQLite는 만들지 않음
+CREATE INDEX idx_seat_assignments_student ON seat_assignments (student_id);
+CREATE INDEX idx_seat_assignments_seat ON seat_assignments (seat_id);
@@ -0,0 +1,8 @@
+-- 1_오늘의요약 주요 키워드: 리뷰 INSERT 때 날짜별 토큰 등장 횟수를 누적 (db.Storage.insert_daily_reviews)
+-- 기존 리뷰는 python db.py backfill-keywords 로 채움
+CREATE TABLE review_keyword_counts (
+    review_date DATE NOT NULL,
+    token VARCHAR(64) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (review_date, token)
+);
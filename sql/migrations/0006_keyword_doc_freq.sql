@@ -0,0 +1,15 @@
+-- 1_오늘의요약 주요 키워드 TF-IDF: 토큰별 문서 빈도(그 토큰이 나온 날짜 수)를 누적
+-- 리뷰 INSERT 때 (날짜, 토큰)이 처음 생기면 doc_count + 1 (db.Storage.insert_daily_reviews)
+-- token = '*' 행은 전체 문서 수(키워드가 하나라도 있는 날짜 수), 실제 토큰은 한글/영문만이라 겹치지 않음
+-- 기존 데이터는 review_keyword_counts에서 바로 채움 (이후 다시 만들 때는 python db.py backfill-keywords)
+CREATE TABLE keyword_doc_freq (
+    token VARCHAR(64) NOT NULL,
+    doc_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (token)
+);
+
+INSERT INTO keyword_doc_freq (token, doc_count)
+SELECT token, COUNT(*) FROM review_keyword_counts GROUP BY token;
+
+INSERT INTO keyword_doc_freq (token, doc_count)
+SELECT '*', COUNT(DISTINCT review_date) FROM review_keyword_counts;
@@ -0,0 +1,26 @@
+-- 1_오늘의요약 기간별 난이도 추이: 날짜별 리뷰 수/난이도 합계/난이도별 리뷰 수를 누적
+-- 리뷰 INSERT 때 같은 트랜잭션에서 더함 (db.Storage.insert_daily_reviews)
+-- 기존 리뷰는 여기서 바로 채움 (이후 다시 만들 때는 python db.py backfill-rollups)
+CREATE TABLE daily_review_rollups (
+    review_date DATE NOT NULL,
+    review_count INT NOT NULL DEFAULT 0,
+    difficulty_sum INT NOT NULL DEFAULT 0,
+    difficulty_1 INT NOT NULL DEFAULT 0,
+    difficulty_2 INT NOT NULL DEFAULT 0,
+    difficulty_3 INT NOT NULL DEFAULT 0,
+    difficulty_4 INT NOT NULL DEFAULT 0,
+    difficulty_5 INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (review_date)
+);
+
+INSERT INTO daily_review_rollups
+    (review_date, review_count, difficulty_sum,
+     difficulty_1, difficulty_2, difficulty_3, difficulty_4, difficulty_5)
+SELECT review_date, COUNT(*), SUM(difficulty),
+       SUM(CASE WHEN difficulty = 1 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 2 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 3 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 4 THEN 1 ELSE 0 END),
+       SUM(CASE WHEN difficulty = 5 THEN 1 ELSE 0 END)
+FROM daily_reviews
+GROUP BY review_date;
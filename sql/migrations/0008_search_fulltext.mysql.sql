@@ -0,0 +1,6 @@
+-- 전체 검색: 한글은 띄어쓰기 단위로 자르면 조사/어미 때문에 잘 안 맞으므로 ngram 파서(기본 2글자) 사용
+-- InnoDB가 INSERT 때 함께 갱신하므로 따로 채울 것 없음 (db.MySQLStorage.search_page)
+ALTER TABLE daily_reviews ADD FULLTEXT INDEX ft_daily_reviews_review (review) WITH PARSER ngram;
+ALTER TABLE seat_reviews ADD FULLTEXT INDEX ft_seat_reviews_comment (comment) WITH PARSER ngram;
+ALTER TABLE useful_links ADD FULLTEXT INDEX ft_useful_links_text (title, description) WITH PARSER ngram;
+ALTER TABLE compliments ADD FULLTEXT INDEX ft_compliments_message (message) WITH PARSER ngram;
@@ -0,0 +1,17 @@
+-- 전체 검색 (SQLite): MySQL ngram FULLTEXT 대신 직접 관리하는 역색인
+-- 2-gram → (테이블, 문서 id, 등장 횟수), INSERT 트랜잭션에서 db.SQLiteStorage.index_search()가 추가
+-- search_index_state: 테이블별 마지막으로 색인한 id / 색인한 문서 수
+-- 기존 행은 python db.py backfill-search 로 색인 (안 해도 다음 INSERT 때 밀린 행까지 한꺼번에 색인됨)
+CREATE TABLE search_postings (
+    gram TEXT NOT NULL,
+    source TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (gram, source, doc_id)
+) WITHOUT ROWID;
+
+CREATE TABLE search_index_state (
+    source TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    doc_count INTEGER NOT NULL DEFAULT 0
+);
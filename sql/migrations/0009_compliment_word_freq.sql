@@ -0,0 +1,10 @@
+-- 6_복복복 워드클라우드: 칭찬 INSERT 때 keywords.py 규칙으로 단어 등장 횟수를 누적 (db.Storage.insert_compliments)
+-- 그릴 때는 상위 단어만 읽음 (count 인덱스를 역순으로 LIMIT)
+-- 기존 칭찬은 python db.py backfill-wordfreq 로 채움
+CREATE TABLE compliment_word_freq (
+    word VARCHAR(64) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (word)
+);
+
+CREATE INDEX idx_compliment_word_freq_count ON compliment_word_freq (count);
@@ -0,0 +1,15 @@
+-- 2_환기요정: 백그라운드 수집기(air.AirPoller)가 poll_interval마다 넣는 기온/미세먼지 시계열
+-- measured_at: 수집 시각(KST), 최신 행/기간 조회는 모두 PK(시각) 순서로 읽음
+-- 시각은 모두 tz 없는 KST 그대로 저장 → DATETIME (MySQL TIMESTAMP는 세션 time_zone 기준으로 UTC 변환되고 2038년까지만 저장됨)
+-- weather_at / air_at: 소스별로 마지막으로 성공한 시각 (한쪽 API만 실패하면 직전 값과 시각을 그대로 씀)
+-- air_data_time: AirKorea가 알려준 측정 시각 ("YYYY-MM-DD HH:MM", 1시간 단위)
+CREATE TABLE air_readings (
+    measured_at DATETIME NOT NULL,
+    temp DOUBLE NOT NULL,
+    pm10 INT NOT NULL,
+    pm25 INT NOT NULL,
+    weather_at DATETIME NOT NULL,
+    air_at DATETIME NOT NULL,
+    air_data_time VARCHAR(16),
+    PRIMARY KEY (measured_at)
+);
@@ -0,0 +1,10 @@
+-- 키워드 토큰/칭찬 단어 PK를 대소문자 구분(utf8mb4_bin)으로: 기본 _ci 콜레이션이면 'SQL'과 'sql'이 같은 행이 됨
+-- keywords.py는 대소문자를 구분해서 세므로 _ci에서는 db.Storage._new_keyword_docs가 새 토큰으로 보고
+-- keyword_doc_freq를 한 번 더 올리고, 카운트는 먼저 들어간 표기 행에 합쳐짐
+-- (칭찬 단어도 표기별로 세고 워드클라우드에 그릴 때 keywords.merge_cloud_words가 합침)
+-- 이미 합쳐진 행은 콜레이션만 바꿔서는 나뉘지 않으므로 적용 후 원문으로 다시 셀 것:
+--     python db.py backfill-keywords
+--     python db.py backfill-wordfreq
+ALTER TABLE review_keyword_counts MODIFY token VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL;
+ALTER TABLE keyword_doc_freq MODIFY token VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL;
+ALTER TABLE compliment_word_freq MODIFY word VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL;
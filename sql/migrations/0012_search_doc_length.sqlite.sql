@@ -0,0 +1,13 @@
+-- 전체 검색 (SQLite) 문서 길이 정규화(BM25)
+-- 문서별 2-gram 수는 gram = '*' 인 search_postings 행에 (실제 2-gram은 한글/영문/숫자만이라 겹치지 않음)
+-- search_index_state.gram_count: 테이블별 2-gram 수 합계 (평균 문서 길이 = SUM(gram_count) / SUM(doc_count))
+-- 이후에는 db.SQLiteStorage.index_search()가 색인할 때 함께 추가 (다시 만들 때는 python db.py backfill-search)
+INSERT INTO search_postings (gram, source, doc_id, tf)
+SELECT '*', source, doc_id, SUM(tf) FROM search_postings GROUP BY source, doc_id;
+
+ALTER TABLE search_index_state ADD COLUMN gram_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE search_index_state SET gram_count = (
+    SELECT COALESCE(SUM(p.tf), 0) FROM search_postings p
+    WHERE p.gram = '*' AND p.source = search_index_state.source
+);
@@ -0,0 +1,7 @@
+-- 테이블별 데이터 버전 (여러 Streamlit 레플리카 간 캐시 무효화용, sql/create_data_versions_table.sql과 같음)
+-- 그 스크립트를 따로 실행하지 않은 DB에도 마이그레이션으로 만들어 둠 (이미 있으면 그대로)
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,6 @@
+-- 테이블별 데이터 버전 (sql/sqlite/schema.sql과 같음, 스키마보다 오래된 로컬 DB용)
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,76 @@
+-- 로컬 벤치마크/부하 테스트용 SQLite 스키마
+-- sql/*.sql(MySQL)과 같은 테이블/컬럼을 SQLite 문법으로 옮긴 것
+CREATE TABLE IF NOT EXISTS daily_reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    review_date DATE NOT NULL,
+    review TEXT NOT NULL,
+    difficulty INTEGER NOT NULL CHECK (difficulty BETWEEN 1 AND 5),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS compliments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS seat_students (
+    student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS seats (
+    seat_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    seat_code TEXT NOT NULL UNIQUE,
+    row_no INTEGER NOT NULL,
+    col_no INTEGER NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS seat_assignments (
+    assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL REFERENCES seat_students(student_id),
+    seat_id INTEGER NOT NULL REFERENCES seats(seat_id),
+    assigned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS seat_reviews (
+    review_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    seat_id INTEGER NOT NULL REFERENCES seats(seat_id),
+    rating INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),
+    comment TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS useful_categories (
+    category_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category_key TEXT NOT NULL UNIQUE,
+    category_name TEXT NOT NULL,
+    sort_order INTEGER NOT NULL DEFAULT 0,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS useful_links (
+    link_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category_id INTEGER NOT NULL REFERENCES useful_categories(category_id),
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    description TEXT,
+    created_by TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (category_id, url)
+);
+
+CREATE TABLE IF NOT EXISTS caffeine (
+    drink_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    drink_name TEXT NOT NULL UNIQUE,
+    caffeine_mg INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
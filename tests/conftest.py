@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(db, keywords)과 bench/ 스크립트를 그대로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
@@ -0,0 +1,63 @@
+"""keywords.Tokenizer가 예전 구현(bench/keywords_bench.py의 reference_*)과 같은 결과를 내는지"""
+import pytest
+
+from keywords import ENDINGS, Tokenizer
+from keywords_bench import (
+    load_corpus, reference_extract_keywords, reference_normalize, reference_tokenize,
+)
+
+EDGE_CASES = [
+    "",
+    "   ",
+    # 어미만 있는 토큰 (다 떼면 빈 문자열/한 글자)
+    " ".join(ENDINGS),
+    "을 를 이 가 은 는 에서 으로",
+    # 특수문자/숫자만, 단어에 붙은 특수문자
+    "!!! ... ??? 123 ^^ ㅋㅋㅋ (#)",
+    "SQL을!! JOIN은?? (판다스)를 ~시각화~ 했다...",
+    # 영문/한글 섞임, 대소문자
+    "Streamlit으로 API를 만들고 sql과 SQL을 비교했다",
+    "pandas를판다스로 Docker도커 GitHub에서",
+    # 길이 경계 (2~6자)
+    "가 가나 가나다라마바 가나다라마바사",
+]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return load_corpus()
+
+
+@pytest.fixture
+def tokenizer():
+    return Tokenizer(cache_size=256)   # 작은 캐시로 교체(evict)가 일어나는 경우까지
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_cases_match_reference(tokenizer, text):
+    for raw in text.split():
+        assert tokenizer.normalize(raw) == reference_normalize(raw)
+    assert tokenizer.tokenize(text) == reference_tokenize(text)
+
+
+def test_corpus_tokens_match_reference(tokenizer, corpus):
+    assert corpus
+    for text in corpus:
+        for raw in text.split():
+            assert tokenizer.normalize(raw) == reference_normalize(raw), raw
+        assert tokenizer.tokenize(text) == reference_tokenize(text), text
+    assert tokenizer.tokenize_many(corpus) == [reference_tokenize(t) for t in corpus]
+
+
+@pytest.mark.parametrize("top_n", [5, 20, 100])
+def test_corpus_keywords_match_reference(tokenizer, corpus, top_n):
+    texts = corpus + EDGE_CASES
+    assert tokenizer.extract_keywords(texts, top_n) == reference_extract_keywords(texts, top_n)
+
+
+def test_count_matches_reference(tokenizer, corpus):
+    want = {}
+    for text in corpus:
+        for token in reference_tokenize(text):
+            want[token] = want.get(token, 0) + 1
+    assert dict(tokenizer.count(corpus)) == want
@@ -0,0 +1,160 @@
+"""WriteBehindQueue 재시도/실패 분류와, 반영 후 QueryCache 파티션 무효화 (SQLite 저장소)"""
+import datetime
+import sqlite3
+
+import pymysql
+import pytest
+
+import db
+from db import QueryCache, SQLiteStorage, WriteBehindQueue, is_retryable_error
+
+DAY = datetime.date(2026, 3, 2)
+OTHER_DAY = datetime.date(2026, 3, 3)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteStorage(str(tmp_path / "fisa.sqlite3"))
+
+
+@pytest.fixture
+def queue(storage, tmp_path):
+    # 스레드 없이 flush()를 직접 호출
+    wq = WriteBehindQueue(storage, str(tmp_path / "spool.sqlite3"), max_attempts=3, start=False)
+    yield wq
+    wq.close(flush=False)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # get_query_cache()는 프로세스 전역(st.cache_resource)이므로 테스트마다 새 캐시로 바꿔 끼움
+    cache = QueryCache()
+    monkeypatch.setattr(db, "get_query_cache", lambda: cache)
+    return cache
+
+
+def spool_rows(queue):
+    return queue._spool.execute("SELECT kind, attempts, failed FROM spool ORDER BY spool_id").fetchall()
+
+
+# =========================
+# 실패 분류
+# =========================
+@pytest.mark.parametrize("errno", sorted(db._RETRYABLE_MYSQL_ERRNOS))
+def test_mysql_connection_errors_are_retryable(errno):
+    assert is_retryable_error(pymysql.err.OperationalError(errno, "server"))
+
+
+@pytest.mark.parametrize("errno", [1054, 1406, 3819])   # 없는 컬럼, 너무 긴 값, CHECK 위반
+def test_mysql_data_errors_are_not_retryable(errno):
+    # pymysql은 매핑 안 된 errno도 OperationalError로 올림
+    assert not is_retryable_error(pymysql.err.OperationalError(errno, "data"))
+
+
+def test_other_errors():
+    assert is_retryable_error(TimeoutError())
+    assert is_retryable_error(pymysql.err.InterfaceError(0, ""))
+    assert not is_retryable_error(pymysql.err.IntegrityError(1062, "Duplicate entry"))
+    assert not is_retryable_error(sqlite3.IntegrityError("CHECK constraint failed"))
+    assert not is_retryable_error(ValueError())
+
+
+def test_sqlite_busy_is_retryable(tmp_path):
+    path = str(tmp_path / "locked.sqlite3")
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("CREATE TABLE t (x)")
+    holder.execute("BEGIN EXCLUSIVE")
+    other = sqlite3.connect(path, timeout=0)
+    with pytest.raises(sqlite3.OperationalError) as exc_info:
+        other.execute("SELECT * FROM t")
+    assert is_retryable_error(exc_info.value)
+
+
+# =========================
+# 재시도 / 포기
+# =========================
+class UnreachableStorage:
+    """insert_*가 항상 연결 끊김으로 실패하는 저장소"""
+    sticky_seconds = 0
+
+    def __init__(self):
+        self.calls = 0
+
+    def insert_compliments(self, rows):
+        self.calls += 1
+        raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+
+
+def test_retryable_failure_keeps_rows_until_max_attempts(tmp_path, cache):
+    storage = UnreachableStorage()
+    wq = WriteBehindQueue(storage, str(tmp_path / "spool.sqlite3"), max_attempts=3, start=False)
+    wq.submit("compliment", "최고")
+    wq.submit("compliment", "고마워")
+
+    for attempt in (1, 2):
+        with pytest.raises(pymysql.err.OperationalError):
+            wq.flush()
+        assert spool_rows(wq) == [("compliment", attempt, 0), ("compliment", attempt, 0)]
+    assert wq.pending_count() == 2
+
+    # max_attempts번째 실패에서 failed=1로 빠지고 더는 시도하지 않음
+    with pytest.raises(pymysql.err.OperationalError):
+        wq.flush()
+    assert spool_rows(wq) == [("compliment", 3, 1), ("compliment", 3, 1)]
+    assert wq.pending_count() == 0
+    assert wq.flush() == 0
+    assert storage.calls == 3
+    wq.close(flush=False)
+
+
+def test_non_retryable_row_is_split_out_of_the_batch(storage, queue, cache):
+    ok = queue.submit("daily_review", DAY, "SQL JOIN을 배웠다", 2)
+    bad = queue.submit("daily_review", DAY, "난이도가 범위를 벗어남", 9)   # CHECK (difficulty 1~5) 위반
+
+    assert queue.flush() == 1
+    entries = queue.lookup([ok, bad])
+    assert ok not in entries
+    assert entries[bad].failed
+    assert "CHECK" in entries[bad].last_error
+    assert [r["review"] for r in storage.fetch_daily_review_snapshot(DAY)[0]] == ["SQL JOIN을 배웠다"]
+
+
+# =========================
+# 반영 후 캐시 무효화
+# =========================
+def snapshot_loader(storage, review_date):
+    return lambda: storage.fetch_daily_review_snapshot(review_date)
+
+
+def test_flush_invalidates_only_the_written_partition(storage, queue, cache):
+    storage.insert_daily_reviews([(DAY, "첫 리뷰", 1), (OTHER_DAY, "다른 날 리뷰", 3)])
+    for d in (DAY, OTHER_DAY):
+        cache.get_or_load("daily_reviews", ("fetch_daily_snapshot", (d,)), snapshot_loader(storage, d))
+    cache.get_or_load("review_keyword_counts", ("fetch_top_keywords", (None, None, 5)), lambda: [])
+
+    queue.submit("daily_review", DAY, "새 리뷰", 4)
+    assert queue.flush() == 1
+
+    bucket = cache._tables["daily_reviews"]
+    assert ("fetch_daily_snapshot", (DAY,)) not in bucket
+    assert ("fetch_daily_snapshot", (OTHER_DAY,)) in bucket
+    # 파티션 없는 파생 테이블은 통째로
+    assert len(cache._tables["review_keyword_counts"]) == 0
+
+    reviews, counts = cache.get_or_load(
+        "daily_reviews", ("fetch_daily_snapshot", (DAY,)), snapshot_loader(storage, DAY)
+    )
+    assert [r["review"] for r in reviews] == ["새 리뷰", "첫 리뷰"]
+    assert counts == {1: 1, 4: 1}
+
+
+def test_cached_rows_are_not_shared_between_callers(storage, cache):
+    storage.insert_daily_reviews([(DAY, "첫 리뷰", 1)])
+    key = ("fetch_daily_snapshot", (DAY,))
+    reviews, counts = cache.get_or_load("daily_reviews", key, snapshot_loader(storage, DAY))
+    reviews[0]["review"] = "바뀜"
+    counts[1] = 100
+
+    reviews, counts = cache.get_or_load("daily_reviews", key, lambda: pytest.fail("캐시에 있어야 함"))
+    assert reviews[0]["review"] == "첫 리뷰"
+    assert counts == {1: 1}